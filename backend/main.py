@@ -1,15 +1,74 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from contextlib import asynccontextmanager
-from database import engine, Base
+from typing import Optional
+from database import engine, Base, SessionLocal, ensure_columns, ensure_indexes, DB_POOL_SIZE, DB_MAX_OVERFLOW
 from routers import auth, assignments, drafts, files, educator
+from services.similarity_index import similarity_index
+from services.ai_service import close_async_engine, OPENAI_MAX_CONCURRENCY
+from services.job_queue import job_queue
+from services.result_cache import result_cache
+from services import metrics, student_stats, history
+from services.extraction_pool import shutdown_pool, EXTRACT_WORKERS
+from utils.passwords import queue_depth as bcrypt_queue_depth
+from utils.upload_limit import UploadSizeLimitMiddleware
 import models  # noqa: F401 – ensures models are registered
 
+metrics.instrument_engine(engine)
+
+
+def _check_queue_depth() -> int:
+    db = SessionLocal()
+    try:
+        return job_queue.depth(db)
+    finally:
+        db.close()
+
+
+def _db_pool_checked_out() -> int:
+    # Only QueuePool tracks checkouts; in-memory SQLite uses a single shared connection
+    return engine.pool.checkedout() if hasattr(engine.pool, "checkedout") else 0
+
+
+metrics.CHECK_QUEUE_DEPTH.set_function(_check_queue_depth)
+metrics.BCRYPT_QUEUE_DEPTH.set_function(bcrypt_queue_depth)
+metrics.DB_POOL_CHECKED_OUT.set_function(_db_pool_checked_out)
+metrics.DB_POOL_CAPACITY.set(DB_POOL_SIZE + DB_MAX_OVERFLOW)
+metrics.EXTRACT_POOL_WORKERS.set(EXTRACT_WORKERS)
+metrics.LLM_MAX_CONCURRENCY.set(OPENAI_MAX_CONCURRENCY)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    ensure_columns()
+    ensure_indexes()
+
+    db = SessionLocal()
+    try:
+        # Similarity index: replay the on-disk log, or build it once from the DB
+        similarity_index.load()
+        if len(similarity_index) == 0:
+            similarity_index.build_from_db(db)
+
+        # Draft list summaries: fill in length / preview for drafts that predate them
+        history.backfill_summaries(db)
+
+        # Student rollups: backfill once for databases that predate them
+        if db.query(models.StudentStats).first() is None and db.query(models.Draft.id).filter(
+            models.Draft.learning_score.isnot(None)
+        ).first():
+            student_stats.rebuild(db)
+    finally:
+        db.close()
+
+    await job_queue.start()
     yield
+    await job_queue.stop()
+    result_cache.flush_hits()
+    await close_async_engine()
+    shutdown_pool()
 
 
 app = FastAPI(
@@ -24,6 +83,9 @@ origins = [
     "http://localhost:3000",  # for local testing
 ]
 
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -47,3 +109,11 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus text format; see services/metrics.py. Scrapers send the METRICS_TOKEN bearer token."""
+    if not metrics.scrape_allowed(authorization):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
@@ -1,7 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, ForeignKey, Boolean, Index, and_, case, func, select
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from database import Base
+from utils.compressed_text import CompressedText
+
+PREVIEW_CHARS = 160
 
 class User(Base):
     __tablename__ = "users"
@@ -15,6 +19,11 @@ class User(Base):
     assignments = relationship("Assignment", back_populates="user", cascade="all, delete-orphan")
     policies = relationship("Policy", back_populates="educator", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Emails are matched case-insensitively (login, signup duplicate check)
+        Index("ix_users_email_lower", func.lower(email)),
+    )
+
 
 class Assignment(Base):
     __tablename__ = "assignments"
@@ -26,13 +35,25 @@ class Assignment(Base):
     user = relationship("User", back_populates="assignments")
     drafts = relationship("Draft", back_populates="assignment", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # A student's assignments, and the drafts join in /drafts/history/all
+        Index("ix_assignments_user_id_id", "user_id", "id"),
+    )
+
 
 class Draft(Base):
     __tablename__ = "drafts"
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("assignments.id"), nullable=False)
-    content = Column(Text, nullable=False)
+    # Text typed into the editor. Drafts made from an upload leave it empty and
+    # point at the shared extracted document instead; read `content` for either.
+    _content = deferred(Column("content", CompressedText, nullable=False))
+    content_hash = Column(String(64), ForeignKey("extracted_documents.content_hash"), nullable=True)
+    # Maintained on write so list views never need to load (or decompress) the text
+    content_length = Column(Integer, nullable=True)
+    content_preview = Column(String(PREVIEW_CHARS), nullable=True)
     similarity_score = Column(Float, nullable=True)
+    similarity_matches = Column(Text, nullable=True)  # JSON: [{"draft_id", "similarity"}]
     ai_probability = Column(Float, nullable=True)
     risk_level = Column(String(20), nullable=True)  # Low | Medium | High
     learning_score = Column(Integer, nullable=True)
@@ -40,23 +61,122 @@ class Draft(Base):
     feedback = Column(Text, nullable=True)
     improvement_tips = Column(Text, nullable=True)
     missing_citations = Column(Text, nullable=True)
+    citation_report = Column(Text, nullable=True)  # JSON: local citation analysis (services/citations.py)
+    chunk_scores = Column(Text, nullable=True)  # JSON: per-chunk scores for long documents
+    analysis_source = Column(String(10), nullable=True)  # llm | local | cache | fallback
     language = Column(String(10), default="en")
     created_at = Column(DateTime, default=datetime.utcnow)
 
     assignment = relationship("Assignment", back_populates="drafts")
     files = relationship("File", back_populates="draft", cascade="all, delete-orphan")
+    check_jobs = relationship("CheckJob", back_populates="draft", cascade="all, delete-orphan")
+    document = relationship("ExtractedDocument")
+
+    @hybrid_property
+    def content(self):
+        if self.content_hash and not self._content and self.document is not None:
+            return self.document.text
+        return self._content
+
+    @content.inplace.setter
+    def _content_setter(self, value):
+        self._content = value
+        self.content_hash = None
+        self._summarize(value)
+
+    def share_document(self, content_hash: str, text: str) -> None:
+        """Make this draft's text the shared extracted document `content_hash`."""
+        self._content = ""
+        self.content_hash = content_hash
+        self._summarize(text)
+
+    def _summarize(self, text: str) -> None:
+        self.content_length = len(text)
+        self.content_preview = text[:PREVIEW_CHARS]
+
+    @content.inplace.expression
+    @classmethod
+    def _content_expression(cls):
+        shared = (
+            select(ExtractedDocument.text)
+            .where(ExtractedDocument.content_hash == cls.content_hash)
+            .scalar_subquery()
+        )
+        return case(
+            (and_(cls.content_hash.isnot(None), cls._content == ""), shared),
+            else_=cls._content,
+        ).label("content")
+
+    __table_args__ = (
+        # Keyset pagination over all submissions (educator dashboard)
+        Index("ix_drafts_created_at_id", "created_at", "id"),
+        # Drafts of one assignment newest first (list_drafts, history/all, previous checked draft)
+        Index("ix_drafts_assignment_created", "assignment_id", "created_at", "id"),
+    )
+
+
+class UserChangeCounter(Base):
+    """Bumped whenever one of the user's drafts changes; drives draft-list ETags."""
+    __tablename__ = "user_change_counters"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class CheckJob(Base):
+    __tablename__ = "check_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(20), default="check")  # check: one draft | bulk: an educator's re-check of many
+    draft_id = Column(Integer, ForeignKey("drafts.id"), nullable=True, index=True)  # check jobs only
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    language = Column(String(10), default="en")
+    payload = Column(Text, nullable=True)  # JSON, bulk: {"draft_ids": [...], "language": override or null}
+    result = Column(Text, nullable=True)   # JSON, bulk: the BulkCheckOut summary once it succeeds
+    status = Column(String(20), default="queued", index=True)  # queued | running | succeeded | failed
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow)  # retry backoff
+    # Lease on a running job: the claiming worker, which refreshes updated_at while it runs
+    lease_owner = Column(String(64), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    draft = relationship("Draft", back_populates="check_jobs")
 
 
 class File(Base):
     __tablename__ = "files"
     id = Column(Integer, primary_key=True, index=True)
-    draft_id = Column(Integer, ForeignKey("drafts.id"), nullable=False)
+    draft_id = Column(Integer, ForeignKey("drafts.id"), nullable=False, index=True)
     filename = Column(String(255), nullable=False)
     file_type = Column(String(20), nullable=False)
-    extracted_text = Column(Text, nullable=True)
+    extracted_text = deferred(Column(CompressedText, nullable=True))  # legacy rows only; new uploads reference `document`
+    content_hash = Column(String(64), ForeignKey("extracted_documents.content_hash"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     draft = relationship("Draft", back_populates="files")
+    document = relationship("ExtractedDocument")
+
+    @property
+    def text(self):
+        if self.extracted_text is not None or self.document is None:
+            return self.extracted_text
+        return self.document.text
+
+
+class ExtractedDocument(Base):
+    """One row per distinct uploaded file, shared by every File with the same bytes."""
+    __tablename__ = "extracted_documents"
+    content_hash = Column(String(64), primary_key=True)  # sha256 of the uploaded bytes
+    file_type = Column(String(20), nullable=False)
+    text = deferred(Column(CompressedText, nullable=False))
+    page_count = Column(Integer, nullable=False)
+    scanned = Column(Boolean, default=False)
+    warning = Column(Text, default="")
+    size_bytes = Column(Integer, nullable=False)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
 
 
 class Policy(Base):
@@ -68,3 +188,33 @@ class Policy(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     educator = relationship("User", back_populates="policies")
+
+
+class StudentStats(Base):
+    """Rollup of a student's scored drafts, maintained by services.student_stats."""
+    __tablename__ = "student_stats"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    draft_count = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Integer, default=0, nullable=False)
+    score_min = Column(Integer, nullable=True)
+    score_max = Column(Integer, nullable=True)
+    latest_risk_level = Column(String(20), nullable=True)
+    latest_draft_at = Column(DateTime, nullable=True)  # created_at of the draft latest_risk_level comes from
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StudentWeeklyStats(Base):
+    __tablename__ = "student_weekly_stats"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    week_start = Column(Date, primary_key=True)  # Monday of the week the draft was created
+    draft_count = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Integer, default=0, nullable=False)
+
+
+class CheckCacheEntry(Base):
+    __tablename__ = "check_cache"
+    key = Column(String(64), primary_key=True)  # sha256 of prompt version, model, language, content
+    payload = Column(Text, nullable=False)      # JSON of the model-derived result fields
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,42 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from passlib.context import CryptContext
-from database import get_db
+from fastapi import APIRouter, HTTPException, Request, status
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from typing import Optional
+from database import SessionLocal
 import models, schemas
 from utils.jwt import create_access_token
+from utils.passwords import hash_password, verify_password
+from utils.rate_limit import SlidingWindowLimiter
+import asyncio
+import os
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Login throttling: failed attempts per account and per client IP. Only failures
+# count, so a class logging in at once from behind one NAT is not throttled.
+LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", "5"))
+LOGIN_FAILURE_WINDOW_SECONDS = float(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "900"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "30"))
+LOGIN_IP_WINDOW_SECONDS = float(os.getenv("LOGIN_IP_WINDOW_SECONDS", "60"))
+
+account_failures = SlidingWindowLimiter(LOGIN_MAX_FAILURES, LOGIN_FAILURE_WINDOW_SECONDS)
+ip_failures = SlidingWindowLimiter(LOGIN_MAX_FAILURES_PER_IP, LOGIN_IP_WINDOW_SECONDS)
+
+
+def _too_many_attempts(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many login attempts. Please wait and try again.",
+        headers={"Retry-After": str(retry_after)},
+    )
 
-@router.post("/signup", response_model=schemas.Token)
-def signup(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
-    # Check if email exists
-    if db.query(models.User).filter(models.User.email == user_data.email).first():
-        raise HTTPException(status_code=400, detail="Email already registered")
 
+# Short sessions of their own: a request-scoped session would keep its pool
+# connection checked out while the request waits for bcrypt.
+def _find_user(email: str) -> Optional[models.User]:
+    """The user registered under `email`, ignoring case."""
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(func.lower(models.User.email) == email.lower()).first()
+        if user is not None:
+            db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+def _create_user(user_data: schemas.UserCreate, password_hash: str) -> Optional[models.User]:
+    """The new user, or None if the email was registered in the meantime."""
+    db = SessionLocal()
+    try:
+        user = models.User(
+            name=user_data.name,
+            email=user_data.email.lower(),
+            password_hash=password_hash,
+            role=user_data.role
+        )
+        db.add(user)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return None
+        db.refresh(user)
+        db.expunge(user)
+        return user
+    finally:
+        db.close()
+
+
+@router.post("/signup", response_model=schemas.Token)
+async def signup(user_data: schemas.UserCreate):
     # Check role
     if user_data.role not in ("student", "educator"):
         raise HTTPException(status_code=400, detail="Role must be student or educator")
 
-    # Step 3: bcrypt supports only 72 characters
-    password = user_data.password
-    if len(password) > 72:
-        password = password[:72]
+    # Check if email exists
+    if await asyncio.to_thread(_find_user, user_data.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = pwd_context.hash(password)
+    hashed_password = await hash_password(user_data.password)
 
     # Create user
-    user = models.User(
-        name=user_data.name,
-        email=user_data.email,
-        password_hash=hashed_password,
-        role=user_data.role
-    )
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    user = await asyncio.to_thread(_create_user, user_data, hashed_password)
+    if user is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
 
     # Create token
     token = create_access_token({"sub": str(user.id)})
@@ -45,4 +92,34 @@ def signup(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
         "access_token": token,
         "token_type": "bearer",
         "user": user
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/login", response_model=schemas.Token)
+async def login(credentials: schemas.UserLogin, request: Request):
+    email = credentials.email.lower()
+    ip = request.client.host if request.client else "unknown"
+
+    # ── Throttle before doing any bcrypt work ─────────────────────
+    retry_after = ip_failures.retry_after(ip) or account_failures.retry_after(email)
+    if retry_after:
+        raise _too_many_attempts(retry_after)
+
+    user = await asyncio.to_thread(_find_user, email)
+    if not await verify_password(credentials.password, user.password_hash if user else None):
+        account_failures.hit(email)
+        ip_failures.hit(ip)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    account_failures.reset(email)
+
+    token = create_access_token({"sub": str(user.id)})
+
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "user": user
+    }
@@ -1,11 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, selectinload, undefer
+from typing import Optional
+from database import get_db, SessionLocal
 from utils.jwt import get_current_user
-from services.ai_service import run_integrity_check
+from utils.pagination import encode_cursor, decode_cursor
+from services.job_queue import job_queue, QueueFull, TERMINAL_STATUSES
+from services.similarity_index import similarity_index
+from services import check_service, history
 import models, schemas
+import asyncio
+import hashlib
+import logging
+import json
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+SSE_POLL_SECONDS = 1.0
+HISTORY_PAGE_DEFAULT = 50
+HISTORY_PAGE_MAX = 200
+
+SUMMARY_COLUMNS = (
+    models.Draft.id,
+    models.Draft.assignment_id,
+    models.Draft.similarity_score,
+    models.Draft.ai_probability,
+    models.Draft.risk_level,
+    models.Draft.learning_score,
+    models.Draft.language,
+    models.Draft.content_length,
+    models.Draft.content_preview,
+    models.Draft.created_at,
+)
+
+# Draft text is deferred by default; endpoints that return it load it up front
+WITH_CONTENT = (
+    undefer(models.Draft._content),
+    selectinload(models.Draft.document).undefer(models.ExtractedDocument.text),
+)
 
 @router.post("/", response_model=schemas.DraftOut)
 def create_draft(
@@ -32,17 +66,23 @@ def create_draft(
         language=data.language,
     )
     db.add(draft)
+    history.bump_version(db, current_user.id)
     db.commit()
     db.refresh(draft)
+    similarity_index.add(f"draft:{draft.id}", data.content, draft.id, current_user.id)
     return draft
 
-@router.post("/{draft_id}/check", response_model=schemas.DraftOut)
+@router.post("/{draft_id}/check", response_model=schemas.CheckJobOut, status_code=202)
 def run_check(
     draft_id: int,
     language: str = "en",
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
+    """
+    Queue an integrity check. Poll /jobs/{id} or stream /jobs/{id}/events
+    for progress; the draft carries the result once the job succeeds.
+    """
     draft = db.query(models.Draft).join(models.Assignment).filter(
         models.Draft.id == draft_id,
         models.Assignment.user_id == current_user.id,
@@ -50,47 +90,175 @@ def run_check(
     if not draft:
         raise HTTPException(status_code=404, detail="Draft not found")
 
-    result = run_integrity_check(draft.content, language)
-    
-    draft.similarity_score = result["similarity_score"]
-    draft.ai_probability = result["ai_probability"]
-    draft.risk_level = result["risk_level"]
-    draft.learning_score = result["learning_score"]
-    draft.feedback = result["feedback"]
-    draft.improvement_tips = result["improvement_tips"]
-    draft.missing_citations = result["missing_citations"]
-    draft.language = language
-    db.commit()
-    db.refresh(draft)
-    return draft
+    try:
+        return job_queue.enqueue(db, draft.id, current_user.id, language)
+    except QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many checks are waiting. Please try again in a minute.",
+            headers={"Retry-After": "30"},
+        )
+
+@router.post("/{draft_id}/check/stream")
+def stream_check(
+    draft_id: int,
+    language: str = "en",
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Run an integrity check now and stream it as Server-Sent Events:
+    `similarity` and `citations` (both local), `scores` as soon as the model
+    has written them, `delta` pieces of feedback and improvement_tips, then
+    `done` with the saved draft. A later `scores` event restarts the text
+    fields; `error` ends a failed check.
+    """
+    draft = db.query(models.Draft).join(models.Assignment).filter(
+        models.Draft.id == draft_id,
+        models.Assignment.user_id == current_user.id,
+    ).first()
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+
+    async def events():
+        try:
+            async for event, data in check_service.stream_check(draft_id, language):
+                if event == "result":
+                    event, data = "done", await asyncio.to_thread(_draft_snapshot, draft_id)
+                yield _sse(event, data)
+        except Exception:
+            logger.exception("Streaming check of draft %s failed", draft_id)
+            yield _sse("error", {"detail": "The integrity check failed. Please try again."})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@router.get("/assignment/{assignment_id}", response_model=list[schemas.DraftOut])
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _draft_snapshot(draft_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        draft = db.query(models.Draft).options(*WITH_CONTENT).filter(models.Draft.id == draft_id).one()
+        return schemas.DraftOut.model_validate(draft).model_dump(mode="json")
+    finally:
+        db.close()
+
+def _get_job(db: Session, job_id: int, user_id: int) -> models.CheckJob:
+    job = db.query(models.CheckJob).filter(
+        models.CheckJob.id == job_id,
+        models.CheckJob.user_id == user_id,
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Check job not found")
+    return job
+
+@router.get("/jobs/{job_id}", response_model=schemas.CheckJobOut)
+def get_check_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    return _get_job(db, job_id, current_user.id)
+
+@router.get("/jobs/{job_id}/events")
+def stream_check_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Server-Sent Events: one `status` event per state change, closing once the job finishes."""
+    _get_job(db, job_id, current_user.id)
+    user_id = current_user.id
+
+    async def events():
+        last = None
+        while True:
+            snapshot = await asyncio.to_thread(_job_snapshot, job_id, user_id)
+            if snapshot != last:
+                last = snapshot
+                yield _sse("status", snapshot)
+            if snapshot["status"] in TERMINAL_STATUSES:
+                return
+            await job_queue.wait_for_change(timeout=SSE_POLL_SECONDS)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def _job_snapshot(job_id: int, user_id: int) -> dict:
+    db = SessionLocal()
+    try:
+        job = _get_job(db, job_id, user_id)
+        return schemas.CheckJobOut.model_validate(job).model_dump(mode="json")
+    finally:
+        db.close()
+
+def _summary_page(request: Request, db: Session, user_id: int, query, cursor: Optional[str], limit: int) -> Response:
+    """
+    One keyset page of draft summaries. The ETag covers the user's change
+    counter and the query string, so an unchanged page is answered with 304
+    before the drafts table is read.
+    """
+    version = history.current_version(db, user_id)
+    digest = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode()).hexdigest()[:16]
+    etag = f'W/"{user_id}.{version}.{digest}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    if cursor:
+        created_at, draft_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            models.Draft.created_at < created_at,
+            and_(models.Draft.created_at == created_at, models.Draft.id < draft_id),
+        ))
+    rows = query.order_by(models.Draft.created_at.desc(), models.Draft.id.desc()).limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    page = schemas.DraftSummaryPage(
+        items=[schemas.DraftSummary.model_validate(row) for row in rows],
+        next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if more else None,
+    )
+    return JSONResponse(page.model_dump(mode="json"), headers=headers)
+
+@router.get("/assignment/{assignment_id}", response_model=schemas.DraftSummaryPage)
 def list_drafts(
     assignment_id: int,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_DEFAULT, ge=1, le=HISTORY_PAGE_MAX),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    assignment = db.query(models.Assignment).filter(
+    assignment = db.query(models.Assignment.id).filter(
         models.Assignment.id == assignment_id,
         models.Assignment.user_id == current_user.id,
     ).first()
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    return db.query(models.Draft).filter(models.Draft.assignment_id == assignment_id).order_by(models.Draft.created_at.desc()).all()
+    query = db.query(*SUMMARY_COLUMNS).filter(models.Draft.assignment_id == assignment_id)
+    return _summary_page(request, db, current_user.id, query, cursor, limit)
 
-@router.get("/history/all", response_model=list[schemas.DraftOut])
+@router.get("/history/all", response_model=schemas.DraftSummaryPage)
 def all_history(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_DEFAULT, ge=1, le=HISTORY_PAGE_MAX),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    return (
-        db.query(models.Draft)
+    query = (
+        db.query(*SUMMARY_COLUMNS)
         .join(models.Assignment)
         .filter(models.Assignment.user_id == current_user.id)
-        .order_by(models.Draft.created_at.desc())
-        .limit(50)
-        .all()
     )
+    return _summary_page(request, db, current_user.id, query, cursor, limit)
 
 @router.get("/{draft_id}", response_model=schemas.DraftOut)
 def get_draft(
@@ -98,7 +266,7 @@ def get_draft(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
-    draft = db.query(models.Draft).join(models.Assignment).filter(
+    draft = db.query(models.Draft).options(*WITH_CONTENT).join(models.Assignment).filter(
         models.Draft.id == draft_id,
         models.Assignment.user_id == current_user.id,
     ).first()
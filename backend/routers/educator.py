@@ -1,59 +1,194 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, or_, and_, func, case
 from sqlalchemy.orm import Session
-from database import get_db
+from datetime import datetime
+from typing import List, Optional
+from database import get_db, SessionLocal
 from utils.jwt import require_educator, get_current_user
+from services.job_queue import job_queue, QueueFull
+from utils.pagination import encode_cursor, decode_cursor
 import models, schemas
+import json
 
 router = APIRouter()
 
+SUBMISSIONS_PAGE_MAX = 200
+
+
 @router.get("/submissions")
 def get_submissions(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=SUBMISSIONS_PAGE_MAX),
+    risk_level: Optional[List[str]] = Query(None),
+    student_id: Optional[int] = None,
+    min_similarity: Optional[float] = None,
+    max_similarity: Optional[float] = None,
+    min_ai_probability: Optional[float] = None,
+    max_ai_probability: Optional[float] = None,
+    min_learning_score: Optional[int] = None,
+    max_learning_score: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: models.User = Depends(require_educator),
+):
+    """
+    Student drafts, newest first, as one joined query with keyset pagination.
+    Pass the returned `next_cursor` back as `cursor` for the following page.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    Draft = models.Draft
+
+    query = (
+        select(
+            models.User.name.label("student_name"),
+            models.User.email.label("student_email"),
+            models.Assignment.title.label("assignment_title"),
+            Draft.id.label("draft_id"),
+            Draft.similarity_score,
+            Draft.ai_probability,
+            Draft.risk_level,
+            Draft.learning_score,
+            Draft.created_at,
+        )
+        .join(models.Assignment, Draft.assignment_id == models.Assignment.id)
+        .join(models.User, models.Assignment.user_id == models.User.id)
+        .where(models.User.role == "student")
+        .order_by(Draft.created_at.desc(), Draft.id.desc())
+        .limit(limit + 1)
+    )
+    if after:
+        query = query.where(or_(
+            Draft.created_at < after[0],
+            and_(Draft.created_at == after[0], Draft.id < after[1]),
+        ))
+    if risk_level:
+        query = query.where(Draft.risk_level.in_(risk_level))
+    if student_id is not None:
+        query = query.where(models.Assignment.user_id == student_id)
+    for column, low, high in (
+        (Draft.similarity_score, min_similarity, max_similarity),
+        (Draft.ai_probability, min_ai_probability, max_ai_probability),
+        (Draft.learning_score, min_learning_score, max_learning_score),
+        (Draft.created_at, created_from, created_to),
+    ):
+        if low is not None:
+            query = query.where(column >= low)
+        if high is not None:
+            query = query.where(column <= high)
+
+    def stream():
+        # Own session: the body is produced after the request's dependencies have exited
+        db = SessionLocal()
+        try:
+            yield '{"items":['
+            last, more = None, False
+            for n, row in enumerate(db.execute(query)):
+                if n == limit:
+                    more = True  # fetched one row past the page
+                    break
+                item = row._asdict()
+                item["created_at"] = row.created_at.isoformat()
+                yield ("," if n else "") + json.dumps(item)
+                last = row
+            next_cursor = encode_cursor(last.created_at, last.draft_id) if more else None
+            yield f'],"next_cursor":{json.dumps(next_cursor)}}}'
+        finally:
+            db.close()
+
+    return StreamingResponse(stream(), media_type="application/json")
+
+@router.get("/summary")
+def get_summary(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_educator),
 ):
-    students = db.query(models.User).filter(models.User.role == "student").all()
-    result = []
-    for student in students:
-        assignments = db.query(models.Assignment).filter(models.Assignment.user_id == student.id).all()
-        for assignment in assignments:
-            drafts = db.query(models.Draft).filter(models.Draft.assignment_id == assignment.id).all()
-            for draft in drafts:
-                result.append({
-                    "student_name": student.name,
-                    "student_email": student.email,
-                    "assignment_title": assignment.title,
-                    "draft_id": draft.id,
-                    "similarity_score": draft.similarity_score,
-                    "ai_probability": draft.ai_probability,
-                    "risk_level": draft.risk_level,
-                    "learning_score": draft.learning_score,
-                    "created_at": draft.created_at,
-                })
-    return result
+    """Dashboard totals over every student draft, counted in the database rather than from a page."""
+    students = db.query(func.count(models.User.id)).filter(models.User.role == "student").scalar()
+    drafts, high_risk = (
+        db.query(func.count(models.Draft.id), func.sum(case((models.Draft.risk_level == "High", 1), else_=0)))
+        .join(models.Assignment, models.Draft.assignment_id == models.Assignment.id)
+        .join(models.User, models.Assignment.user_id == models.User.id)
+        .filter(models.User.role == "student")
+        .one()
+    )
+    return {"students": students, "drafts": drafts, "high_risk_drafts": high_risk or 0}
 
 @router.get("/students")
 def get_students(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_educator),
 ):
-    students = db.query(models.User).filter(models.User.role == "student").all()
-    result = []
-    for student in students:
-        drafts = (
-            db.query(models.Draft)
-            .join(models.Assignment)
-            .filter(models.Assignment.user_id == student.id, models.Draft.learning_score.isnot(None))
-            .all()
+    Stats = models.StudentStats
+    rows = (
+        db.query(
+            models.User.id, models.User.name, models.User.email,
+            Stats.draft_count, Stats.score_sum, Stats.score_min, Stats.score_max, Stats.latest_risk_level,
+        )
+        .outerjoin(Stats, Stats.user_id == models.User.id)
+        .filter(models.User.role == "student")
+        .all()
+    )
+    return [
+        {
+            "id": row.id,
+            "name": row.name,
+            "email": row.email,
+            "total_drafts": row.draft_count or 0,
+            "avg_learning_score": row.score_sum / row.draft_count if row.draft_count else None,
+            "min_learning_score": row.score_min,
+            "max_learning_score": row.score_max,
+            "latest_risk_level": row.latest_risk_level,
+        }
+        for row in rows
+    ]
+
+@router.get("/students/{student_id}/trend")
+def get_student_trend(
+    student_id: int,
+    weeks: int = Query(12, ge=1, le=104),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_educator),
+):
+    """Weekly average learning score for one student, oldest week first."""
+    Weekly = models.StudentWeeklyStats
+    rows = (
+        db.query(Weekly)
+        .filter(Weekly.user_id == student_id)
+        .order_by(Weekly.week_start.desc())
+        .limit(weeks)
+        .all()
+    )
+    return [
+        {
+            "week_start": row.week_start,
+            "drafts": row.draft_count,
+            "avg_learning_score": row.score_sum / row.draft_count if row.draft_count else None,
+        }
+        for row in reversed(rows)
+    ]
+
+@router.post("/recheck", response_model=schemas.CheckJobOut, status_code=202)
+def bulk_recheck(
+    data: schemas.BulkCheckRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_educator),
+):
+    """
+    Queue a re-check of many student drafts, e.g. after a policy change.
+    Poll /api/drafts/jobs/{id} (or stream its /events); once the job has
+    succeeded its `result` lists the new scores. Short drafts share LLM round
+    trips and every result is saved in one transaction.
+    """
+    draft_ids = list(dict.fromkeys(data.draft_ids))
+    try:
+        return job_queue.enqueue_bulk(db, draft_ids, current_user.id, data.language)
+    except QueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many checks are waiting. Please try again in a minute.",
+            headers={"Retry-After": "30"},
         )
-        avg_score = sum(d.learning_score for d in drafts) / len(drafts) if drafts else None
-        result.append({
-            "id": student.id,
-            "name": student.name,
-            "email": student.email,
-            "total_drafts": len(drafts),
-            "avg_learning_score": avg_score,
-        })
-    return result
 
 @router.post("/policy", response_model=schemas.PolicyOut)
 def set_policy(
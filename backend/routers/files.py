@@ -2,12 +2,21 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File as FastA
 from sqlalchemy.orm import Session
 from database import get_db
 from utils.jwt import get_current_user
-from services.file_service import extract_document
+from services.extraction_pool import extract_document_async
+from services.file_service import file_type_for
+from services import extraction_store, history
+from services.similarity_index import similarity_index
+from utils.upload_limit import MAX_FILE_SIZE
 import models, schemas
+import hashlib
+import logging
+import os
+import tempfile
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+UPLOAD_CHUNK_SIZE = 256 * 1024
 
 
 @router.post("/upload/{draft_id}")
@@ -34,47 +43,76 @@ async def upload_file(
     if not draft:
         raise HTTPException(status_code=404, detail="Draft not found")
 
-    # ── Size guard ────────────────────────────────────────────────
-    content = await file.read()
-    if not content:
-        raise HTTPException(status_code=400, detail="The uploaded file is empty.")
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail="File too large. Maximum allowed size is 10 MB.",
-        )
-
-    # ── Extract ───────────────────────────────────────────────────
+    # ── Stream to disk with size guard, hashing as we go ─────────
+    filename = file.filename or "upload"
+    spool = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename)[1])
+    digest = hashlib.sha256()
     try:
-        result = extract_document(content, file.filename or "upload")
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
-    except Exception as exc:
-        raise HTTPException(
-            status_code=500,
-            detail="An unexpected error occurred while reading the file. Please try again.",
-        )
+        size = 0
+        with spool:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=413,
+                        detail="File too large. Maximum allowed size is 10 MB.",
+                    )
+                digest.update(chunk)
+                spool.write(chunk)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="The uploaded file is empty.")
+        content_hash = digest.hexdigest()
+
+        # ── Extract (skipped for bytes we have seen before) ──────
+        file_type = file_type_for(filename)
+        result = extraction_store.lookup(db, content_hash, file_type) if file_type else None
+        cached = result is not None
+        if not cached:
+            try:
+                result = await extract_document_async(spool.name, filename)
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+            except Exception:
+                logger.exception("Extracting text from upload %r failed", filename)
+                raise HTTPException(
+                    status_code=500,
+                    detail="An unexpected error occurred while reading the file. Please try again.",
+                )
+    finally:
+        await file.close()
+        os.unlink(spool.name)
 
     # ── Persist file record ───────────────────────────────────────
+    shared = cached or extraction_store.store(db, content_hash, result, size)
     file_record = models.File(
         draft_id=draft_id,
         filename=file.filename,
         file_type=result.file_type,
-        extracted_text=result.text,
+        extracted_text=None if shared else result.text,
+        content_hash=content_hash if shared else None,
     )
     db.add(file_record)
 
-    # Update draft content so integrity check uses extracted text
-    draft.content = result.text
+    # Update draft content so integrity check uses extracted text; drafts made
+    # from an upload share the stored document instead of keeping a copy
+    if shared:
+        draft.share_document(content_hash, result.text)
+    else:
+        draft.content = result.text
+    history.bump_version(db, current_user.id)
     db.commit()
     db.refresh(file_record)
 
+    # Keep the similarity index in step with the new text
+    similarity_index.add(f"file:{file_record.id}", result.text, draft_id, current_user.id)
+    similarity_index.add(f"draft:{draft_id}", result.text, draft_id, current_user.id)
+
     return {
         "id": file_record.id,
         "draft_id": file_record.draft_id,
         "filename": file_record.filename,
         "file_type": file_record.file_type,
-        "extracted_text": file_record.extracted_text,
+        "extracted_text": result.text,
         "page_count": result.page_count,
         "scanned": result.scanned,
         "warning": result.warning,
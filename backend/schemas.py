@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Dict, Optional, List
 from datetime import datetime
+import json
 
 # Auth
 class UserCreate(BaseModel):
@@ -46,11 +47,41 @@ class DraftCreate(BaseModel):
     reflection_text: Optional[str] = None
     language: str = "en"
 
+class SimilarityMatch(BaseModel):
+    draft_id: int
+    similarity: float
+
+class ChunkScore(BaseModel):
+    label: str
+    chars: int
+    ai_probability: float
+    risk_level: str
+    learning_score: int
+    reused: bool = False
+
+class CitationFinding(BaseModel):
+    kind: str  # quote | statistic | claim
+    start: int
+    end: int
+    excerpt: str
+
+class CitationReport(BaseModel):
+    style: str  # APA | MLA | IEEE | numeric | mixed | none
+    citation_count: int
+    styles: Dict[str, int] = {}
+    reference_section: bool = False
+    reference_entries: int = 0
+    dois: List[str] = []
+    urls: List[str] = []
+    uncited: List[CitationFinding] = []
+    cited_passages: int = 0
+
 class DraftOut(BaseModel):
     id: int
     assignment_id: int
     content: str
     similarity_score: Optional[float]
+    similarity_matches: Optional[List[SimilarityMatch]] = None
     ai_probability: Optional[float]
     risk_level: Optional[str]
     learning_score: Optional[int]
@@ -58,23 +89,89 @@ class DraftOut(BaseModel):
     feedback: Optional[str]
     improvement_tips: Optional[str]
     missing_citations: Optional[str]
+    citation_report: Optional[CitationReport] = None
+    chunk_scores: Optional[List[ChunkScore]] = None
+    analysis_source: Optional[str] = None  # llm | local | cache | fallback
     language: str
     created_at: datetime
     class Config:
         from_attributes = True
 
+    @field_validator("similarity_matches", "chunk_scores", "citation_report", mode="before")
+    @classmethod
+    def _load_matches(cls, v):
+        return json.loads(v) if isinstance(v, str) else v
+
+class DraftSummary(BaseModel):
+    """List view of a draft: scores and a preview, never the full text."""
+    id: int
+    assignment_id: int
+    similarity_score: Optional[float]
+    ai_probability: Optional[float]
+    risk_level: Optional[str]
+    learning_score: Optional[int]
+    language: Optional[str]
+    content_length: Optional[int]
+    content_preview: Optional[str]
+    created_at: datetime
+    class Config:
+        from_attributes = True
+
+class DraftSummaryPage(BaseModel):
+    items: List[DraftSummary]
+    next_cursor: Optional[str]
+
 class IntegrityCheckRequest(BaseModel):
     draft_id: int
     language: str = "en"
 
 class IntegrityResult(BaseModel):
     similarity_score: float
+    similarity_matches: List[SimilarityMatch] = []
     ai_probability: float
     risk_level: str
     learning_score: int
     feedback: str
     improvement_tips: str
     missing_citations: str
+    citation_report: Optional[CitationReport] = None
+    chunks: List[ChunkScore] = []
+    analysis_source: Optional[str] = None
+
+# Bulk re-check
+class BulkCheckRequest(BaseModel):
+    draft_ids: List[int] = Field(..., min_length=1, max_length=500)
+    language: Optional[str] = None  # defaults to each draft's own language
+
+class BulkCheckItem(BaseModel):
+    draft_id: int
+    similarity_score: float
+    ai_probability: float
+    risk_level: str
+    learning_score: int
+
+class BulkCheckOut(BaseModel):
+    checked: int
+    not_found: List[int]
+    results: List[BulkCheckItem]
+
+class CheckJobOut(BaseModel):
+    id: int
+    kind: Optional[str] = "check"
+    draft_id: Optional[int]
+    status: str
+    attempts: int
+    error: Optional[str]
+    result: Optional[BulkCheckOut] = None  # bulk re-checks, once they succeed
+    created_at: datetime
+    updated_at: datetime
+    class Config:
+        from_attributes = True
+
+    @field_validator("result", mode="before")
+    @classmethod
+    def _load_result(cls, v):
+        return json.loads(v) if isinstance(v, str) else v
 
 # File
 class FileOut(BaseModel):
@@ -1,28 +1,61 @@
 import os
 import json
-import random
+import asyncio
+import logging
+import difflib
+import time
+import httpx
+from typing import AbstractSet, AsyncIterator, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, APITimeoutError
+from services import metrics, resilience
+from services.result_cache import result_cache, cache_key
+from services.chunking import MAX_CHUNKS, Chunk, split_document, split_paragraphs
+from services.stylometry import local_analysis, prescreen, score
+from services.citations import citation_fields
+from services.compaction import chunk_chars, compact_document, prompt_text, strip_markers
+from services.json_stream import JsonFieldStream
 
 # Load .env from backend folder
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.dirname(__file__)), ".env"))
 
+logger = logging.getLogger(__name__)
+
 api_key = os.getenv("OPENAI_API_KEY")
-print("LOADED KEY:", api_key)
 
-client = OpenAI(api_key=api_key)
+MODEL = "gpt-4o-mini"   # cheaper and safer
+PROMPT_VERSION = "3"    # bump whenever the prompts change, so cached results are not reused
+FALLBACK_NOTICE = "The full review is unavailable right now, so these scores are a local estimate; check again later for detailed feedback."
+
+# Long documents are analysed chunk by chunk (see services/chunking.py)
+CHUNK_MAX_CONCURRENCY = int(os.getenv("CHUNK_MAX_CONCURRENCY", "4"))
+REDUCE_RISK_SHARE = 0.25   # a risk level must cover this share of the text to set the overall level
+REDUCE_FEEDBACK_SECTIONS = 3
+REDUCE_MAX_TIPS = 6
+RISK_LEVELS = ("Low", "Medium", "High")
+
+# Bulk re-checks: drafts up to BATCH_SHORT_CHARS are packed several per prompt
+BATCH_SHORT_CHARS = int(os.getenv("BATCH_SHORT_CHARS", "1500"))
+BATCH_PACK_CHARS = int(os.getenv("BATCH_PACK_CHARS", "6000"))
+BATCH_PACK_SIZE = int(os.getenv("BATCH_PACK_SIZE", "8"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+
+# Connection / concurrency tuning for the async engine
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "60"))
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "64"))
+OPENAI_POOL_CONNECTIONS = int(os.getenv("OPENAI_POOL_CONNECTIONS", str(OPENAI_MAX_CONCURRENCY)))
 
+OPENAI_TIMEOUT = httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
 
 SYSTEM_PROMPT = """You are IntegrityAI, an academic integrity coach that helps students improve their work through learning rather than just detecting plagiarism.
 
 Analyze the submitted text and return a JSON object with these exact keys:
-- similarity_score: float 0-100
 - ai_probability: float 0-100
 - risk_level: "Low" | "Medium" | "High"
 - learning_score: int 0-100
 - feedback: string (2-3 sentences, friendly educational tone)
 - improvement_tips: string (3-4 actionable tips)
-- missing_citations: string
 
 Be encouraging and educational.
 """
@@ -30,65 +63,664 @@ Be encouraging and educational.
 SYSTEM_PROMPT_HI = """आप IntegrityAI हैं, एक शैक्षणिक ईमानदारी कोच।
 
 इन कुंजियों के साथ JSON लौटाएं:
-- similarity_score
 - ai_probability
 - risk_level
 - learning_score
 - feedback
 - improvement_tips
-- missing_citations
 """
 
+BATCH_PROMPT_SUFFIX = """
+You will receive several submissions, each starting with a line "### Submission <id>".
+Analyze each one independently and return a single JSON object of the form
+{"results": {"<id>": { ...the keys above... }, ...}} with one entry for every id.
+"""
+
+
+def _similarity_risk(risk: str, similarity_score: float) -> str:
+    """Raise the model's risk level when the measured similarity calls for it."""
+    if similarity_score > 60:
+        return "High"
+    if similarity_score >= 20 and risk == "Low":
+        return "Medium"
+    return risk
 
-def run_integrity_check(content: str, language: str = "en") -> dict:
+
+def _timeout(seconds: float) -> httpx.Timeout:
+    """Per-attempt timeout: whatever is left of the call's deadline, at most OPENAI_READ_TIMEOUT."""
+    seconds = max(0.1, min(seconds, OPENAI_READ_TIMEOUT))
+    return httpx.Timeout(seconds, connect=min(OPENAI_CONNECT_TIMEOUT, seconds))
+
+
+def _request_kwargs(text: str, language: str) -> dict:
     system = SYSTEM_PROMPT_HI if language == "hi" else SYSTEM_PROMPT
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": f"Analyze this academic submission:\n\n{text}"},
+        ],
+        "response_format": {"type": "json_object"},
+        "temperature": 0.3,
+        "max_tokens": 600,
+    }
+
+
+def _parse_analysis(raw: str) -> dict:
+    return _normalize_analysis(json.loads(raw))
+
+
+def _text(value) -> str:
+    """A free-text field as a string; models often answer lists for tips."""
+    if isinstance(value, list):
+        return "; ".join(_text(item) for item in value if item)
+    return "" if value is None else str(value)
+
+
+def _normalize_analysis(result: dict) -> dict:
+    return {
+        "ai_probability": float(result.get("ai_probability", 0)),
+        "risk_level": result.get("risk_level", "Low"),
+        "learning_score": int(result.get("learning_score", 50)),
+        "feedback": _text(result.get("feedback", "")),
+        "improvement_tips": _text(result.get("improvement_tips", "")),
+    }
+
+
+def _with_similarity(analysis: dict, similarity_score: float) -> dict:
+    return {
+        **analysis,
+        "similarity_score": float(similarity_score),
+        "risk_level": _similarity_risk(analysis["risk_level"], similarity_score),
+    }
+
+
+def _fallback_result(content: str, similarity_score: float, error: Optional[BaseException]) -> dict:
+    """
+    Local stylometric scores for when the LLM could not answer, tagged
+    analysis_source="fallback" so they are never taken for a full review.
+    """
+    if isinstance(error, resilience.CircuitOpen):
+        reason = "circuit_open"
+    elif isinstance(error, (TimeoutError, APITimeoutError)):
+        reason = "timeout"
+    else:
+        reason = "error"
+    logger.warning("OpenAI unavailable (%s) → local fallback scores", reason)
+    metrics.LLM_FALLBACKS.inc(reason=reason)
+    analysis = local_analysis(score(content))
+    analysis["feedback"] = f"{FALLBACK_NOTICE} {analysis['feedback']}"
+    return _with_similarity({**analysis, "analysis_source": "fallback"}, similarity_score)
+
+
+def _sourced(analysis: dict, from_llm: bool) -> dict:
+    """Tag a result with where it came from: a fresh model call, or cached ones only."""
+    return {**analysis, "analysis_source": "llm" if from_llm else "cache"}
+
+
+def _compact(content: str) -> str:
+    """The document without extraction boilerplate; tokens saved are counted."""
+    compaction = compact_document(content)
+    metrics.PROMPT_TOKENS.inc(compaction.tokens_before, stage="extracted")
+    metrics.PROMPT_TOKENS.inc(compaction.tokens_after, stage="compacted")
+    metrics.PROMPT_BOILERPLATE_LINES.inc(compaction.boilerplate_lines)
+    return compaction.text
+
 
-    try:
-        # Try real OpenAI call
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",   # cheaper and safer
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": f"Analyze this academic submission:\n\n{content[:6000]}"},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.3,
-            max_tokens=800,
+def _prompt(text: str) -> str:
+    """What the model is sent for one chunk: no page markers, within PROMPT_TOKEN_BUDGET."""
+    text, truncated = prompt_text(text)
+    if truncated:
+        metrics.PROMPT_TRUNCATIONS.inc()
+    return text
+
+
+def _prescreen(content: str, language: str) -> Optional[dict]:
+    """The local stylometric result when the text is clearly human-written, so the LLM can be skipped."""
+    local = prescreen(content, language)
+    metrics.PRESCREEN.inc(decision="escalated" if local is None else "local")
+    return None if local is None else {**local, "analysis_source": "local"}
+
+
+# ─── Map-reduce over chunks ──────────────────────────────────────────────────
+
+def _reduce_chunks(chunks: list[Chunk], analyses: dict[int, dict], reused: AbstractSet[int] = frozenset()) -> dict:
+    """
+    Merge per-chunk analyses (keyed by chunk index) into one result.
+    Scores are weighted by chunk length; the overall risk is the most severe
+    level that covers at least REDUCE_RISK_SHARE of the analysed text, so one
+    flagged chapter is not averaged away. Per-chunk scores are kept;
+    `reused` marks chunks whose result was carried over from an earlier draft.
+    """
+    done = [(chunk, analyses[chunk.index]) for chunk in chunks if chunk.index in analyses]
+    total = sum(len(chunk.text) for chunk, _ in done) or 1
+    weights = [len(chunk.text) / total for chunk, _ in done]
+
+    risk = "Low"
+    share = 0.0
+    for level in reversed(RISK_LEVELS):
+        share += sum(w for w, (_, a) in zip(weights, done) if a["risk_level"] == level)
+        if share >= REDUCE_RISK_SHARE:
+            risk = level
+            break
+
+    # Feedback from the chunks the model was most concerned about, in document order
+    flagged = sorted(range(len(done)), key=lambda i: done[i][1]["ai_probability"], reverse=True)
+    feedback = "\n\n".join(
+        f"{done[i][0].label}: {done[i][1]['feedback']}"
+        for i in sorted(flagged[:REDUCE_FEEDBACK_SECTIONS])
+        if done[i][1]["feedback"]
+    )
+
+    tips: list[str] = []
+    seen: set[str] = set()
+    for _, analysis in done:
+        for tip in analysis["improvement_tips"].replace("\n", ";").split(";"):
+            tip = tip.strip(" -•\t")
+            if tip and tip.lower() not in seen and len(tips) < REDUCE_MAX_TIPS:
+                seen.add(tip.lower())
+                tips.append(tip)
+
+    return {
+        "ai_probability": round(sum(w * a["ai_probability"] for w, (_, a) in zip(weights, done)), 1),
+        "risk_level": risk,
+        "learning_score": round(sum(w * a["learning_score"] for w, (_, a) in zip(weights, done))),
+        "feedback": feedback,
+        "improvement_tips": "; ".join(tips),
+        "chunks": [
+            {
+                "label": chunk.label,
+                "chars": len(chunk.text),
+                "ai_probability": analysis["ai_probability"],
+                "risk_level": analysis["risk_level"],
+                "learning_score": analysis["learning_score"],
+                "reused": chunk.index in reused,
+            }
+            for chunk, analysis in done
+        ],
+    }
+
+
+# ─── Async engine ────────────────────────────────────────────────────────────
+# One pooled AsyncOpenAI client and one in-flight semaphore per event loop, so
+# a single worker can keep many checks waiting on OpenAI without parking a
+# thread for each of them.
+
+_async_engine: dict = {}
+
+
+def _get_async_engine() -> tuple[AsyncOpenAI, asyncio.Semaphore]:
+    loop = asyncio.get_running_loop()
+    if _async_engine.get("loop") is not loop:
+        http_client = httpx.AsyncClient(
+            timeout=OPENAI_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=OPENAI_POOL_CONNECTIONS,
+                max_keepalive_connections=OPENAI_POOL_CONNECTIONS,
+                keepalive_expiry=30,
+            ),
+            event_hooks={"request": [metrics.count_llm_attempt_async]},
+        )
+        _async_engine.update(
+            loop=loop,
+            # Retries are done by services/resilience.py, not by the SDK
+            client=AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0),
+            semaphore=asyncio.Semaphore(OPENAI_MAX_CONCURRENCY),
         )
+    return _async_engine["client"], _async_engine["semaphore"]
+
+
+async def close_async_engine() -> None:
+    async_client = _async_engine.pop("client", None)
+    _async_engine.clear()
+    if async_client is not None:
+        await async_client.close()
+
+
+async def _analyze_async(text: str, language: str) -> tuple[dict, bool, str]:
+    """(analysis, whether it came from the cache, the text the model judged). Raises on API errors."""
+    text = _prompt(text)
+    key = cache_key(text, language, MODEL, PROMPT_VERSION)
+
+    # The cache's DB tier is synchronous; keep it off the event loop
+    cached = await asyncio.to_thread(result_cache.get, key)
+    metrics.LLM_CACHE.inc(result="miss" if cached is None else "hit")
+    if cached is not None:
+        return _normalize_analysis(cached), True, text  # entries cached before tips were coerced
+
+    async_client, semaphore = _get_async_engine()
+    async with semaphore:
+        with metrics.llm_call("check") as call:
+            kwargs = _request_kwargs(text, language)
+            response = await resilience.call_async(
+                lambda timeout: async_client.chat.completions.create(**kwargs, timeout=_timeout(timeout))
+            )
+            call.record(response)
+    analysis = _parse_analysis(response.choices[0].message.content)
+    await asyncio.to_thread(result_cache.put, key, analysis)
+    return analysis, False, text
+
+
+async def run_integrity_check_async(
+    content: str,
+    language: str = "en",
+    similarity_score: float = 0.0,
+    previous: Optional[str] = None,
+) -> dict:
+    """
+    similarity_score comes from the local similarity index; the model only
+    judges the remaining fields, so its answer depends on the text alone and
+    is cached by content hash. Extraction boilerplate is compacted away first
+    (services/compaction.py), then long documents are analysed chunk by chunk,
+    at most OPENAI_MAX_CONCURRENCY in-flight calls overall and
+    CHUNK_MAX_CONCURRENCY per document. `previous` is the text of the
+    assignment's last checked draft; paragraphs it shares with `content`
+    reuse their earlier results. Texts the local pre-screen scores as
+    clearly human-written never reach the model, and citations are always
+    analysed locally (services/citations.py). Calls run under deadlines,
+    retries and a circuit breaker (services/resilience.py); when the model
+    still cannot answer, the result is a local estimate marked
+    analysis_source="fallback".
+    """
+    citations = await asyncio.to_thread(citation_fields, content)
+    return {**await _check_document_async(content, language, similarity_score, previous), **citations}
+
 
-        result = json.loads(response.choices[0].message.content)
-
-        return {
-            "similarity_score": float(result.get("similarity_score", 0)),
-            "ai_probability": float(result.get("ai_probability", 0)),
-            "risk_level": result.get("risk_level", "Low"),
-            "learning_score": int(result.get("learning_score", 50)),
-            "feedback": result.get("feedback", ""),
-            "improvement_tips": result.get("improvement_tips", ""),
-            "missing_citations": result.get("missing_citations", "No missing citations detected"),
-        }
-
-    except Exception as e:
-        # IMPORTANT: This handles quota error (429)
-        print("OpenAI error → switching to DEMO mode:", e)
-
-        # Demo fallback (for hackathon)
-        similarity = random.randint(10, 35)
-        ai_prob = random.randint(10, 40)
-
-        if similarity < 20 and ai_prob < 30:
-            risk = "Low"
-        elif similarity > 60 or ai_prob > 70:
-            risk = "High"
+async def _check_document_async(
+    content: str, language: str, similarity_score: float, previous: Optional[str]
+) -> dict:
+    content = await asyncio.to_thread(_compact, content)
+    local = await asyncio.to_thread(_prescreen, content, language)
+    if local is not None:
+        return _with_similarity(local, similarity_score)
+    return await _analyze_document_async(content, language, similarity_score, previous)
+
+
+async def _analyze_document_async(
+    content: str, language: str, similarity_score: float, previous: Optional[str]
+) -> dict:
+    """The LLM path for compacted text the pre-screen did not settle."""
+    if previous:
+        previous = (await asyncio.to_thread(compact_document, previous)).text
+        analysis = await _incremental_analysis(content, previous, language)
+        if analysis is not None:
+            return _with_similarity(analysis, similarity_score)
+
+    chunks = split_document(content, chunk_chars(content))
+    analyses: dict[int, dict] = {}
+    fresh: dict[str, dict] = {}
+    llm_used: list[int] = []
+    errors: list[BaseException] = []
+    chunk_limit = asyncio.Semaphore(CHUNK_MAX_CONCURRENCY)
+
+    async def analyze(chunk: Chunk) -> None:
+        async with chunk_limit:
+            try:
+                analyses[chunk.index], from_cache, prompt = await _analyze_async(chunk.text, language)
+            except Exception as e:
+                logger.warning("OpenAI error on %s: %s", chunk.label, e)
+                errors.append(e)
+                return
+        if not from_cache:
+            llm_used.append(chunk.index)
+            for paragraph in split_paragraphs(chunk.text):
+                if _in_prompt(paragraph, prompt):
+                    fresh[_paragraph_key(paragraph, language)] = analyses[chunk.index]
+
+    await asyncio.gather(*(analyze(chunk) for chunk in chunks))
+    await asyncio.to_thread(result_cache.put_many, fresh)
+
+    if not analyses:
+        return await asyncio.to_thread(_fallback_result, content, similarity_score, errors[-1] if errors else None)
+    analysis = analyses[0] if len(chunks) == 1 else _reduce_chunks(chunks, analyses)
+    return _with_similarity(_sourced(analysis, bool(llm_used)), similarity_score)
+
+
+# ─── Incremental re-checks ───────────────────────────────────────────────────
+# Every analysed chunk is also cached under each of its paragraphs. A new
+# draft of the same assignment is diffed paragraph by paragraph against the
+# last checked one: unchanged paragraphs take their stored result, and only
+# runs of changed or new paragraphs are sent to the model.
+
+def _paragraph_key(paragraph: str, language: str) -> str:
+    return cache_key(paragraph, language, MODEL, f"{PROMPT_VERSION}/paragraph")
+
+
+def _lookup_paragraphs(keys: dict[int, str]) -> dict[int, dict]:
+    found = {}
+    for index, key in keys.items():
+        analysis = result_cache.get(key)
+        if analysis is not None:
+            found[index] = _normalize_analysis(analysis)
+    return found
+
+
+def _in_prompt(paragraph: str, prompt: str) -> bool:
+    """Whether the model saw all of `paragraph`; only then may its result be cached under it."""
+    return paragraph in prompt or strip_markers(paragraph) in prompt
+
+
+def _changed_runs(paragraphs: list[str], owners: list[Optional[dict]], limit: int) -> list[list[int]]:
+    """
+    Indices of paragraphs without a result, grouped into contiguous runs of
+    at most `limit` characters; more than MAX_CHUNKS runs are sampled evenly,
+    as split_document samples chunks.
+    """
+    runs: list[list[int]] = []
+    size = 0
+    for i, owner in enumerate(owners):
+        if owner is not None:
+            continue
+        if runs and runs[-1][-1] == i - 1 and size + len(paragraphs[i]) + 2 <= limit:
+            runs[-1].append(i)
+            size += len(paragraphs[i]) + 2
         else:
-            risk = "Medium"
-
-        return {
-            "similarity_score": similarity,
-            "ai_probability": ai_prob,
-            "risk_level": risk,
-            "learning_score": random.randint(60, 90),
-            "feedback": "Demo mode: Your work shows good originality. Continue improving clarity and add references where necessary.",
-            "improvement_tips": "Add proper citations; Rewrite complex sentences in your own words; Include examples to show understanding; Avoid copying structure from online sources.",
-            "missing_citations": "Consider citing textbooks, research papers, or online sources if referenced.",
-        }
\ No newline at end of file
+            runs.append([i])
+            size = len(paragraphs[i])
+    if len(runs) > MAX_CHUNKS:
+        step = len(runs) / MAX_CHUNKS
+        runs = [runs[int(i * step)] for i in range(MAX_CHUNKS)]
+    return runs
+
+
+async def _incremental_analysis(content: str, previous: str, language: str) -> Optional[dict]:
+    """
+    The combined analysis, or None when no paragraph result can be reused or
+    a changed run could not be analysed; the caller then checks the whole
+    document, so new text is never left out of the score.
+    """
+    paragraphs = split_paragraphs(content)
+    matcher = difflib.SequenceMatcher(None, split_paragraphs(previous), paragraphs, autojunk=False)
+    unchanged = {
+        j: _paragraph_key(paragraphs[j], language)
+        for block in matcher.get_matching_blocks()
+        for j in range(block.b, block.b + block.size)
+    }
+    reused = await asyncio.to_thread(_lookup_paragraphs, unchanged)
+    metrics.LLM_CACHE.inc(len(reused), result="paragraph_hit")
+    if not reused:
+        return None
+
+    owners: list[Optional[dict]] = [reused.get(i) for i in range(len(paragraphs))]
+    fresh: dict[str, dict] = {}
+    llm_used: list[list[int]] = []
+    failed: list[list[int]] = []
+    chunk_limit = asyncio.Semaphore(CHUNK_MAX_CONCURRENCY)
+
+    async def analyze(run: list[int]) -> None:
+        async with chunk_limit:
+            try:
+                text = "\n\n".join(paragraphs[i] for i in run)
+                analysis, from_cache, prompt = await _analyze_async(text, language)
+            except Exception as e:
+                logger.warning("OpenAI error on paragraphs %d-%d: %s", run[0] + 1, run[-1] + 1, e)
+                failed.append(run)
+                return
+        if not from_cache:
+            llm_used.append(run)
+        for i in run:
+            owners[i] = analysis
+            if _in_prompt(paragraphs[i], prompt):
+                fresh[_paragraph_key(paragraphs[i], language)] = analysis
+
+    runs = _changed_runs(paragraphs, owners, chunk_chars(content))
+    await asyncio.gather(*(analyze(run) for run in runs))
+    await asyncio.to_thread(result_cache.put_many, fresh)
+    if failed:
+        return None
+
+    # Consecutive paragraphs sharing one result form one segment of the reduce
+    segments: list[Chunk] = []
+    analyses: dict[int, dict] = {}
+    reused_segments: set[int] = set()
+    start = 0
+    for end in range(1, len(paragraphs) + 1):
+        if end < len(paragraphs) and owners[end] == owners[start]:
+            continue
+        if owners[start] is not None:
+            index = len(segments)
+            label = f"Paragraph {start + 1}" if end - start == 1 else f"Paragraphs {start + 1}-{end}"
+            segments.append(Chunk(index, label, "\n\n".join(paragraphs[start:end])))
+            analyses[index] = owners[start]
+            if start in reused:
+                reused_segments.add(index)
+        start = end
+
+    analysis = analyses[0] if len(segments) == 1 else _reduce_chunks(segments, analyses, reused_segments)
+    return _sourced(analysis, bool(llm_used))
+
+
+# ─── Streaming ───────────────────────────────────────────────────────────────
+# A single-chunk check can be streamed: the scores come first in the model's
+# JSON, so they are known within a few tokens, and the feedback text follows.
+
+SCORE_FIELDS = ("ai_probability", "risk_level", "learning_score")
+STREAMED_FIELDS = ("feedback", "improvement_tips")
+
+
+def _scores_event(values: dict, similarity_score: float, source: str) -> dict:
+    scores = _normalize_analysis(values)
+    return {
+        "ai_probability": scores["ai_probability"],
+        "risk_level": _similarity_risk(scores["risk_level"], similarity_score),
+        "learning_score": scores["learning_score"],
+        "similarity_score": float(similarity_score),
+        "analysis_source": source,
+    }
+
+
+async def _stream_analysis(text: str, language: str, similarity_score: float) -> AsyncIterator[tuple[str, dict]]:
+    """Stream one model answer as "scores" and "delta" events, then "result". Raises on API errors."""
+    async_client, semaphore = _get_async_engine()
+    parser = JsonFieldStream(STREAMED_FIELDS)
+    raw: list[str] = []
+    scores_sent = False
+    async with semaphore:
+        # One deadline from before the stream is opened until its last chunk
+        ends = time.monotonic() + resilience.LLM_DEADLINE_SECONDS
+        with metrics.llm_call("stream") as call:
+            kwargs = _request_kwargs(text, language)
+            stream = await resilience.call_async(
+                lambda timeout: async_client.chat.completions.create(
+                    **kwargs, stream=True, stream_options={"include_usage": True}, timeout=_timeout(timeout)
+                ),
+                deadline=ends - time.monotonic(),
+                hedge=False,
+            )
+            async with stream:  # closes the connection if the client goes away mid-stream
+                async for chunk in stream:
+                    if time.monotonic() > ends:
+                        raise resilience.DeadlineExceeded("LLM stream ran past its deadline")
+                    if chunk.usage is not None:
+                        call.record(chunk)
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    piece = chunk.choices[0].delta.content
+                    raw.append(piece)
+                    for kind, key, value in parser.feed(piece):
+                        if not scores_sent and all(field in parser.values for field in SCORE_FIELDS):
+                            scores_sent = True
+                            yield "scores", _scores_event(parser.values, similarity_score, "llm")
+                        if kind == "delta":
+                            yield "delta", {"field": key, "text": value}
+    analysis = _parse_analysis("".join(raw))
+    if not scores_sent:
+        yield "scores", _scores_event(analysis, similarity_score, "llm")
+    yield "result", _with_similarity(_sourced(analysis, True), similarity_score)
+
+
+def _replay(result: dict) -> list[tuple[str, dict]]:
+    """A finished result as the events a stream would have sent."""
+    return [
+        ("scores", _scores_event(result, result["similarity_score"], result.get("analysis_source"))),
+        *(("delta", {"field": field, "text": result[field]}) for field in STREAMED_FIELDS if result.get(field)),
+    ]
+
+
+async def stream_integrity_check(
+    content: str,
+    language: str = "en",
+    similarity_score: float = 0.0,
+    previous: Optional[str] = None,
+) -> AsyncIterator[tuple[str, dict]]:
+    """
+    run_integrity_check_async as (event, data) pairs, for clients that show
+    the result while it is produced: "citations" (local, so first), then
+    "scores", "delta" pieces of feedback and improvement_tips, and finally
+    "result" with the same dict run_integrity_check_async returns. A
+    "scores" event restarts the text fields. Only an uncached single-chunk
+    document is streamed from the model; anything else is answered whole
+    and replayed, and a stream that breaks falls back to the normal path.
+    """
+    citations = await asyncio.to_thread(citation_fields, content)
+    yield "citations", citations
+
+    text = await asyncio.to_thread(_compact, content)
+    local = await asyncio.to_thread(_prescreen, text, language)
+    if local is not None:
+        result = _with_similarity(local, similarity_score)
+        for event in _replay(result):
+            yield event
+        yield "result", {**result, **citations}
+        return
+
+    result = None
+    prompt = _prompt(text)
+    key = cache_key(prompt, language, MODEL, PROMPT_VERSION)
+    if len(split_document(text, chunk_chars(text))) == 1 and await asyncio.to_thread(result_cache.get, key) is None:
+        metrics.LLM_CACHE.inc(result="miss")
+        try:
+            async for event, data in _stream_analysis(prompt, language, similarity_score):
+                if event == "result":
+                    result = data
+                else:
+                    yield event, data
+        except Exception as e:
+            logger.warning("OpenAI stream error → checking without streaming: %s", e)
+        if result is not None:
+            analysis = {field: result[field] for field in (*SCORE_FIELDS, *STREAMED_FIELDS)}
+            await asyncio.to_thread(result_cache.put, key, analysis)
+            await asyncio.to_thread(
+                result_cache.put_many,
+                {_paragraph_key(paragraph, language): analysis for paragraph in split_paragraphs(text)},
+            )
+
+    if result is None:
+        result = await _analyze_document_async(text, language, similarity_score, previous)
+        for event in _replay(result):
+            yield event
+    yield "result", {**result, **citations}
+
+
+# ─── Bulk checks ─────────────────────────────────────────────────────────────
+
+def _pack_short_items(items: list[tuple[int, str]]) -> list[list[tuple[int, str]]]:
+    packs: list[list[tuple[int, str]]] = []
+    current: list[tuple[int, str]] = []
+    size = 0
+    for item_id, text in items:
+        if current and (size + len(text) > BATCH_PACK_CHARS or len(current) >= BATCH_PACK_SIZE):
+            packs.append(current)
+            current, size = [], 0
+        current.append((item_id, text))
+        size += len(text)
+    if current:
+        packs.append(current)
+    return packs
+
+
+async def _check_pack(pack: list[tuple[int, str]], language: str) -> dict[int, dict]:
+    """One LLM round trip for several short drafts. Returns analyses for the ids the model answered."""
+    system = (SYSTEM_PROMPT_HI if language == "hi" else SYSTEM_PROMPT) + BATCH_PROMPT_SUFFIX
+    body = "\n\n".join(f"### Submission {item_id}\n{text}" for item_id, text in pack)
+    async_client, semaphore = _get_async_engine()
+    async with semaphore:
+        with metrics.llm_call("batch") as call:
+            response = await resilience.call_async(
+                lambda timeout: async_client.chat.completions.create(
+                    model=MODEL,
+                    messages=[
+                        {"role": "system", "content": system},
+                        {"role": "user", "content": f"Analyze these academic submissions:\n\n{body}"},
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=0.3,
+                    max_tokens=min(300 * len(pack), 4000),
+                    timeout=_timeout(timeout),
+                )
+            )
+            call.record(response)
+    results = json.loads(response.choices[0].message.content).get("results", {})
+    return {
+        item_id: _normalize_analysis(results[str(item_id)])
+        for item_id, _ in pack
+        if isinstance(results.get(str(item_id)), dict)
+    }
+
+
+async def run_integrity_check_batch_async(
+    items: dict[int, tuple[str, str]],
+    similarity_scores: dict[int, float],
+) -> dict[int, dict]:
+    """
+    Check many drafts at once. `items` maps draft id → (content, language).
+    Confidently pre-screened and cached drafts are answered locally, short
+    drafts are packed several per prompt, and long drafts go out
+    individually; at most BATCH_MAX_CONCURRENCY
+    of these calls run at a time so a bulk re-check can't starve interactive checks.
+    Citations are analysed locally for every draft.
+    """
+    results: dict[int, dict] = {}
+    keys: dict[int, str] = {}
+    short: dict[str, list[tuple[int, str]]] = {}
+    long: list[int] = []
+
+    for item_id, (content, language) in items.items():
+        if len(content) > BATCH_SHORT_CHARS:
+            long.append(item_id)  # pre-screened, then checked (and cached) chunk by chunk
+            continue
+        content = await asyncio.to_thread(_compact, content)
+        local = await asyncio.to_thread(_prescreen, content, language)
+        if local is not None:
+            results[item_id] = _with_similarity(local, similarity_scores.get(item_id, 0.0))
+            continue
+        content = _prompt(content)
+        keys[item_id] = cache_key(content, language, MODEL, PROMPT_VERSION)
+        cached = await asyncio.to_thread(result_cache.get, keys[item_id])
+        metrics.LLM_CACHE.inc(result="miss" if cached is None else "hit")
+        if cached is not None:
+            results[item_id] = _with_similarity(_sourced(cached, False), similarity_scores.get(item_id, 0.0))
+        else:
+            short.setdefault(language, []).append((item_id, content))
+
+    batch_limit = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def single(item_id: int) -> None:
+        content, language = items[item_id]
+        async with batch_limit:
+            results[item_id] = await run_integrity_check_async(
+                content, language, similarity_scores.get(item_id, 0.0)
+            )
+
+    async def packed(pack: list[tuple[int, str]], language: str) -> None:
+        try:
+            async with batch_limit:
+                answered = await _check_pack(pack, language)
+        except Exception as e:
+            logger.warning("OpenAI batch error → checking drafts one by one: %s", e)
+            metrics.LLM_FALLBACKS.inc(reason="batch_split")
+            answered = {}
+        for item_id, analysis in answered.items():
+            await asyncio.to_thread(result_cache.put, keys[item_id], analysis)
+            results[item_id] = _with_similarity(_sourced(analysis, True), similarity_scores.get(item_id, 0.0))
+        # Anything the model skipped is retried on its own
+        await asyncio.gather(*(single(item_id) for item_id, _ in pack if item_id not in answered))
+
+    await asyncio.gather(
+        *(packed(pack, language) for language, group in short.items() for pack in _pack_short_items(group)),
+        *(single(item_id) for item_id in long),
+    )
+    for item_id, result in results.items():
+        if "citation_report" not in result:
+            result.update(await asyncio.to_thread(citation_fields, items[item_id][0]))
+    return results
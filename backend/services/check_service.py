@@ -0,0 +1,213 @@
+"""
+Check Service – runs one integrity check end to end
+Loads the draft, measures similarity locally, awaits the LLM analysis and
+writes the result back.  Shared by the job queue workers and any other
+caller that needs a draft checked outside the request cycle.
+"""
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.orm import Session, object_session
+
+from database import SessionLocal
+from services.ai_service import run_integrity_check_async, run_integrity_check_batch_async, stream_integrity_check
+from services.similarity_index import similarity_index
+from services import metrics, student_stats, history
+import models
+
+
+class DraftNotFound(Exception):
+    pass
+
+
+def _swap_learning_score(db: Session, draft: models.Draft, score: int) -> Optional[int]:
+    """
+    Store the draft's new learning score with a compare-and-set and return the
+    score it replaced. Two checks of one draft finishing together each see the
+    other's score, so the rollups never count the draft twice.
+    """
+    Draft = models.Draft
+    previous = draft.learning_score
+    while True:
+        unchanged = Draft.learning_score.is_(None) if previous is None else Draft.learning_score == previous
+        swapped = (
+            db.query(Draft)
+            .filter(Draft.id == draft.id, unchanged)
+            .update({Draft.learning_score: score}, synchronize_session=False)
+        )
+        if swapped:
+            return previous
+        previous = db.query(Draft.learning_score).filter(Draft.id == draft.id).scalar()
+
+
+def apply_check_result(draft: models.Draft, result: dict, matches: list[dict], language: str) -> None:
+    """
+    Copy an integrity result onto a draft and fold the score into the
+    student's rollups. The caller commits, so both land in one transaction.
+    """
+    db = object_session(draft)
+    user_id = draft.assignment.user_id
+    history.bump_version(db, user_id)
+    student_stats.record_score(
+        db,
+        user_id,
+        draft.created_at,
+        _swap_learning_score(db, draft, result["learning_score"]),
+        result["learning_score"],
+        result["risk_level"],
+    )
+    draft.similarity_score = result["similarity_score"]
+    draft.similarity_matches = json.dumps(matches)
+    draft.ai_probability = result["ai_probability"]
+    draft.risk_level = result["risk_level"]
+    draft.learning_score = result["learning_score"]
+    draft.feedback = result["feedback"]
+    draft.improvement_tips = result["improvement_tips"]
+    draft.missing_citations = result["missing_citations"]
+    draft.citation_report = json.dumps(result["citation_report"]) if result.get("citation_report") else None
+    draft.chunk_scores = json.dumps(result.get("chunks", []))
+    draft.analysis_source = result.get("analysis_source")
+    draft.language = language
+
+
+def _load_draft(draft_id: int) -> tuple[str, int, Optional[str]]:
+    """(content, owner id, content of the assignment's last checked draft or None)."""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(models.Draft.content, models.Draft.assignment_id, models.Assignment.user_id)
+            .join(models.Assignment)
+            .filter(models.Draft.id == draft_id)
+            .first()
+        )
+        if row is None:
+            raise DraftNotFound(draft_id)
+        previous = (
+            db.query(models.Draft.content)
+            .filter(
+                models.Draft.assignment_id == row.assignment_id,
+                models.Draft.id != draft_id,
+                models.Draft.learning_score.isnot(None),
+            )
+            .order_by(models.Draft.created_at.desc(), models.Draft.id.desc())
+            .first()
+        )
+        return row.content, row.user_id, previous.content if previous else None
+    finally:
+        db.close()
+
+
+def _save_result(draft_id: int, result: dict, matches: list[dict], language: str) -> None:
+    db = SessionLocal()
+    try:
+        draft = db.get(models.Draft, draft_id)
+        if draft is None:
+            raise DraftNotFound(draft_id)
+        apply_check_result(draft, result, matches, language)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def check_draft(draft_id: int, language: str = "en") -> None:
+    """
+    Check a draft without holding a DB connection while the LLM call is in
+    flight: one short session to read, one to write.
+    """
+    stage = metrics.CHECK_STAGE_DURATION
+    with stage.time(stage="load"):
+        content, user_id, previous = await asyncio.to_thread(_load_draft, draft_id)
+    with stage.time(stage="similarity"):
+        similarity = similarity_index.query(content, exclude_user_id=user_id, exclude_draft_id=draft_id)
+    with stage.time(stage="analysis"):
+        result = await run_integrity_check_async(content, language, similarity.score, previous)
+    with stage.time(stage="save"):
+        await asyncio.to_thread(_save_result, draft_id, result, similarity.matches, language)
+
+
+async def stream_check(draft_id: int, language: str = "en") -> AsyncIterator[tuple[str, dict]]:
+    """
+    check_draft as (event, data) pairs: "similarity" first, then the events
+    of stream_integrity_check. The final "result" is yielded once it has
+    been saved, so a client that stops listening early leaves the draft as it was.
+    """
+    stage = metrics.CHECK_STAGE_DURATION
+    started = time.perf_counter()
+    with stage.time(stage="load"):
+        content, user_id, previous = await asyncio.to_thread(_load_draft, draft_id)
+    with stage.time(stage="similarity"):
+        similarity = similarity_index.query(content, exclude_user_id=user_id, exclude_draft_id=draft_id)
+    yield "similarity", {"similarity_score": similarity.score, "similarity_matches": similarity.matches}
+
+    result = None
+    first_scores = True
+    async for event, data in stream_integrity_check(content, language, similarity.score, previous):
+        if event == "result":
+            result = data
+            continue
+        if event == "scores" and first_scores:
+            first_scores = False
+            stage.observe(time.perf_counter() - started, stage="first_scores")
+        yield event, data
+    stage.observe(time.perf_counter() - started, stage="streamed")
+
+    with stage.time(stage="save"):
+        await asyncio.to_thread(_save_result, draft_id, result, similarity.matches, language)
+    yield "result", result
+
+
+def _load_student_drafts(draft_ids: list[int]) -> dict[int, tuple[str, str, int]]:
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(models.Draft.id, models.Draft.content, models.Draft.language, models.Assignment.user_id)
+            .join(models.Assignment)
+            .join(models.User, models.Assignment.user_id == models.User.id)
+            .filter(models.Draft.id.in_(draft_ids), models.User.role == "student")
+            .all()
+        )
+        return {row.id: (row.content, row.language or "en", row.user_id) for row in rows}
+    finally:
+        db.close()
+
+
+def _save_results(results: dict[int, dict], matches: dict[int, list[dict]], languages: dict[int, str]) -> None:
+    """Write every result in a single transaction."""
+    db = SessionLocal()
+    try:
+        drafts = db.query(models.Draft).filter(models.Draft.id.in_(list(results))).all()
+        for draft in drafts:
+            apply_check_result(draft, results[draft.id], matches[draft.id], languages[draft.id])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def check_drafts_bulk(draft_ids: list[int], language: Optional[str] = None) -> tuple[dict[int, dict], list[int]]:
+    """
+    Re-check many student drafts with as few LLM round trips as possible.
+    `language` overrides each draft's own language when given.
+    Returns (results by draft id, ids that were not found).
+    """
+    drafts = await asyncio.to_thread(_load_student_drafts, draft_ids)
+    missing = [draft_id for draft_id in draft_ids if draft_id not in drafts]
+
+    items: dict[int, tuple[str, str]] = {}
+    scores: dict[int, float] = {}
+    matches: dict[int, list[dict]] = {}
+    for draft_id, (content, draft_language, user_id) in drafts.items():
+        similarity = similarity_index.query(content, exclude_user_id=user_id, exclude_draft_id=draft_id)
+        items[draft_id] = (content, language or draft_language)
+        scores[draft_id] = similarity.score
+        matches[draft_id] = similarity.matches
+
+    results = await run_integrity_check_batch_async(items, scores)
+    languages = {draft_id: lang for draft_id, (_, lang) in items.items()}
+    await asyncio.to_thread(_save_results, results, matches, languages)
+    return results, missing
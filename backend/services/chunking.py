@@ -0,0 +1,119 @@
+"""
+Chunking – splits long submissions into model-sized pieces
+Extracted documents are cut on their "Page N:" / "Slide N:" markers, plain
+text on blank-line paragraphs; units are then packed greedily into chunks of
+at most CHUNK_CHARS so each chunk is one LLM call.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+
+CHUNK_CHARS = int(os.getenv("CHUNK_CHARS", "6000"))
+MAX_CHUNKS = int(os.getenv("MAX_CHUNKS", "40"))
+
+_MARKER_RE = re.compile(r"^(Page|Slide) (\d+):$", re.MULTILINE)
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class Chunk:
+    index: int
+    label: str   # "Pages 3-5", "Slide 2", "Part 4"
+    text: str
+
+
+@dataclass
+class _Unit:
+    kind: str    # Page | Slide | Part
+    number: int
+    text: str
+
+
+def _units(text: str) -> list[_Unit]:
+    markers = list(_MARKER_RE.finditer(text))
+    if markers:
+        units = []
+        preamble = text[:markers[0].start()].strip()
+        if preamble:
+            units.append(_Unit("Part", 0, preamble))
+        for i, m in enumerate(markers):
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+            units.append(_Unit(m.group(1), int(m.group(2)), text[m.start():end].strip()))
+        return units
+    return [_Unit("Part", i, p) for i, p in enumerate(split_paragraphs(text), 1)]
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Blank-line separated paragraphs; an extracted page without blank lines is one paragraph."""
+    return [p.strip() for p in _PARAGRAPH_RE.split(text) if p.strip()]
+
+
+def _split_oversized(text: str, limit: int) -> list[str]:
+    """Break one unit that is larger than a chunk on paragraphs, then sentences, then hard."""
+    pieces: list[str] = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        parts = [paragraph] if len(paragraph) <= limit else _SENTENCE_RE.split(paragraph)
+        for part in parts:
+            while len(part) > limit:
+                pieces.append(part[:limit])
+                part = part[limit:]
+            if part.strip():
+                pieces.append(part)
+
+    merged: list[str] = []
+    for piece in pieces:
+        if merged and len(merged[-1]) + len(piece) + 2 <= limit:
+            merged[-1] = f"{merged[-1]}\n\n{piece}"
+        else:
+            merged.append(piece)
+    return merged
+
+
+def _label(units: list[_Unit]) -> str:
+    kind = units[0].kind
+    if any(u.kind != kind for u in units):
+        kind = "Part"
+    first, last = units[0].number, units[-1].number
+    if first == last:
+        return f"{kind} {first}"
+    return f"{kind}s {first}-{last}"
+
+
+def split_document(text: str, limit: int = CHUNK_CHARS) -> list[Chunk]:
+    """
+    Chunks in document order. Text that fits in one chunk comes back whole.
+    Documents needing more than MAX_CHUNKS chunks are sampled evenly, so
+    cost stays bounded while every part of the document is still represented.
+    """
+    if len(text) <= limit:
+        return [Chunk(0, "Full text", text)]
+    text = text.strip()
+
+    groups: list[tuple[list[_Unit], str]] = []
+    current: list[_Unit] = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            groups.append((current, "\n\n".join(u.text for u in current)))
+        current, size = [], 0
+
+    for unit in _units(text):
+        if len(unit.text) > limit:
+            flush()
+            for piece in _split_oversized(unit.text, limit):
+                groups.append(([unit], piece))
+            continue
+        if current and size + len(unit.text) + 2 > limit:
+            flush()
+        current.append(unit)
+        size += len(unit.text) + 2
+    flush()
+
+    if len(groups) > MAX_CHUNKS:
+        step = len(groups) / MAX_CHUNKS
+        groups = [groups[int(i * step)] for i in range(MAX_CHUNKS)]
+    return [Chunk(i, _label(units), body) for i, (units, body) in enumerate(groups)]
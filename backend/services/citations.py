@@ -0,0 +1,215 @@
+"""
+Citations – local citation and reference analysis
+Finds in-text citations (APA, MLA, IEEE / numeric), reference sections,
+DOIs and URLs, and the passages that usually need a source: quotations,
+statistics and attributed claims. Passages without a citation in the same
+sentence are reported with their character positions. One pass of regular
+expressions per sentence, so it runs in linear time and needs no LLM call.
+"""
+
+import re
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+NO_FINDINGS = "No missing citations detected"  # the frontend hides this exact text
+MAX_LISTED = 5
+EXCERPT_CHARS = 80
+
+# ─── Patterns ────────────────────────────────────────────────────────────────
+
+_NAME = r"[A-Z][A-Za-z'’\-]+"
+_AUTHORS = rf"{_NAME}(?: et al\.?|,? (?:&|and) {_NAME})?"
+_YEAR = r"(?:1[5-9]\d\d|20\d\d)[a-z]?|n\.d\."
+
+STYLE_PATTERNS = {
+    # (Smith, 2020) · (Smith & Lee, 2020, p. 4) · (see Smith et al., 2019; Lee, 2021) · Smith (2020)
+    "APA": re.compile(
+        rf"\((?:see |e\.g\., )?{_AUTHORS},? (?:{_YEAR})(?:, pp?\. ?\d+(?:[-–]\d+)?)?"
+        rf"(?:; ?{_AUTHORS},? (?:{_YEAR}))*\)"
+        rf"|\b{_AUTHORS} \((?:{_YEAR})\)"
+    ),
+    # (Smith 45) · (Smith and Lee 45-47)
+    "MLA": re.compile(rf"\({_AUTHORS} \d{{1,4}}(?:[-–]\d{{1,4}})?\)"),
+    # [3] · [1, 4] · [2–5]
+    "IEEE": re.compile(r"\[\d{1,3}(?:\s*[,–-]\s*\d{1,3})*\]"),
+    # superscript-style markers written inline: word^12 or ¹²
+    "numeric": re.compile(r"(?<=[A-Za-z.,])(?:\^\d{1,3}|[¹²³⁴⁵⁶⁷⁸⁹⁰]+)"),
+}
+DOI_RE = re.compile(r"\b10\.\d{4,9}/[^\s\"<>]+[^\s\"<>.,;)]")
+URL_RE = re.compile(r"\bhttps?://[^\s<>\"')\]]+|\bwww\.[^\s<>\"')\]]+")
+
+REFERENCE_HEADING_RE = re.compile(
+    r"^[ \t]*(?:references?|reference list|bibliography|works cited|sources|citations)[ \t]*:?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+# Quotations of four words or more; shorter ones are usually scare quotes
+QUOTE_RE = re.compile(r"[\"“]([^\"“”\n]{3,}?)[\"”]")
+STATISTIC_RE = re.compile(
+    r"\b\d+(?:\.\d+)?\s?(?:%|percent\b|per cent\b)"
+    r"|\b\d{1,3}(?:,\d{3})+\b"
+    r"|\b\d+(?:\.\d+)?\s(?:million|billion|trillion)\b"
+    r"|\b(?:one|two|three|four|five|\d+) (?:in|out of) (?:every )?(?:\d+|ten|five|three|four)\b"
+    r"|\b\d+(?:\.\d+)?(?:-fold| times (?:more|less|higher|lower|as))",
+    re.IGNORECASE,
+)
+CLAIM_RE = re.compile(
+    r"(?i:\baccording to\b"
+    r"|\b(?:studies|research|surveys|experts|scientists|researchers|scholars|data|evidence|statistics)"
+    r" (?:show|shows|showed|suggest|suggests|suggested|indicate|indicates|found|prove|proves|proved|confirm|confirms)\b"
+    r"|\b(?:a|the|one) (?:recent |new |\d{4} )?(?:study|survey|report|paper|analysis) (?:by|from|found|shows|showed|suggests)\b"
+    r"|\bit (?:has been|is) (?:widely )?(?:shown|proven|reported|estimated|found|documented)\b)"
+    rf"|\b{_NAME} (?:argues|argued|claims|claimed|states|stated|found|notes|noted|writes|wrote|reports|reported) that\b"
+)
+
+_ABBREVIATIONS = frozenset("al e.g i.e etc fig figs vol pp p no dr mr mrs ms prof vs cf ed eds approx".split())
+_BOUNDARY_RE = re.compile(r"[.!?]+[\"”')\]]*\s+|\n\s*\n")
+
+
+# ─── Report ──────────────────────────────────────────────────────────────────
+
+@dataclass
+class Finding:
+    kind: str      # quote | statistic | claim
+    start: int     # character offsets of the sentence in the analysed text
+    end: int
+    excerpt: str
+
+
+@dataclass
+class CitationReport:
+    style: str                          # dominant in-text style, "mixed", or "none"
+    citation_count: int
+    styles: dict = field(default_factory=dict)
+    reference_section: bool = False
+    reference_entries: int = 0
+    dois: list = field(default_factory=list)
+    urls: list = field(default_factory=list)
+    uncited: list = field(default_factory=list)   # Finding dicts, in text order
+    cited_passages: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def sentences(text: str, start: int = 0, end: Optional[int] = None):
+    """(start, end) offsets of sentences in text[start:end]; abbreviations and initials do not end one."""
+    end = len(text) if end is None else end
+    begin = start
+    for match in _BOUNDARY_RE.finditer(text, start, end):
+        if "\n" not in match.group() and match.group()[0] == ".":
+            # Only the token just before the boundary matters; never rescan the whole sentence
+            space = max(text.rfind(" ", begin, match.start()), text.rfind("\n", begin, match.start()), begin - 1)
+            word = re.search(r"([A-Za-z.]+)$", text[space + 1:match.start()])
+            token = word.group(1).lower().rstrip(".") if word else ""
+            if token in _ABBREVIATIONS or (len(token) == 1 and token.isalpha()):
+                continue
+        stop = match.start() + len(match.group().rstrip())
+        if text[begin:stop].strip():
+            yield begin, stop
+        begin = match.end()
+    if text[begin:end].strip():
+        yield begin, end
+
+
+def _reference_start(text: str) -> int:
+    """Offset of the last reference-section heading, or len(text) if there is none."""
+    heading = None
+    for heading in REFERENCE_HEADING_RE.finditer(text):
+        pass
+    return heading.start() if heading else len(text)
+
+
+def _excerpt(text: str) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= EXCERPT_CHARS else text[:EXCERPT_CHARS - 1].rstrip() + "…"
+
+
+def _needs_citation(sentence: str) -> str:
+    """The kind of passage that calls for a source, or "" for none."""
+    for quote in QUOTE_RE.finditer(sentence):
+        if len(quote.group(1).split()) >= 4:
+            return "quote"
+    if STATISTIC_RE.search(sentence):
+        return "statistic"
+    if CLAIM_RE.search(sentence):
+        return "claim"
+    return ""
+
+
+def analyze(text: str) -> CitationReport:
+    body_end = _reference_start(text)
+    references = text[body_end:]
+    body = text[:body_end]
+
+    styles: Counter = Counter()
+    uncited: list[Finding] = []
+    cited_passages = 0
+    for start, end in sentences(body):
+        sentence = body[start:end]
+        cited = False
+        for style, pattern in STYLE_PATTERNS.items():
+            hits = len(pattern.findall(sentence))
+            if hits:
+                styles[style] += hits
+                cited = True
+        cited = cited or bool(DOI_RE.search(sentence) or URL_RE.search(sentence))
+        kind = _needs_citation(sentence)
+        if kind and cited:
+            cited_passages += 1
+        elif kind:
+            uncited.append(Finding(kind, start, end, _excerpt(sentence)))
+
+    entries = [line for line in references.splitlines()[1:] if line.strip()] if body_end < len(text) else []
+    total = sum(styles.values())
+    if not total:
+        style = "none"
+    else:
+        dominant, count = styles.most_common(1)[0]
+        style = dominant if count >= 0.8 * total else "mixed"
+
+    return CitationReport(
+        style=style,
+        citation_count=total,
+        styles=dict(styles),
+        reference_section=body_end < len(text),
+        reference_entries=len(entries),
+        dois=sorted(set(DOI_RE.findall(text))),
+        urls=sorted(set(URL_RE.findall(text))),
+        uncited=[asdict(f) for f in uncited],
+        cited_passages=cited_passages,
+    )
+
+
+# ─── Summary text ────────────────────────────────────────────────────────────
+
+_KIND_LABELS = {"quote": "Quotation", "statistic": "Statistic", "claim": "Attributed claim"}
+
+
+def summarize(report: CitationReport) -> str:
+    """The student-facing missing_citations text."""
+    lines = []
+    if report.uncited:
+        count = len(report.uncited)
+        lines.append(f"{count} passage{'s' if count != 1 else ''} may need a citation:")
+        for finding in report.uncited[:MAX_LISTED]:
+            lines.append(
+                f"- {_KIND_LABELS[finding['kind']]} (characters {finding['start']}–{finding['end']}): "
+                f"{finding['excerpt']}"
+            )
+        if count > MAX_LISTED:
+            lines.append(f"- …and {count - MAX_LISTED} more")
+    if report.style == "mixed":
+        lines.append(f"In-text citations mix styles ({', '.join(sorted(report.styles))}); pick one and use it throughout.")
+    if report.citation_count and not report.reference_section and not report.urls and not report.dois:
+        lines.append("In-text citations were found but no reference list; add one at the end.")
+    if report.reference_section and not report.citation_count:
+        lines.append("There is a reference list but no in-text citations point to it.")
+    return "\n".join(lines) or NO_FINDINGS
+
+
+def citation_fields(text: str) -> dict:
+    """The result fields the analyzer owns: missing_citations and citation_report."""
+    report = analyze(text)
+    return {"missing_citations": summarize(report), "citation_report": report.as_dict()}
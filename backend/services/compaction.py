@@ -0,0 +1,186 @@
+"""
+Compaction – trims extracted documents before they are sent to the LLM
+Extraction leaves boilerplate in the text: "Page N:" / "Slide N:" markers,
+placeholders for pages without text, running headers and footers repeated
+on every page, page numbers and ragged whitespace. All of it is billed as
+prompt tokens. compact_document() removes it while keeping the markers that
+chunking labels chunks by; prompt_text() drops those too and holds each
+request to PROMPT_TOKEN_BUDGET. Tokens are estimated locally.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from services.chunking import CHUNK_CHARS
+
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "1") == "1"
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))  # submission tokens per LLM request
+
+BOILERPLATE_MIN_PAGES = 3      # fewer pages than this: nothing counts as a running header
+BOILERPLATE_PAGE_SHARE = 0.5   # a line on at least this share of pages is a running header or footer
+EDGE_LINES = 3                 # headers and footers are looked for in a page's first and last lines
+MAX_BOILERPLATE_CHARS = 120
+
+_MARKER_RE = re.compile(r"^(?:Page|Slide) \d+:$", re.MULTILINE)
+# The placeholders file_service writes for pages and slides without text
+_PLACEHOLDER_RE = re.compile(r"^\[No (?:extractable )?text[^\]\n]*\]$")
+_PAGE_NUMBER_RE = re.compile(
+    r"^[-–—\s]*(?:(?:page|p\.|slide)\s*)?\d{1,4}(?:\s*(?:/|of)\s*\d{1,4})?[-–—\s]*$", re.IGNORECASE
+)
+_INVISIBLE_RE = re.compile(r"[\u00ad\u200b\u2060\ufeff]")  # keeps ZWJ / ZWNJ, which Devanagari needs
+_SPACES_RE = re.compile(r"[ \t\u00a0\u2000-\u200a\u202f\u3000]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_DIGITS_RE = re.compile(r"\d+")
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\W\d_]+|\S")
+_BREAK_RE = re.compile(r"\n\s*\n|(?<=[.!?])\s+")
+
+
+# ─── Token estimate ──────────────────────────────────────────────────────────
+
+def count_tokens(text: str) -> int:
+    """
+    Estimated BPE tokens (close to tiktoken's cl100k for English prose):
+    common words are one token, long words one per six letters, numbers one
+    per three digits, non-Latin scripts about one per two characters and
+    every punctuation mark one.
+    """
+    tokens = 0
+    for match in _TOKEN_RE.finditer(text):
+        piece = match.group()
+        if piece.isascii() and piece.isalpha():
+            tokens += 1 + (len(piece) - 1) // 6
+        elif piece.isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        elif len(piece) > 1:
+            tokens += math.ceil(len(piece) / 2)
+        else:
+            tokens += 1
+    return tokens
+
+
+# ─── Document compaction ─────────────────────────────────────────────────────
+
+@dataclass
+class Compaction:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    boilerplate_lines: int = 0   # header, footer, page-number and placeholder lines removed
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+def _pages(text: str) -> list[tuple[str, list[str]]]:
+    """(marker line or "", lines) per page; text before the first marker is a page without a marker."""
+    pages = []
+    start, marker = 0, ""
+    for match in _MARKER_RE.finditer(text):
+        pages.append((marker, text[start:match.start()].split("\n")))
+        start, marker = match.end(), match.group()
+    pages.append((marker, text[start:].split("\n")))
+    return [(m, lines) for m, lines in pages if m or any(line.strip() for line in lines)]
+
+
+def _normalize_line(line: str) -> str:
+    """Header/footer identity: digits vary from page to page ("Page 3 of 40"), the rest does not."""
+    return _DIGITS_RE.sub("#", _SPACES_RE.sub(" ", line).strip().lower())
+
+
+def _edges(lines: list[str]) -> list[int]:
+    content = [i for i, line in enumerate(lines) if line.strip()]
+    return sorted(set(content[:EDGE_LINES] + content[-EDGE_LINES:]))
+
+
+def _running_lines(pages: list[tuple[str, list[str]]]) -> set[str]:
+    """Normalized lines that open or close enough pages to be running headers or footers."""
+    if len(pages) < BOILERPLATE_MIN_PAGES:
+        return set()
+    seen: Counter = Counter()
+    for _, lines in pages:
+        seen.update({
+            _normalize_line(lines[i]) for i in _edges(lines) if len(lines[i].strip()) <= MAX_BOILERPLATE_CHARS
+        })
+    threshold = max(BOILERPLATE_MIN_PAGES, math.ceil(len(pages) * BOILERPLATE_PAGE_SHARE))
+    return {line for line, count in seen.items() if count >= threshold}
+
+
+def _normalize_whitespace(text: str) -> str:
+    text = _INVISIBLE_RE.sub("", text)
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def compact_document(text: str) -> Compaction:
+    """
+    Remove extraction boilerplate and normalize whitespace. Page and slide
+    markers stay (chunk labels come from them) unless their page ends up empty.
+    """
+    before = count_tokens(text)
+    if not COMPACTION_ENABLED:
+        return Compaction(text, before, before)
+
+    pages = _pages(text.replace("\r\n", "\n").replace("\r", "\n"))
+    running = _running_lines(pages)
+    removed = 0
+    parts = []
+    for marker, lines in pages:
+        drop = {i for i, line in enumerate(lines) if _PLACEHOLDER_RE.match(line.strip())}
+        edges = {i for i in _edges(lines) if _normalize_line(lines[i]) in running or _PAGE_NUMBER_RE.match(lines[i])}
+        if any(line.strip() and i not in drop | edges for i, line in enumerate(lines)):
+            drop |= edges  # a page made only of "boilerplate" is content after all
+        removed += len(drop)
+        body = _normalize_whitespace("\n".join(line for i, line in enumerate(lines) if i not in drop))
+        if body:
+            parts.append(f"{marker}\n{body}" if marker else body)
+
+    compacted = "\n\n".join(parts)
+    if not compacted:
+        return Compaction(text, before, before)  # nothing but boilerplate: leave it to the caller as is
+    return Compaction(compacted, before, count_tokens(compacted), removed)
+
+
+def chunk_chars(text: str) -> int:
+    """
+    Chunk size in characters for this text: CHUNK_CHARS, or less when the
+    text is token-dense (e.g. Devanagari) so a chunk stays within the budget.
+    """
+    tokens = count_tokens(text)
+    if not tokens:
+        return CHUNK_CHARS
+    return max(500, min(CHUNK_CHARS, int(PROMPT_TOKEN_BUDGET * len(text) / tokens)))
+
+
+# ─── Prompt text ─────────────────────────────────────────────────────────────
+
+def fit_budget(text: str, budget: int = PROMPT_TOKEN_BUDGET) -> tuple[str, bool]:
+    """(text cut at a sentence or paragraph end to fit `budget` tokens, whether it was cut)."""
+    tokens = count_tokens(text)
+    if tokens <= budget:
+        return text, False
+    limit = int(len(text) * budget / tokens)
+    while limit > 0:
+        cut = text[:limit]
+        ends = [m.start() for m in _BREAK_RE.finditer(cut)]
+        if ends and ends[-1] > limit // 2:
+            cut = cut[:ends[-1]]
+        cut = cut.rstrip()
+        if count_tokens(cut) <= budget:
+            return cut, True
+        limit = int(limit * 0.9)
+    return "", True
+
+
+def strip_markers(text: str) -> str:
+    return _BLANK_LINES_RE.sub("\n\n", _MARKER_RE.sub("", text)).strip()
+
+
+def prompt_text(text: str) -> tuple[str, bool]:
+    """(what the model is sent for a chunk: markers removed, within the budget; whether it was cut)."""
+    if COMPACTION_ENABLED:
+        text = strip_markers(text) or text
+    return fit_budget(text)
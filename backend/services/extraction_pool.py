@@ -0,0 +1,113 @@
+"""
+Extraction Pool – runs document extraction in worker processes
+Parsing (pdfplumber layout analysis above all) is CPU-bound, so it is kept
+off the event loop and out of the GIL. Large PDFs are split into page ranges
+that are extracted on several cores at once and reassembled in page order.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from services import metrics
+from services.file_service import (
+    ExtractionResult,
+    build_pdf_result,
+    extract_document,
+    extract_pdf_pages,
+    file_type_for,
+    pdf_page_count,
+    run_measured,
+)
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", str(min(os.cpu_count() or 2, 4))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "24"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "12"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared pool, created on first use. None when EXTRACT_WORKERS=0."""
+    global _pool
+    if _pool is None and EXTRACT_WORKERS > 0:
+        # spawn: forking a process that already runs threads (uvicorn, DB pool) is unsafe
+        _pool = ProcessPoolExecutor(
+            max_workers=EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _run(func, *args):
+    pool = get_pool()
+    metrics.EXTRACT_POOL_PENDING.inc()
+    try:
+        if pool is None:
+            return await asyncio.to_thread(func, *args)
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    finally:
+        metrics.EXTRACT_POOL_PENDING.dec()
+
+
+def _page_count(result) -> int:
+    if isinstance(result, ExtractionResult):
+        return result.page_count
+    return result if isinstance(result, int) else len(result)
+
+
+async def _measured(stage: str, func, *args):
+    """_run, recording time spent waiting for and inside the worker, per engine."""
+    started = time.perf_counter()
+    result, busy, engines = await _run(run_measured, func, *args)
+    metrics.EXTRACT_QUEUE_WAIT.observe(max(time.perf_counter() - started - busy, 0.0))
+    metrics.EXTRACT_STAGE_DURATION.observe(
+        busy, stage=stage, engine="+".join(sorted(engines)) or "none",
+        pages=metrics.page_bucket(_page_count(result)),
+    )
+    for engine, pages in engines.items():
+        metrics.EXTRACT_PAGES.inc(pages, engine=engine)
+    return result
+
+
+async def extract_document_async(path: str, filename: str) -> ExtractionResult:
+    """
+    extract_document off the event loop. PDFs with at least
+    PDF_PARALLEL_MIN_PAGES pages are extracted in parallel page ranges.
+    """
+    started = time.perf_counter()
+    result = await _extract(path, filename)
+    metrics.EXTRACT_DURATION.observe(
+        time.perf_counter() - started,
+        file_type=file_type_for(filename) or "unknown", pages=metrics.page_bucket(result.page_count),
+    )
+    return result
+
+
+async def _extract(path: str, filename: str) -> ExtractionResult:
+    if filename.lower().endswith(".pdf") and EXTRACT_WORKERS > 1:
+        try:
+            total = await _measured("page_count", pdf_page_count, path)
+        except Exception:
+            total = 0  # let the regular path produce the user-facing error
+        if total >= PDF_PARALLEL_MIN_PAGES:
+            ranges = [(start, min(start + PDF_PAGES_PER_TASK, total)) for start in range(0, total, PDF_PAGES_PER_TASK)]
+            chunks = await asyncio.gather(
+                *(_measured("pdf_pages", extract_pdf_pages, path, start, end) for start, end in ranges)
+            )
+            return build_pdf_result([page for chunk in chunks for page in chunk])
+
+    return await _measured("document", extract_document, path, filename)
@@ -0,0 +1,72 @@
+"""
+Extraction Store – content-addressed cache of extracted documents
+Uploads are keyed by the sha256 of their bytes. A file seen before (a
+handed-out template, a resubmitted PDF) is served from `extracted_documents`
+without being parsed again, and every File row with those bytes points at
+the one stored copy of the text.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from services.file_service import ExtractionResult
+import models
+
+
+def _to_result(doc: models.ExtractedDocument) -> ExtractionResult:
+    return ExtractionResult(
+        text=doc.text,
+        file_type=doc.file_type,
+        page_count=doc.page_count,
+        scanned=bool(doc.scanned),
+        warning=doc.warning or "",
+    )
+
+
+def lookup(db: Session, content_hash: str, file_type: str) -> Optional[ExtractionResult]:
+    """
+    The stored extraction for these bytes, or None. The same bytes uploaded
+    under another extension are extracted differently, so the type must match.
+    """
+    doc = db.get(models.ExtractedDocument, content_hash)
+    if doc is None or doc.file_type != file_type:
+        return None
+    db.query(models.ExtractedDocument).filter_by(content_hash=content_hash).update(
+        {
+            models.ExtractedDocument.hits: models.ExtractedDocument.hits + 1,
+            models.ExtractedDocument.last_used_at: datetime.utcnow(),
+        },
+        synchronize_session=False,
+    )
+    return _to_result(doc)
+
+
+def store(db: Session, content_hash: str, result: ExtractionResult, size_bytes: int) -> bool:
+    """
+    Save a fresh extraction under its hash. Returns True if a File may
+    reference the stored row, False if the hash is held by the same bytes
+    under another extension (the caller then keeps its own copy of the text).
+    The caller commits.
+    """
+    existing = db.get(models.ExtractedDocument, content_hash)
+    if existing is not None:
+        return existing.file_type == result.file_type
+    try:
+        with db.begin_nested():
+            db.add(models.ExtractedDocument(
+                content_hash=content_hash,
+                file_type=result.file_type,
+                text=result.text,
+                page_count=result.page_count,
+                scanned=result.scanned,
+                warning=result.warning,
+                size_bytes=size_bytes,
+            ))
+    except IntegrityError:
+        # Another upload stored the same bytes first
+        existing = db.get(models.ExtractedDocument, content_hash)
+        return existing is not None and existing.file_type == result.file_type
+    return True
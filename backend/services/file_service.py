@@ -1,12 +1,19 @@
 """
 Document Intelligence – Text Extraction Service
-Supports: PDF (pdfplumber primary, PyMuPDF fallback), PPTX, PPT, TXT
+Supports: PDF (PyMuPDF fast path, pdfplumber for hard pages), PPTX, PPT, TXT
+Documents may be passed as bytes or as a path; paths are opened directly by
+the parsers, so large uploads never need to be held in memory whole.
 """
 
 import io
 import logging
+import mmap
+import os
+import re
+import time
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Tuple
+from typing import Any, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +29,47 @@ class ExtractionResult:
     warning: str        # Human-readable warning, empty if clean
 
 
+Source = Union[bytes, str, "os.PathLike[str]"]
+
+
+def _is_empty(source: Source) -> bool:
+    if isinstance(source, (bytes, bytearray)):
+        return not source
+    return os.path.getsize(source) == 0
+
+
+def _open_source(source: Source):
+    """A path or in-memory stream suitable for pdfplumber / python-pptx."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return os.fspath(source)
+
+
+# ─── Engine accounting ───────────────────────────────────────────────────────
+# Pages handled by each engine during one measured call, so the caller (often
+# in another process) can report where extraction time went.
+
+_engine_pages: ContextVar[Optional[dict]] = ContextVar("engine_pages", default=None)
+
+
+def _count_pages(engine: str, pages: int) -> None:
+    counts = _engine_pages.get()
+    if counts is not None:
+        counts[engine] = counts.get(engine, 0) + pages
+
+
+def run_measured(func, *args) -> Tuple[Any, float, dict]:
+    """(func(*args), seconds it took, pages per engine). Picklable, for pool workers."""
+    counts: dict = {}
+    token = _engine_pages.set(counts)
+    started = time.perf_counter()
+    try:
+        result = func(*args)
+    finally:
+        _engine_pages.reset(token)
+    return result, time.perf_counter() - started, counts
+
+
 # ─── Public entry point ──────────────────────────────────────────────────────
 
 def extract_text_from_file(content: bytes, filename: str) -> Tuple[str, str]:
@@ -45,11 +93,21 @@ def extract_text_from_file(content: bytes, filename: str) -> Tuple[str, str]:
     return result.text, result.file_type
 
 
-def extract_document(content: bytes, filename: str) -> ExtractionResult:
+SUPPORTED_TYPES = ("pdf", "pptx", "ppt", "txt")
+
+
+def file_type_for(filename: str) -> Optional[str]:
+    """The file_type an upload will be extracted as, or None if unsupported."""
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    return ext if ext in SUPPORTED_TYPES else None
+
+
+def extract_document(content: Source, filename: str) -> ExtractionResult:
     """
     Full extraction returning a rich ExtractionResult.
+    `content` is the raw bytes or a path to the uploaded file.
     """
-    if not content:
+    if _is_empty(content):
         raise ValueError("The uploaded file is empty. Please upload a file with content.")
 
     lower = filename.lower()
@@ -72,152 +130,210 @@ def extract_document(content: bytes, filename: str) -> ExtractionResult:
 
 # ─── PDF extraction ──────────────────────────────────────────────────────────
 
-def _extract_pdf(content: bytes) -> ExtractionResult:
+SCANNED_PAGE_PLACEHOLDER = "[No extractable text — this page may be an image or scan]"
+
+
+PDF_ENGINE = os.getenv("PDF_ENGINE", "auto")  # auto | pymupdf | pdfplumber
+PDF_MIN_PAGE_QUALITY = float(os.getenv("PDF_MIN_PAGE_QUALITY", "0.85"))
+
+_CID_RE = re.compile(r"\(cid:\d+\)")
+
+
+def _extract_pdf(content: Source) -> ExtractionResult:
     """
-    Primary: pdfplumber  →  Fallback: PyMuPDF (fitz)
+    auto: PyMuPDF (fast) first, pdfplumber only for pages that came out poorly.
     Detects scanned / image-only PDFs.
     """
-    # ── pdfplumber (primary) ──────────────────────────────────────
-    try:
-        import pdfplumber
+    return build_pdf_result(extract_pdf_pages(content))
 
-        parts: list[str] = []
-        scanned_pages: list[int] = []
-        total = 0
 
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            total = len(pdf.pages)
+def page_quality(text: str) -> float:
+    """
+    Rough 0-1 score of how usable one page's extracted text is. Penalises
+    empty pages, undecodable glyphs (replacement / private-use characters,
+    "(cid:N)" tokens, control characters) and runs of words with the spaces
+    dropped, which is how broken font encodings usually show up.
+    """
+    if not text:
+        return 0.0
+    length = len(text)
+    garbled = sum(len(m) for m in _CID_RE.findall(text))
+    for ch in text:
+        code = ord(ch)
+        if ch == "\ufffd" or 0xE000 <= code <= 0xF8FF or (code < 32 and ch not in "\n\t\r"):
+            garbled += 1
+    score = 1.0 - min(garbled / length, 1.0) * 4
+
+    words = text.split()
+    if length >= 80 and words:
+        long_words = sum(len(w) for w in words if len(w) > 25)
+        score -= min(long_words / length, 1.0) * 2
+    return max(score, 0.0)
+
+
+def extract_pdf_pages(
+    content: Source,
+    start: int = 0,
+    end: Optional[int] = None,
+    engine: Optional[str] = None,
+) -> list[str]:
+    """
+    Text of pages [start, end) (0-based), one string per page, "" for pages
+    without selectable text. Lets large PDFs be split across processes.
+    `engine` (default PDF_ENGINE) forces "pymupdf" or "pdfplumber"; the other
+    engine is then only used if the first cannot open the file at all.
+    """
+    mode = engine or PDF_ENGINE
+    if mode == "pdfplumber":
+        return _with_fallback(content, start, end, _pdfplumber_pages, _pymupdf_pages)[0]
+    pages, used = _with_fallback(content, start, end, _pymupdf_pages, _pdfplumber_pages)
+    if mode == "pymupdf" or used is not _pymupdf_pages:
+        return pages
+
+    # ── auto: re-extract only the pages PyMuPDF handled badly ────
+    poor = [i for i, text in enumerate(pages) if page_quality(text) < PDF_MIN_PAGE_QUALITY]
+    if not poor:
+        return pages
+    try:
+        better = _pdfplumber_pages_at(content, [start + i for i in poor])
+    except Exception as plumber_err:
+        logger.warning("pdfplumber re-extraction failed (%s), keeping PyMuPDF text", plumber_err)
+        return pages
+    for i in poor:
+        text = better[start + i]
+        if page_quality(text) > page_quality(pages[i]):
+            pages[i] = text
+    return pages
 
-            if total == 0:
-                raise ValueError("This PDF has no pages.")
 
-            for i, page in enumerate(pdf.pages, 1):
-                raw = page.extract_text()
-                text = (raw or "").strip()
+def _with_fallback(content: Source, start: int, end: Optional[int], primary, fallback):
+    """(pages, engine function that produced them)."""
+    try:
+        return primary(content, start, end), primary
+    except ValueError:
+        raise
+    except Exception as primary_err:
+        logger.warning("%s failed (%s), trying fallback", primary.__name__, primary_err)
 
-                if text:
-                    parts.append(f"Page {i}:\n{text}")
-                else:
-                    scanned_pages.append(i)
-                    parts.append(
-                        f"Page {i}:\n[No extractable text — this page may be an image or scan]"
-                    )
+    try:
+        return fallback(content, start, end), fallback
+    except ValueError:
+        raise
+    except Exception as fallback_err:
+        logger.error("%s also failed: %s", fallback.__name__, fallback_err)
+        raise ValueError(
+            "Could not read this PDF. The file may be corrupted, password-protected, or in an "
+            "unsupported format. Please try a different file."
+        )
 
-        all_scanned = len(scanned_pages) == total
-        some_scanned = bool(scanned_pages) and not all_scanned
-        extracted = "\n\n".join(parts)
 
-        if all_scanned:
-            return ExtractionResult(
-                text=(
-                    "This appears to be a scanned document. OCR not enabled.\n\n"
-                    "Please copy and paste your text manually into the editor below, "
-                    "or use a PDF with selectable text."
-                ),
-                file_type="pdf",
-                page_count=total,
-                scanned=True,
-                warning="",
-            )
+def pdf_page_count(content: Source) -> int:
+    """Cheap page count (PyMuPDF only reads the page tree)."""
+    import fitz  # PyMuPDF
 
-        warning = (
-            f"Pages {', '.join(str(p) for p in scanned_pages)} appear to be scanned images "
-            "and could not be extracted."
-            if some_scanned
-            else ""
-        )
+    with _open_fitz(content) as doc:
+        return doc.page_count
 
-        return ExtractionResult(
-            text=extracted,
-            file_type="pdf",
-            page_count=total,
-            scanned=False,
-            warning=warning,
-        )
 
-    except ValueError:
-        raise
-    except Exception as plumber_err:
-        logger.warning("pdfplumber failed (%s), trying PyMuPDF fallback", plumber_err)
+def _open_fitz(content: Source):
+    import fitz  # PyMuPDF
 
-    # ── PyMuPDF fallback ─────────────────────────────────────────
-    try:
-        import fitz  # PyMuPDF
+    if isinstance(content, (bytes, bytearray)):
+        return fitz.open(stream=content, filetype="pdf")
+    return fitz.open(os.fspath(content), filetype="pdf")
 
-        parts: list[str] = []
-        scanned_pages: list[int] = []
 
-        doc = fitz.open(stream=content, filetype="pdf")
-        total = doc.page_count
+def _pdfplumber_pages(content: Source, start: int, end: Optional[int]) -> list[str]:
+    import pdfplumber
 
+    with pdfplumber.open(_open_source(content)) as pdf:
+        total = len(pdf.pages)
         if total == 0:
             raise ValueError("This PDF has no pages.")
+        pages = [
+            (pdf.pages[i].extract_text() or "").strip()
+            for i in range(start, min(end if end is not None else total, total))
+        ]
+    _count_pages("pdfplumber", len(pages))
+    return pages
 
-        for i in range(total):
-            page = doc[i]
-            text = page.get_text("text").strip()  # type: ignore[attr-defined]
-            page_num = i + 1
 
-            if text:
-                parts.append(f"Page {page_num}:\n{text}")
-            else:
-                scanned_pages.append(page_num)
-                parts.append(
-                    f"Page {page_num}:\n[No extractable text — this page may be an image or scan]"
-                )
-
-        doc.close()
+def _pdfplumber_pages_at(content: Source, indices: list[int]) -> dict[int, str]:
+    import pdfplumber
 
-        all_scanned = len(scanned_pages) == total
-        some_scanned = bool(scanned_pages) and not all_scanned
-        extracted = "\n\n".join(parts)
+    with pdfplumber.open(_open_source(content)) as pdf:
+        pages = {i: (pdf.pages[i].extract_text() or "").strip() for i in indices}
+    _count_pages("pdfplumber", len(pages))
+    return pages
 
-        if all_scanned:
-            return ExtractionResult(
-                text=(
-                    "This appears to be a scanned document. OCR not enabled.\n\n"
-                    "Please copy and paste your text manually into the editor below, "
-                    "or use a PDF with selectable text."
-                ),
-                file_type="pdf",
-                page_count=total,
-                scanned=True,
-                warning="",
-            )
-
-        warning = (
-            f"Pages {', '.join(str(p) for p in scanned_pages)} appear to be scanned images "
-            "and could not be extracted."
-            if some_scanned
-            else ""
-        )
 
+def _pymupdf_pages(content: Source, start: int, end: Optional[int]) -> list[str]:
+    with _open_fitz(content) as doc:
+        total = doc.page_count
+        if total == 0:
+            raise ValueError("This PDF has no pages.")
+        pages = [
+            doc[i].get_text("text").strip()  # type: ignore[attr-defined]
+            for i in range(start, min(end if end is not None else total, total))
+        ]
+    _count_pages("pymupdf", len(pages))
+    return pages
+
+
+def build_pdf_result(pages: list[str]) -> ExtractionResult:
+    """Assemble per-page texts (in order) into the structured ExtractionResult."""
+    total = len(pages)
+    parts: list[str] = []
+    scanned_pages: list[int] = []
+
+    for i, text in enumerate(pages, 1):
+        if text:
+            parts.append(f"Page {i}:\n{text}")
+        else:
+            scanned_pages.append(i)
+            parts.append(f"Page {i}:\n{SCANNED_PAGE_PLACEHOLDER}")
+
+    all_scanned = len(scanned_pages) == total
+    some_scanned = bool(scanned_pages) and not all_scanned
+    extracted = "\n\n".join(parts)
+
+    if all_scanned:
         return ExtractionResult(
-            text=extracted,
+            text=(
+                "This appears to be a scanned document. OCR not enabled.\n\n"
+                "Please copy and paste your text manually into the editor below, "
+                "or use a PDF with selectable text."
+            ),
             file_type="pdf",
             page_count=total,
-            scanned=False,
-            warning=warning,
+            scanned=True,
+            warning="",
         )
 
-    except ValueError:
-        raise
-    except Exception as fitz_err:
-        logger.error("PyMuPDF also failed: %s", fitz_err)
-        raise ValueError(
-            "Could not read this PDF. The file may be corrupted, password-protected, or in an "
-            "unsupported format. Please try a different file."
-        )
+    warning = (
+        f"Pages {', '.join(str(p) for p in scanned_pages)} appear to be scanned images "
+        "and could not be extracted."
+        if some_scanned
+        else ""
+    )
+
+    return ExtractionResult(
+        text=extracted,
+        file_type="pdf",
+        page_count=total,
+        scanned=False,
+        warning=warning,
+    )
 
 
 # ─── PPTX extraction ─────────────────────────────────────────────────────────
 
-def _extract_pptx(content: bytes) -> ExtractionResult:
+def _extract_pptx(content: Source) -> ExtractionResult:
     try:
         from pptx import Presentation
         from pptx.util import Pt  # noqa: F401 – ensure pptx is importable
 
-        prs = Presentation(io.BytesIO(content))
+        prs = Presentation(_open_source(content))
         slides = prs.slides
         total = len(slides)
 
@@ -251,6 +367,7 @@ def _extract_pptx(content: bytes) -> ExtractionResult:
                 empty_slides.append(i)
                 parts.append(f"Slide {i}:\n[No text content on this slide]")
 
+        _count_pages("python-pptx", total)
         extracted = "\n\n".join(parts)
         warning = (
             f"Slides {', '.join(str(s) for s in empty_slides)} had no text content."
@@ -275,7 +392,7 @@ def _extract_pptx(content: bytes) -> ExtractionResult:
         )
 
 
-def _extract_ppt(content: bytes) -> ExtractionResult:
+def _extract_ppt(content: Source) -> ExtractionResult:
     """
     Old binary .ppt format — attempt as pptx first (python-pptx can sometimes open them),
     then give a clear user-facing error.
@@ -293,14 +410,23 @@ def _extract_ppt(content: bytes) -> ExtractionResult:
 
 # ─── Plain text ──────────────────────────────────────────────────────────────
 
-def _extract_txt(content: bytes) -> ExtractionResult:
+def _extract_txt(content: Source) -> ExtractionResult:
+    if not isinstance(content, (bytes, bytearray)):
+        # Decode straight from a memory map instead of reading into a bytes copy first
+        with open(content, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return _extract_txt_buffer(mm)
+    return _extract_txt_buffer(content)
+
+
+def _extract_txt_buffer(content) -> ExtractionResult:
     try:
-        text = content.decode("utf-8", errors="replace").strip()
+        text = str(content, "utf-8", errors="replace").strip()
     except Exception:
-        text = content.decode("latin-1", errors="replace").strip()
+        text = str(content, "latin-1", errors="replace").strip()
 
     if not text:
         raise ValueError("This text file appears to be empty.")
+    _count_pages("text", 1)
 
     return ExtractionResult(
         text=text,
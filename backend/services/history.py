@@ -0,0 +1,56 @@
+"""
+History – support for the students' draft list endpoints
+A per-user change counter is bumped in the same transaction as every write
+to that user's drafts, so list endpoints can answer If-None-Match with 304
+from one primary-key lookup. Draft summaries (length, preview) are stored
+on the row; `backfill_summaries` fills them in for drafts that predate them.
+"""
+
+from datetime import datetime
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+
+
+def bump_version(db: Session, user_id: int) -> None:
+    """The caller commits."""
+    counter = models.UserChangeCounter
+    values = {counter.version: counter.version + 1, counter.updated_at: datetime.utcnow()}
+    query = db.query(counter).filter(counter.user_id == user_id)
+    if query.update(values, synchronize_session=False):
+        return
+    try:
+        with db.begin_nested():
+            db.add(counter(user_id=user_id, version=1, updated_at=datetime.utcnow()))
+    except IntegrityError:
+        # Another request created the row first
+        query.update(values, synchronize_session=False)
+
+
+def current_version(db: Session, user_id: int) -> int:
+    version = (
+        db.query(models.UserChangeCounter.version)
+        .filter(models.UserChangeCounter.user_id == user_id)
+        .scalar()
+    )
+    return version or 0
+
+
+def backfill_summaries(db: Session, batch_size: int = 500) -> int:
+    """Compute content_length / content_preview for drafts missing them. Returns drafts updated."""
+    updated = 0
+    while True:
+        drafts = (
+            db.query(models.Draft)
+            .filter(models.Draft.content_length.is_(None))
+            .limit(batch_size)
+            .all()
+        )
+        if not drafts:
+            return updated
+        for draft in drafts:
+            draft._summarize(draft.content or "")
+        db.commit()
+        updated += len(drafts)
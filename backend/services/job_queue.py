@@ -0,0 +1,325 @@
+"""
+Job Queue – persistent background queue for integrity checks
+Jobs live in the `check_jobs` table, so they survive restarts and can be
+drained by any process: the API process runs CHECK_WORKERS workers, and
+`python worker.py` runs a standalone pool with the API set to CHECK_WORKERS=0.
+A job checks one draft, or (kind "bulk") re-checks a list of drafts for an
+educator and stores the summary in `result`.
+A claimed job is leased: its worker refreshes updated_at every
+CHECK_HEARTBEAT_SECONDS, and only jobs whose lease is older than
+CHECK_LEASE_SECONDS (their process died) are requeued.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from services.check_service import check_draft, check_drafts_bulk, DraftNotFound
+from services import metrics
+import models
+
+logger = logging.getLogger(__name__)
+
+CHECK_WORKERS = int(os.getenv("CHECK_WORKERS", "4"))
+CHECK_QUEUE_MAX_DEPTH = int(os.getenv("CHECK_QUEUE_MAX_DEPTH", "1000"))
+CHECK_MAX_ATTEMPTS = int(os.getenv("CHECK_MAX_ATTEMPTS", "3"))
+CHECK_RETRY_BASE_SECONDS = float(os.getenv("CHECK_RETRY_BASE_SECONDS", "2"))
+CHECK_POLL_SECONDS = float(os.getenv("CHECK_POLL_SECONDS", "1"))
+CHECK_LEASE_SECONDS = float(os.getenv("CHECK_LEASE_SECONDS", "120"))
+CHECK_HEARTBEAT_SECONDS = float(os.getenv("CHECK_HEARTBEAT_SECONDS", str(CHECK_LEASE_SECONDS / 4)))
+
+ACTIVE_STATUSES = ("queued", "running")
+BULK_RESULT_FIELDS = ("similarity_score", "ai_probability", "risk_level", "learning_score")
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, workers: int = CHECK_WORKERS, max_depth: int = CHECK_QUEUE_MAX_DEPTH):
+        self.workers = workers
+        self.max_depth = max_depth
+        self._tasks: list[asyncio.Task] = []
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._wakeup: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ── Producer side ─────────────────────────────────────────────
+    def depth(self, db: Session) -> int:
+        return db.query(models.CheckJob).filter(models.CheckJob.status.in_(ACTIVE_STATUSES)).count()
+
+    def enqueue(self, db: Session, draft_id: int, user_id: int, language: str) -> models.CheckJob:
+        """
+        Queue a check, reusing an unfinished job for the same draft and language.
+        Raises QueueFull when CHECK_QUEUE_MAX_DEPTH jobs are already waiting.
+        """
+        existing = (
+            db.query(models.CheckJob)
+            .filter(
+                models.CheckJob.draft_id == draft_id,
+                models.CheckJob.language == language,
+                models.CheckJob.status.in_(ACTIVE_STATUSES),
+            )
+            .first()
+        )
+        if existing:
+            return existing
+        return self._add(db, models.CheckJob(kind="check", draft_id=draft_id, user_id=user_id, language=language))
+
+    def enqueue_bulk(
+        self, db: Session, draft_ids: list[int], user_id: int, language: Optional[str]
+    ) -> models.CheckJob:
+        """Queue one job re-checking all `draft_ids`. Raises QueueFull like enqueue()."""
+        payload = json.dumps({"draft_ids": draft_ids, "language": language})
+        return self._add(db, models.CheckJob(kind="bulk", user_id=user_id, payload=payload))
+
+    def _add(self, db: Session, job: models.CheckJob) -> models.CheckJob:
+        if self.depth(db) >= self.max_depth:
+            raise QueueFull()
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self._notify_workers()
+        return job
+
+    def _notify_workers(self) -> None:
+        # enqueue() runs in a threadpool worker for sync endpoints
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # ── Worker side ───────────────────────────────────────────────
+    def _recover(self) -> int:
+        """Requeue running jobs whose lease expired: their worker died mid-check."""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            recovered = (
+                db.query(models.CheckJob)
+                .filter(
+                    models.CheckJob.status == "running",
+                    models.CheckJob.updated_at < now - timedelta(seconds=CHECK_LEASE_SECONDS),
+                )
+                .update({"status": "queued", "lease_owner": None, "updated_at": now}, synchronize_session=False)
+            )
+            db.commit()
+            return recovered
+        finally:
+            db.close()
+
+    def _heartbeat(self, job_id: int) -> bool:
+        """Renew the lease on a running job. False when this worker no longer holds it."""
+        db = SessionLocal()
+        try:
+            renewed = (
+                db.query(models.CheckJob)
+                .filter(
+                    models.CheckJob.id == job_id,
+                    models.CheckJob.status == "running",
+                    models.CheckJob.lease_owner == self.owner,
+                )
+                .update({"updated_at": datetime.utcnow()}, synchronize_session=False)
+            )
+            db.commit()
+            return bool(renewed)
+        finally:
+            db.close()
+
+    async def _keep_lease(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(CHECK_HEARTBEAT_SECONDS)
+            try:
+                if not await asyncio.to_thread(self._heartbeat, job_id):
+                    logger.warning("Lost the lease on check job %s", job_id)
+                    return
+            except Exception:
+                logger.exception("Heartbeat for check job %s failed", job_id)
+
+    def _claim(self) -> Optional[models.CheckJob]:
+        """Atomically move the oldest runnable job to `running`. Safe across processes."""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            candidates = (
+                db.query(models.CheckJob.id)
+                .filter(models.CheckJob.status == "queued", models.CheckJob.run_after <= now)
+                .order_by(models.CheckJob.id)
+                .limit(5)
+                .all()
+            )
+            for (job_id,) in candidates:
+                won = (
+                    db.query(models.CheckJob)
+                    .filter(models.CheckJob.id == job_id, models.CheckJob.status == "queued")
+                    .update(
+                        {
+                            "status": "running",
+                            "attempts": models.CheckJob.attempts + 1,
+                            "lease_owner": self.owner,
+                            "updated_at": now,
+                        },
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if won:
+                    return db.get(models.CheckJob, job_id)  # detached once the session closes; read-only
+            return None
+        finally:
+            db.close()
+
+    def _finish(
+        self, job_id: int, attempts: int, error: Optional[str], result: Optional[str] = None
+    ) -> Optional[str]:
+        """Record the outcome; None when the lease was lost and another worker owns the job now."""
+        db = SessionLocal()
+        try:
+            job = db.get(models.CheckJob, job_id)
+            if job.status != "running" or job.lease_owner != self.owner:
+                return None
+            now = datetime.utcnow()
+            if error is None:
+                job.status = "succeeded"
+                job.error = None
+                job.result = result
+            elif attempts < CHECK_MAX_ATTEMPTS:
+                job.status = "queued"
+                job.error = error
+                job.run_after = now + timedelta(seconds=CHECK_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            else:
+                job.status = "failed"
+                job.error = error
+            job.lease_owner = None
+            job.updated_at = now
+            db.commit()
+            return job.status
+        finally:
+            db.close()
+
+    async def _run_one(self) -> bool:
+        job = await asyncio.to_thread(self._claim)
+        if job is None:
+            return False
+        job_id, attempts = job.id, job.attempts
+        await self._publish()
+
+        error = result = None
+        metrics.CHECK_WORKERS_BUSY.inc()
+        lease = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            if job.kind == "bulk":
+                with metrics.CHECK_STAGE_DURATION.time(stage="bulk"):
+                    result = await _run_bulk(job)
+            else:
+                with metrics.CHECK_STAGE_DURATION.time(stage="total"):
+                    await check_draft(job.draft_id, job.language)
+        except DraftNotFound:
+            error = "Draft no longer exists"
+            attempts = CHECK_MAX_ATTEMPTS  # not worth retrying
+        except Exception as e:
+            logger.exception("Check job %s failed (attempt %s)", job_id, attempts)
+            error = str(e) or e.__class__.__name__
+        finally:
+            lease.cancel()
+            metrics.CHECK_WORKERS_BUSY.dec()
+
+        status = await asyncio.to_thread(self._finish, job_id, attempts, error, result)
+        if status is None:
+            logger.warning("Check job %s finished after its lease expired; result left to the new owner", job_id)
+            return True
+        metrics.CHECK_JOBS.inc(status=status)
+        logger.info("Check job %s → %s", job_id, status)
+        await self._publish()
+        return True
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            try:
+                if await self._run_one():
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Check worker %s crashed; continuing", n)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=CHECK_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _reaper(self) -> None:
+        """Requeue expired leases now and then, so a dead process's jobs are picked up without a restart."""
+        while True:
+            try:
+                recovered = await asyncio.to_thread(self._recover)
+                if recovered:
+                    logger.warning("Requeued %d check jobs whose lease expired", recovered)
+                    self._wakeup.set()
+            except Exception:
+                logger.exception("Lease recovery failed")
+            await asyncio.sleep(CHECK_LEASE_SECONDS / 2)
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._changed = asyncio.Condition()
+        if self.workers <= 0:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+        logger.info("Started %d check workers", self.workers)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ── Status updates ────────────────────────────────────────────
+    async def _publish(self) -> None:
+        if self._changed is not None:
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def wait_for_change(self, timeout: float) -> None:
+        """
+        Sleep until a job in this process changes state, or `timeout` passes.
+        Jobs run by other processes are picked up by the timeout.
+        """
+        if self._changed is None:
+            await asyncio.sleep(timeout)
+            return
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+async def _run_bulk(job: models.CheckJob) -> str:
+    """Re-check a bulk job's drafts; the BulkCheckOut summary as JSON."""
+    payload = json.loads(job.payload)
+    draft_ids = payload["draft_ids"]
+    results, missing = await check_drafts_bulk(draft_ids, payload.get("language"))
+    return json.dumps({
+        "checked": len(results),
+        "not_found": missing,
+        "results": [
+            {"draft_id": draft_id, **{field: results[draft_id][field] for field in BULK_RESULT_FIELDS}}
+            for draft_id in draft_ids
+            if draft_id in results
+        ],
+    })
+
+
+job_queue = JobQueue()
@@ -0,0 +1,162 @@
+"""
+JSON stream – reads the model's JSON answer while it is still being written
+The analysis is one flat JSON object. JsonFieldStream takes the raw text in
+whatever pieces the streaming API delivers and reports each top-level field
+as soon as its value is complete, plus the growing text of selected string
+fields (feedback, improvement_tips) before their closing quote arrives.
+"""
+
+import json
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_WHITESPACE = " \t\r\n"
+
+
+def _combine_surrogates(text: str) -> str:
+    return text.encode("utf-16", "surrogatepass").decode("utf-16")
+
+
+class JsonFieldStream:
+    """
+    feed() returns events in order: ("delta", key, text) for new text of a
+    string field named in `streamed`, and ("value", key, value) once a
+    top-level field is complete. Nested values are reported whole.
+    """
+
+    def __init__(self, streamed: tuple = ()):
+        self.streamed = set(streamed)
+        self.values: dict = {}
+        self._state = "start"
+        self._key = ""
+        self._buf: list[str] = []       # key, scalar or nested raw text; decoded string text
+        self._sent = 0                  # chars of the current string already sent as deltas
+        self._escape = ""               # escape sequence in progress, without the backslash
+        self._depth = 0
+        self._in_string = False         # inside a string within a nested value
+        self._nested_escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, text: str) -> list[tuple]:
+        events: list[tuple] = []
+        for ch in text:
+            self._step(ch, events)
+        if self._state == "string" and self._key in self.streamed:
+            self._flush_delta(events)
+        return events
+
+    # ── states ──
+
+    def _step(self, ch: str, events: list) -> None:
+        state = self._state
+        if state == "start":
+            if ch == "{":
+                self._state = "key_or_end"
+        elif state == "key_or_end":
+            if ch == '"':
+                self._state, self._buf = "key", []
+            elif ch == "}":
+                self._state = "done"
+        elif state == "key":
+            if self._escape:
+                self._buf.append(_ESCAPES.get(ch, ch))
+                self._escape = ""
+            elif ch == "\\":
+                self._escape = ch
+            elif ch == '"':
+                self._key = "".join(self._buf)
+                self._state = "colon"
+            else:
+                self._buf.append(ch)
+        elif state == "colon":
+            if ch == ":":
+                self._state = "value"
+        elif state == "value":
+            if ch in _WHITESPACE:
+                return
+            self._buf = []
+            if ch == '"':
+                self._state, self._sent = "string", 0
+            elif ch in "{[":
+                self._state, self._depth, self._in_string = "nested", 1, False
+                self._buf.append(ch)
+            else:
+                self._state = "scalar"
+                self._buf.append(ch)
+        elif state == "string":
+            self._string_char(ch, events)
+        elif state == "scalar":
+            if ch in ",}" or ch in _WHITESPACE:
+                self._finish(self._loads("".join(self._buf)), events)
+                self._after_value(ch)
+            else:
+                self._buf.append(ch)
+        elif state == "nested":
+            self._buf.append(ch)
+            if self._in_string:
+                if self._nested_escape:
+                    self._nested_escape = False
+                elif ch == "\\":
+                    self._nested_escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if not self._depth:
+                    self._finish(self._loads("".join(self._buf)), events)
+                    self._state = "after_value"
+        elif state == "after_value":
+            self._after_value(ch)
+
+    def _after_value(self, ch: str) -> None:
+        if ch == ",":
+            self._state = "key_or_end"
+        elif ch == "}":
+            self._state = "done"
+        else:
+            self._state = "after_value"
+
+    def _string_char(self, ch: str, events: list) -> None:
+        if self._escape:
+            self._escape += ch
+            if self._escape[1] == "u":
+                if len(self._escape) < 6:
+                    return
+                self._buf.append(chr(int(self._escape[2:], 16)))
+            else:
+                self._buf.append(_ESCAPES.get(ch, ch))
+            self._escape = ""
+        elif ch == "\\":
+            self._escape = ch
+        elif ch == '"':
+            if self._key in self.streamed:
+                self._flush_delta(events, final=True)
+            self._finish(_combine_surrogates("".join(self._buf)), events)
+            self._state = "after_value"
+        else:
+            self._buf.append(ch)
+
+    def _flush_delta(self, events: list, final: bool = False) -> None:
+        end = len(self._buf)
+        if not final and end and "\ud800" <= self._buf[-1] <= "\udbff":
+            end -= 1  # wait for the low half of a surrogate pair
+        if end > self._sent:
+            events.append(("delta", self._key, _combine_surrogates("".join(self._buf[self._sent:end]))))
+            self._sent = end
+
+    def _finish(self, value, events: list) -> None:
+        self.values[self._key] = value
+        events.append(("value", self._key, value))
+
+    @staticmethod
+    def _loads(raw: str):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
@@ -0,0 +1,401 @@
+"""
+Metrics – a minimal Prometheus registry
+Counters, gauges and histograms with labels, rendered in the Prometheus text
+format at GET /metrics, which answers only requests bearing METRICS_TOKEN.
+Values live in this process; with several API processes (or a standalone
+worker.py) each keeps its own. Kept free of prometheus_client so the API
+has no extra dependency.
+"""
+
+import bisect
+import hmac
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds; SLOW_BUCKETS for calls that wait on OpenAI or a whole check
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+# ─── Metric types ────────────────────────────────────────────────────────────
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labels)
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_one(key, value))
+        return lines
+
+    def _render_one(self, key: tuple, value) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        super().__init__(name, help_text, labels)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the (unlabelled) value from `function` at scrape time."""
+        self._function = function
+
+    def render(self) -> list[str]:
+        if self._function is not None:
+            try:
+                self.set(self._function())
+            except Exception as e:
+                logger.warning("Gauge %s could not be read: %s", self.name, e)
+        return super().render()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # per-bucket counts (last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_one(self, key: tuple, state) -> list[str]:
+        counts, total, count = state
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, help_text: str, labels: tuple = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help_text, labels))
+
+
+def gauge(name: str, help_text: str, labels: tuple = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, help_text, labels))
+
+
+def histogram(name: str, help_text: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help_text, labels, buckets))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def scrape_allowed(authorization: Optional[str]) -> bool:
+    """
+    Whether a request may read GET /metrics: its Authorization header must be
+    "Bearer <METRICS_TOKEN>". Without METRICS_TOKEN the endpoint is off. Read
+    per request, since this module is imported before .env is loaded.
+    """
+    token = os.getenv("METRICS_TOKEN", "")
+    return bool(token) and hmac.compare_digest(authorization or "", f"Bearer {token}")
+
+
+# ─── Application metrics ─────────────────────────────────────────────────────
+
+HTTP_REQUESTS = counter(
+    "integrityai_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"),
+)
+HTTP_DURATION = histogram(
+    "integrityai_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"),
+)
+HTTP_IN_PROGRESS = gauge("integrityai_http_requests_in_progress", "HTTP requests currently being served.")
+
+DB_QUERIES = counter("integrityai_db_queries_total", "SQL statements executed.")
+DB_QUERY_DURATION = histogram("integrityai_db_query_duration_seconds", "SQL statement latency.")
+DB_QUERIES_PER_REQUEST = histogram(
+    "integrityai_db_queries_per_request", "SQL statements executed per HTTP request.", ("route",),
+    buckets=COUNT_BUCKETS,
+)
+
+EXTRACT_DURATION = histogram(
+    "integrityai_extract_document_seconds",
+    "Wall time of document extraction, including waiting for a pool worker.",
+    ("file_type", "pages"), buckets=SLOW_BUCKETS,
+)
+EXTRACT_STAGE_DURATION = histogram(
+    "integrityai_extract_stage_seconds",
+    "Time spent inside an extraction worker, by stage, engine and page count.",
+    ("stage", "engine", "pages"), buckets=SLOW_BUCKETS,
+)
+EXTRACT_QUEUE_WAIT = histogram(
+    "integrityai_extract_queue_wait_seconds", "Time extraction tasks waited for a pool worker.",
+)
+EXTRACT_PAGES = counter("integrityai_extract_pages_total", "Pages or slides extracted, by engine.", ("engine",))
+EXTRACT_POOL_PENDING = gauge(
+    "integrityai_extract_pool_pending", "Extraction tasks submitted to the pool and not yet finished.",
+)
+
+LLM_REQUESTS = counter("integrityai_llm_requests_total", "LLM calls by kind and outcome.", ("kind", "outcome"))
+LLM_DURATION = histogram(
+    "integrityai_llm_request_duration_seconds", "LLM call latency, retries included.", ("kind", "outcome"),
+    buckets=SLOW_BUCKETS,
+)
+LLM_TOKENS = counter("integrityai_llm_tokens_total", "Tokens reported by the LLM API.", ("kind", "type"))
+LLM_RETRIES = counter(
+    "integrityai_llm_retries_total",
+    "HTTP requests beyond the first per LLM call: retries and hedged requests made by services/resilience.py.",
+    ("kind",),
+)
+LLM_FALLBACKS = counter(
+    "integrityai_llm_fallbacks_total", "Times the LLM path was abandoned, by fallback taken.", ("reason",),
+)
+LLM_CACHE = counter("integrityai_llm_cache_lookups_total", "Result cache lookups before an LLM call.", ("result",))
+PRESCREEN = counter(
+    "integrityai_prescreen_total", "Local stylometric pre-screen decisions: answered locally or escalated.", ("decision",),
+)
+PROMPT_TOKENS = counter(
+    "integrityai_prompt_tokens_total",
+    "Estimated submission tokens per check, as extracted and after compaction; the difference is saved.", ("stage",),
+)
+PROMPT_BOILERPLATE_LINES = counter(
+    "integrityai_prompt_boilerplate_lines_total", "Header, footer, page-number and placeholder lines compacted away.",
+)
+PROMPT_TRUNCATIONS = counter("integrityai_prompt_truncations_total", "LLM requests cut to fit PROMPT_TOKEN_BUDGET.")
+LLM_HEDGES = counter(
+    "integrityai_llm_hedged_requests_total", "Hedged LLM attempts, by which request answered first.", ("winner",),
+)
+LLM_BREAKER_STATE = gauge("integrityai_llm_circuit_state", "LLM circuit breaker: 0 closed, 1 half-open, 2 open.")
+LLM_IN_FLIGHT = gauge("integrityai_llm_requests_in_flight", "LLM calls currently awaiting a response.")
+
+CHECK_STAGE_DURATION = histogram(
+    "integrityai_check_stage_seconds", "Time per stage of an integrity check.", ("stage",), buckets=SLOW_BUCKETS,
+)
+CHECK_JOBS = counter("integrityai_check_jobs_total", "Check job attempts by resulting status.", ("status",))
+CHECK_WORKERS_BUSY = gauge("integrityai_check_workers_busy", "Check workers currently running a job.")
+
+# Saturation gauges read from their sources at scrape time (bound in main.py)
+CHECK_QUEUE_DEPTH = gauge("integrityai_check_queue_depth", "Check jobs queued or running.")
+BCRYPT_QUEUE_DEPTH = gauge("integrityai_bcrypt_queue_depth", "Password hashes queued or running on the bcrypt pool.")
+DB_POOL_CHECKED_OUT = gauge("integrityai_db_pool_checked_out", "Database connections currently checked out.")
+DB_POOL_CAPACITY = gauge("integrityai_db_pool_capacity", "Database connections the pool may hand out (size + overflow).")
+EXTRACT_POOL_WORKERS = gauge("integrityai_extract_pool_workers", "Extraction worker processes configured.")
+LLM_MAX_CONCURRENCY = gauge("integrityai_llm_max_concurrency", "Limit on concurrent LLM calls per event loop.")
+
+
+def page_bucket(pages: int) -> str:
+    """Page counts grouped into a few label values, keeping label cardinality bounded."""
+    for upper, label in ((1, "1"), (9, "2-9"), (49, "10-49"), (199, "50-199")):
+        if pages <= upper:
+            return label
+    return "200+"
+
+
+# ─── LLM calls ───────────────────────────────────────────────────────────────
+# Retries and hedged requests are made by services/resilience.py (the SDK's own
+# retries are off); an httpx request hook counts the HTTP requests made on
+# behalf of the call currently in progress.
+
+_llm_attempts: ContextVar[Optional[list]] = ContextVar("llm_attempts", default=None)
+
+
+def count_llm_attempt(request) -> None:
+    attempts = _llm_attempts.get()
+    if attempts is not None:
+        attempts[0] += 1
+
+
+async def count_llm_attempt_async(request) -> None:
+    count_llm_attempt(request)
+
+
+class _LLMCall:
+    def __init__(self, kind: str):
+        self.kind = kind
+
+    def record(self, response) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.inc(usage.prompt_tokens or 0, kind=self.kind, type="prompt")
+            LLM_TOKENS.inc(usage.completion_tokens or 0, kind=self.kind, type="completion")
+
+
+@contextmanager
+def llm_call(kind: str):
+    """Wrap one chat completion; call `.record(response)` on the yielded object for token counts."""
+    attempts = [0]
+    token = _llm_attempts.set(attempts)
+    LLM_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield _LLMCall(kind)
+        outcome = "ok"
+    finally:
+        LLM_IN_FLIGHT.dec()
+        _llm_attempts.reset(token)
+        LLM_DURATION.observe(time.perf_counter() - started, kind=kind, outcome=outcome)
+        LLM_REQUESTS.inc(kind=kind, outcome=outcome)
+        if attempts[0] > 1:
+            LLM_RETRIES.inc(attempts[0] - 1, kind=kind)
+
+
+# ─── Database ────────────────────────────────────────────────────────────────
+
+_request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Count and time every statement; statements run while serving a request are also tallied per request."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        DB_QUERY_DURATION.observe(time.perf_counter() - started)
+        DB_QUERIES.inc()
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+# ─── HTTP ────────────────────────────────────────────────────────────────────
+
+class MetricsMiddleware:
+    """Per-route request counts, latency and DB statement counts. Routes are labelled by path template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        queries = [0]
+        token = _request_queries.set(queries)
+
+        async def tracking_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, tracking_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec()
+            _request_queries.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            HTTP_DURATION.observe(elapsed, method=method, route=route)
+            DB_QUERIES_PER_REQUEST.observe(queries[0], route=route)
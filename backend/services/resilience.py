@@ -0,0 +1,232 @@
+"""
+Resilience – deadlines, retries, a circuit breaker and hedging for LLM calls
+Every chat completion runs under a deadline (LLM_DEADLINE_SECONDS for the
+call, retries included). Retryable errors (timeouts, connection failures,
+429s and 5xx) are retried with full-jitter exponential backoff, honouring
+Retry-After. Calls that keep failing after their retries open a
+process-wide circuit breaker so checks fail fast instead of waiting on a
+dead upstream; after a cool-down one probe call is let through.
+Optionally, a call still running past the observed p95 latency is hedged
+with a second identical request and the first answer wins.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+import openai
+
+from services import metrics
+
+logger = logging.getLogger(__name__)
+
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "45"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))   # seconds; doubles per retry
+LLM_BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", "8"))
+
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))           # consecutive failures that open it
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "0") == "1"
+HEDGE_MIN_SAMPLES = 20          # latencies observed before the p95 is trusted
+HEDGE_MIN_DELAY = 0.5           # never hedge sooner than this, in seconds
+LATENCY_WINDOW = 200
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+class CircuitOpen(RuntimeError):
+    """The breaker is open: the LLM is failing and calls are not attempted."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """The call's deadline passed before any attempt succeeded."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError, asyncio.TimeoutError, TimeoutError)):
+        return True  # openai.APITimeoutError is an APIConnectionError
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in RETRYABLE_STATUS
+    return False
+
+
+def _retry_after(error: BaseException) -> float:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 0)) if response is not None else 0.0
+    except ValueError:
+        return 0.0
+
+
+def backoff(attempt: int, error: Optional[BaseException] = None) -> float:
+    """Full-jitter delay before retry `attempt` (1-based), at least the server's Retry-After."""
+    delay = random.uniform(0, min(LLM_BACKOFF_CAP, LLM_BACKOFF_BASE * 2 ** (attempt - 1)))
+    return max(delay, _retry_after(error)) if error is not None else delay
+
+
+# ─── Circuit breaker ─────────────────────────────────────────────────────────
+
+class CircuitBreaker:
+    """
+    closed → (BREAKER_FAILURES in a row) → open → (cool-down) → half-open → one probe decides.
+    Outcomes are recorded once per call, after its retries, not per attempt.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> None:
+        """Raise CircuitOpen unless a call may go out now."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    raise CircuitOpen(f"LLM circuit open for another {self.retry_in():.0f}s")
+                self._set(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpen("LLM circuit half-open: a probe call is in flight")
+                self._probing = True
+
+    def retry_in(self) -> float:
+        return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._consecutive = 0
+            self._probing = False
+            self._set(self.CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._consecutive += 1
+            probe_failed = self.state == self.HALF_OPEN
+            self._probing = False
+            if probe_failed or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+                self._set(self.OPEN)
+
+    def release(self) -> None:
+        """An attempt ended without a verdict on the upstream (e.g. a bad request)."""
+        with self._lock:
+            self._probing = False
+
+    def _set(self, state: str) -> None:
+        if state != self.state:
+            logger.warning("LLM circuit breaker: %s → %s", self.state, state)
+            self.state = state
+        metrics.LLM_BREAKER_STATE.set(("closed", "half_open", "open").index(state))
+
+
+# ─── Latency tracking ────────────────────────────────────────────────────────
+
+class LatencyTracker:
+    """Recent successful-call latencies; p95 drives the hedging delay."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+breaker = CircuitBreaker()
+latencies = LatencyTracker()
+
+
+# ─── Calls ───────────────────────────────────────────────────────────────────
+
+async def _hedged(make: Callable[[float], Awaitable[T]], timeout: float) -> T:
+    """One attempt; a second identical request joins if the first outlives the p95."""
+    p95 = latencies.percentile(0.95) if LLM_HEDGE_ENABLED else None
+    if p95 is None or max(p95, HEDGE_MIN_DELAY) >= timeout:
+        return await make(timeout)
+
+    delay = max(p95, HEDGE_MIN_DELAY)
+    first = asyncio.ensure_future(make(timeout))
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result()
+        tasks.append(asyncio.ensure_future(make(timeout - delay)))
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    metrics.LLM_HEDGES.inc(winner="original" if task is first else "hedge")
+                    return task.result()
+                error = task.exception()
+        metrics.LLM_HEDGES.inc(winner="none")
+        raise error  # type: ignore[misc]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def call_async(
+    make: Callable[[float], Awaitable[T]], deadline: float = LLM_DEADLINE_SECONDS, hedge: bool = True
+) -> T:
+    """
+    Await `make(timeout)` (one LLM request bounded by `timeout` seconds) with
+    retries, the breaker and an overall deadline; each attempt may be hedged
+    (LLM_HEDGE_ENABLED) unless `hedge` is off, as it must be for streams: the
+    losing request would be left holding its connection. Raises CircuitOpen,
+    DeadlineExceeded or the error of the last attempt.
+    """
+    breaker.allow()
+    ends = time.monotonic() + deadline
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        remaining = ends - time.monotonic()
+        started = time.monotonic()
+        try:
+            attempt_call = _hedged(make, remaining) if hedge else make(remaining)
+            result = await asyncio.wait_for(attempt_call, remaining)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                breaker.release()
+                raise
+            delay = backoff(attempt + 1, e)
+            if attempt == LLM_MAX_RETRIES:
+                breaker.record_failure()
+                raise
+            if time.monotonic() + delay >= ends:
+                breaker.record_failure()
+                raise DeadlineExceeded(f"no time left to retry within {deadline:.0f}s: {e!r}") from e
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        latencies.observe(time.monotonic() - started)
+        return result
+    raise AssertionError("unreachable")
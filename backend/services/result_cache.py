@@ -0,0 +1,200 @@
+"""
+Result Cache – content-addressed cache for integrity check results
+Tier 1: in-process LRU.  Tier 2: `check_cache` table, shared across workers
+and restarts.  Keys are sha256 over everything that determines the LLM output.
+Hit counts and last-used times of table hits are buffered in memory and
+written in batches, so a cache read never takes the database write lock.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import bindparam, update
+
+from database import SessionLocal
+import models
+
+logger = logging.getLogger(__name__)
+
+MEMORY_ENTRIES = int(os.getenv("RESULT_CACHE_MEMORY_ENTRIES", "1024"))
+MAX_ROWS = int(os.getenv("RESULT_CACHE_MAX_ROWS", "50000"))
+TTL_HOURS = float(os.getenv("RESULT_CACHE_TTL_HOURS", str(24 * 30)))
+PRUNE_EVERY = 200  # stores between DB eviction passes
+HIT_FLUSH_SECONDS = 30.0  # longest a table hit waits before its bookkeeping is written
+
+
+def cache_key(content: str, language: str, model: str, prompt_version: str) -> str:
+    h = hashlib.sha256()
+    for part in (prompt_version, model, language, content):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, memory_entries: int = MEMORY_ENTRIES, max_rows: int = MAX_ROWS, ttl_hours: float = TTL_HOURS):
+        self.memory_entries = memory_entries
+        self.max_rows = max_rows
+        self.ttl = timedelta(hours=ttl_hours)
+        self._lru: "OrderedDict[str, tuple[datetime, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stores = 0
+        self._pending_hits: dict[str, list] = {}  # key -> [hits, last_used_at], not yet written
+        self._hits_flushed_at = time.monotonic()
+        self.counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    # ── Memory tier ───────────────────────────────────────────────
+    def _remember(self, key: str, created_at: datetime, value: dict) -> None:
+        with self._lock:
+            self._lru[key] = (created_at, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.memory_entries:
+                self._lru.popitem(last=False)
+                self.counters["evictions"] += 1
+
+    def _expired(self, created_at: datetime) -> bool:
+        return datetime.utcnow() - created_at > self.ttl
+
+    # ── Hit bookkeeping ───────────────────────────────────────────
+    def _note_hit(self, key: str) -> bool:
+        """Buffer a table hit; True once the buffer is due to be written."""
+        with self._lock:
+            pending = self._pending_hits.setdefault(key, [0, None])
+            pending[0] += 1
+            pending[1] = datetime.utcnow()
+            return time.monotonic() - self._hits_flushed_at >= HIT_FLUSH_SECONDS
+
+    def _write_hits(self, db) -> None:
+        """Add the buffered hits to their rows; the caller commits."""
+        with self._lock:
+            pending, self._pending_hits = self._pending_hits, {}
+            self._hits_flushed_at = time.monotonic()
+        if not pending:
+            return
+        table = models.CheckCacheEntry.__table__
+        db.execute(
+            update(table)
+            .where(table.c.key == bindparam("k"))
+            .values(hits=table.c.hits + bindparam("n"), last_used_at=bindparam("t")),
+            [{"k": key, "n": hits, "t": used} for key, (hits, used) in pending.items()],
+        )
+
+    def flush_hits(self) -> None:
+        """Write buffered hit bookkeeping now (periodically, and at shutdown)."""
+        db = SessionLocal()
+        try:
+            self._write_hits(db)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Result cache hit flush failed: %s", e)
+        finally:
+            db.close()
+
+    # ── Public API ────────────────────────────────────────────────
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._lru.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._lru[key]
+
+        value = None
+        db = SessionLocal()
+        try:
+            row = db.get(models.CheckCacheEntry, key)
+            if row is not None and not self._expired(row.created_at):
+                value = json.loads(row.payload)
+                self._remember(key, row.created_at, value)
+        except Exception as e:
+            logger.warning("Result cache read failed: %s", e)
+        finally:
+            db.close()
+
+        if value is None:
+            self.counters["misses"] += 1
+            return None
+        self.counters["db_hits"] += 1
+        if self._note_hit(key):
+            self.flush_hits()
+        return dict(value)
+
+    def put(self, key: str, value: dict) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, entries: dict[str, dict]) -> None:
+        """Store several results in one transaction."""
+        if not entries:
+            return
+        now = datetime.utcnow()
+        for key, value in entries.items():
+            self._remember(key, now, value)
+        db = SessionLocal()
+        try:
+            for key, value in entries.items():
+                db.merge(models.CheckCacheEntry(
+                    key=key, payload=json.dumps(value), created_at=now, last_used_at=now, hits=0,
+                ))
+            self._write_hits(db)  # rides along with this write transaction
+            db.commit()
+            self.counters["stores"] += len(entries)
+            before = self._stores
+            self._stores += len(entries)
+            if self._stores // PRUNE_EVERY != before // PRUNE_EVERY:
+                self.prune(db)
+        except Exception as e:
+            db.rollback()
+            logger.warning("Result cache write failed: %s", e)
+        finally:
+            db.close()
+
+    def prune(self, db) -> int:
+        """Drop expired rows, then the least recently used beyond max_rows."""
+        table = models.CheckCacheEntry
+        removed = (
+            db.query(table)
+            .filter(table.created_at < datetime.utcnow() - self.ttl)
+            .delete(synchronize_session=False)
+        )
+        excess = db.query(table).count() - self.max_rows
+        if excess > 0:
+            stale = (
+                db.query(table.key)
+                .order_by(table.last_used_at.asc())
+                .limit(excess)
+                .subquery()
+            )
+            removed += (
+                db.query(table)
+                .filter(table.key.in_(db.query(stale.c.key)))
+                .delete(synchronize_session=False)
+            )
+        db.commit()
+        self.counters["evictions"] += removed
+        return removed
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._lru.clear()
+
+    def stats(self) -> dict:
+        lookups = self.counters["memory_hits"] + self.counters["db_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "memory_size": len(self._lru),
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+result_cache = ResultCache()
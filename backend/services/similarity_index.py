@@ -0,0 +1,291 @@
+"""
+Similarity Index – local near-duplicate detection
+One-permutation MinHash signatures over word shingles, banded into an LSH table
+so a lookup only compares against documents that share at least one band.
+The index is persisted as an append-only log, replayed on startup and tailed
+so every process sharing the log stays current.
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = int(os.getenv("SIMILARITY_NUM_PERM", "128"))
+NUM_BANDS = int(os.getenv("SIMILARITY_BANDS", "64"))
+SHINGLE_SIZE = int(os.getenv("SIMILARITY_SHINGLE_SIZE", "5"))
+MATCH_THRESHOLD = float(os.getenv("SIMILARITY_MATCH_THRESHOLD", "0.1"))
+INDEX_PATH = os.getenv("SIMILARITY_INDEX_PATH", "./similarity_index.log")
+
+ROWS_PER_BAND = NUM_PERM // NUM_BANDS
+EMPTY = (1 << 64) - 1
+
+_MARKER_RE = re.compile(
+    r"^(?:Page|Slide) \d+:$|^\[No extractable text[^\]]*\]$|^\[No text content on this slide\]$",
+    re.MULTILINE,
+)
+_WORD_RE = re.compile(r"\w+")
+
+
+# ─── Result container ────────────────────────────────────────────────────────
+
+@dataclass
+class SimilarityReport:
+    score: float                                # 0-100, best estimated Jaccard match
+    matches: list[dict] = field(default_factory=list)  # [{"draft_id", "similarity"}]
+
+
+# ─── Signatures ──────────────────────────────────────────────────────────────
+
+def _shingles(text: str) -> set[bytes]:
+    words = _WORD_RE.findall(_MARKER_RE.sub(" ", text).lower())
+    if not words:
+        return set()
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words).encode()}
+    return {
+        " ".join(words[i:i + SHINGLE_SIZE]).encode()
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def signature(text: str) -> list[int]:
+    """
+    One-permutation MinHash: each shingle is hashed once, the hash picks a bin
+    and the remaining bits compete for that bin's minimum.
+    """
+    sig = [EMPTY] * NUM_PERM
+    for sh in _shingles(text):
+        h = int.from_bytes(hashlib.blake2b(sh, digest_size=8).digest(), "little")
+        b = h % NUM_PERM
+        v = h // NUM_PERM
+        if v < sig[b]:
+            sig[b] = v
+    return sig
+
+
+def estimate_jaccard(a: list[int], b: list[int]) -> float:
+    same = 0
+    used = 0
+    for x, y in zip(a, b):
+        if x == EMPTY and y == EMPTY:
+            continue
+        used += 1
+        if x == y:
+            same += 1
+    return same / used if used else 0.0
+
+
+def _bands(sig: list[int]):
+    for band in range(NUM_BANDS):
+        rows = tuple(sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+        if all(r == EMPTY for r in rows):
+            continue
+        yield band, rows
+
+
+def _pack(sig: list[int]) -> str:
+    return base64.b64encode(struct.pack(f"<{len(sig)}Q", *sig)).decode()
+
+
+def _unpack(data: str) -> list[int]:
+    raw = base64.b64decode(data)
+    return list(struct.unpack(f"<{len(raw) // 8}Q", raw))
+
+
+# ─── Index ───────────────────────────────────────────────────────────────────
+
+class SimilarityIndex:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._docs: dict[str, tuple[int, Optional[int], list[int]]] = {}
+        self._buckets: dict[tuple, set[str]] = {}
+        self._log_lines = 0
+        self._offset = 0
+        self._inode: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ── Persistence ───────────────────────────────────────────────
+    def load(self) -> None:
+        """Replay the on-disk log. Missing or partially written lines are skipped."""
+        self.refresh()
+        logger.info("Similarity index loaded: %d documents", len(self._docs))
+
+    def refresh(self) -> None:
+        """
+        Apply records appended since the last read, so API and worker
+        processes sharing one log see each other's documents.
+        """
+        if not self.path:
+            return
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if (st.st_ino, st.st_size) == (self._inode, self._offset):
+                return
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                # Log was compacted by another process: start over
+                self._docs.clear()
+                self._buckets.clear()
+                self._offset = 0
+                self._log_lines = 0
+            with open(self.path, "rb") as fh:
+                fh.seek(self._offset)
+                for raw in fh:
+                    if not raw.endswith(b"\n"):
+                        break  # a writer is mid-line; pick it up next time
+                    self._offset += len(raw)
+                    try:
+                        rec = json.loads(raw)
+                    except ValueError:
+                        continue
+                    self._log_lines += 1
+                    if rec.get("deleted"):
+                        self._remove(rec["key"])
+                    else:
+                        self._insert(rec["key"], rec["draft_id"], rec.get("user_id"), _unpack(rec["sig"]))
+            self._inode = st.st_ino
+
+    def _append(self, rec: dict) -> None:
+        if not self.path:
+            return
+        self.refresh()
+        with open(self.path, "ab") as fh:
+            line = (json.dumps(rec) + "\n").encode("utf-8")
+            fh.write(line)
+        st = os.stat(self.path)
+        if st.st_size == self._offset + len(line):
+            self._offset = st.st_size  # nobody else wrote in between
+            self._inode = st.st_ino
+        self._log_lines += 1
+        if self._log_lines > 2 * len(self._docs) + 1000:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for key, (draft_id, user_id, sig) in self._docs.items():
+                fh.write(json.dumps({"key": key, "draft_id": draft_id, "user_id": user_id, "sig": _pack(sig)}) + "\n")
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self._inode, self._offset = st.st_ino, st.st_size
+        self._log_lines = len(self._docs)
+
+    # ── Mutation ──────────────────────────────────────────────────
+    def _insert(self, key: str, draft_id: int, user_id: Optional[int], sig: list[int]) -> None:
+        self._remove(key)
+        self._docs[key] = (draft_id, user_id, sig)
+        for band in _bands(sig):
+            self._buckets.setdefault(band, set()).add(key)
+
+    def _remove(self, key: str) -> None:
+        old = self._docs.pop(key, None)
+        if old is None:
+            return
+        for band in _bands(old[2]):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def add(self, key: str, text: str, draft_id: int, user_id: Optional[int] = None) -> None:
+        """Index (or re-index) a document under `key`, e.g. "draft:12" or "file:3"."""
+        sig = signature(text or "")
+        with self._lock:
+            self._insert(key, draft_id, user_id, sig)
+            self._append({"key": key, "draft_id": draft_id, "user_id": user_id, "sig": _pack(sig)})
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            if key in self._docs:
+                self._remove(key)
+                self._append({"key": key, "deleted": True})
+
+    # ── Lookup ────────────────────────────────────────────────────
+    def query(
+        self,
+        text: str,
+        exclude_user_id: Optional[int] = None,
+        exclude_draft_id: Optional[int] = None,
+        limit: int = 5,
+    ) -> SimilarityReport:
+        """
+        Compare `text` against every indexed document sharing an LSH band.
+        Documents owned by `exclude_user_id` (a student's own earlier drafts)
+        and `exclude_draft_id` itself are ignored.
+        """
+        sig = signature(text or "")
+        best: dict[int, float] = {}
+        self.refresh()
+        with self._lock:
+            candidates: set[str] = set()
+            for band in _bands(sig):
+                candidates.update(self._buckets.get(band, ()))
+            for key in candidates:
+                draft_id, user_id, other = self._docs[key]
+                if draft_id == exclude_draft_id:
+                    continue
+                if exclude_user_id is not None and user_id == exclude_user_id:
+                    continue
+                j = estimate_jaccard(sig, other)
+                if j > best.get(draft_id, 0.0):
+                    best[draft_id] = j
+
+        ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+        matches = [
+            {"draft_id": draft_id, "similarity": round(j * 100, 1)}
+            for draft_id, j in ranked[:limit]
+            if j >= MATCH_THRESHOLD
+        ]
+        score = round(ranked[0][1] * 100, 1) if ranked else 0.0
+        return SimilarityReport(score=score, matches=matches)
+
+    # ── Bootstrap ─────────────────────────────────────────────────
+    def build_from_db(self, db) -> int:
+        """Index every draft and file already in the database. Returns documents added."""
+        from sqlalchemy import func
+
+        import models
+
+        added = 0
+        drafts = (
+            db.query(models.Draft.id, models.Draft.content, models.Assignment.user_id)
+            .join(models.Assignment)
+            .yield_per(500)
+        )
+        for draft_id, content, user_id in drafts:
+            self.add(f"draft:{draft_id}", content, draft_id, user_id)
+            added += 1
+        files = (
+            db.query(
+                models.File.id,
+                models.File.draft_id,
+                func.coalesce(models.File.extracted_text, models.ExtractedDocument.text),
+                models.Assignment.user_id,
+            )
+            .join(models.Draft, models.File.draft_id == models.Draft.id)
+            .join(models.Assignment)
+            .outerjoin(models.ExtractedDocument, models.File.content_hash == models.ExtractedDocument.content_hash)
+            .yield_per(500)
+        )
+        for file_id, draft_id, text, user_id in files:
+            self.add(f"file:{file_id}", text or "", draft_id, user_id)
+            added += 1
+        return added
+
+
+similarity_index = SimilarityIndex(INDEX_PATH)
@@ -0,0 +1,137 @@
+"""
+Student Stats – rollups of learning scores per student
+`student_stats` holds one row per student (count, sum, min/max, latest risk)
+and `student_weekly_stats` one row per student per week of draft creation.
+Both are updated with SQL-side arithmetic in the same transaction that
+writes a draft's scores, so concurrent check workers never lose an update.
+"""
+
+from datetime import datetime, date, timedelta
+from typing import Optional
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+
+
+def week_start(moment: datetime) -> date:
+    day = moment.date()
+    return day - timedelta(days=day.weekday())
+
+
+def _upsert(db: Session, table, keys: dict, insert_values: dict, update_values: dict) -> None:
+    query = db.query(table).filter_by(**keys)
+    if query.update(update_values, synchronize_session=False):
+        return
+    try:
+        with db.begin_nested():
+            db.add(table(**keys, **insert_values))
+    except IntegrityError:
+        # Another worker created the row first
+        query.update(update_values, synchronize_session=False)
+
+
+def record_score(
+    db: Session,
+    user_id: int,
+    draft_created_at: datetime,
+    previous_score: Optional[int],
+    score: int,
+    risk_level: str,
+) -> None:
+    """
+    Fold one draft's new learning score into the rollups. `previous_score`
+    is the draft's score before this check (None the first time), so a
+    re-check replaces its contribution instead of counting it twice.
+    min/max only ever widen: they cover every score the student has received.
+    latest_risk_level follows the newest draft, so re-checking an old one
+    leaves it alone.
+    """
+    added = 0 if previous_score is not None else 1
+    delta = score - (previous_score or 0)
+    now = datetime.utcnow()
+
+    stats = models.StudentStats
+    newest = or_(stats.latest_draft_at.is_(None), stats.latest_draft_at <= draft_created_at)
+    _upsert(
+        db, stats,
+        {"user_id": user_id},
+        {
+            "draft_count": 1, "score_sum": score, "score_min": score, "score_max": score,
+            "latest_risk_level": risk_level, "latest_draft_at": draft_created_at, "updated_at": now,
+        },
+        {
+            stats.draft_count: stats.draft_count + added,
+            stats.score_sum: stats.score_sum + delta,
+            stats.score_min: case((stats.score_min > score, score), else_=stats.score_min),
+            stats.score_max: case((stats.score_max < score, score), else_=stats.score_max),
+            stats.latest_risk_level: case((newest, risk_level), else_=stats.latest_risk_level),
+            stats.latest_draft_at: case((newest, draft_created_at), else_=stats.latest_draft_at),
+            stats.updated_at: now,
+        },
+    )
+
+    weekly = models.StudentWeeklyStats
+    _upsert(
+        db, weekly,
+        {"user_id": user_id, "week_start": week_start(draft_created_at)},
+        {"draft_count": 1, "score_sum": score},
+        {
+            weekly.draft_count: weekly.draft_count + added,
+            weekly.score_sum: weekly.score_sum + delta,
+        },
+    )
+
+
+def rebuild(db: Session) -> int:
+    """Recompute both rollups from the drafts table. Returns students covered."""
+    db.query(models.StudentWeeklyStats).delete()
+    db.query(models.StudentStats).delete()
+
+    Draft, Assignment = models.Draft, models.Assignment
+    totals = (
+        db.query(
+            Assignment.user_id,
+            func.count(Draft.id),
+            func.sum(Draft.learning_score),
+            func.min(Draft.learning_score),
+            func.max(Draft.learning_score),
+        )
+        .join(Assignment)
+        .filter(Draft.learning_score.isnot(None))
+        .group_by(Assignment.user_id)
+        .all()
+    )
+    latest: dict[int, tuple[str, datetime]] = {}
+    for user_id, risk, created_at in (
+        db.query(Assignment.user_id, Draft.risk_level, Draft.created_at)
+        .join(Assignment)
+        .filter(Draft.learning_score.isnot(None))
+        .order_by(Draft.created_at.asc(), Draft.id.asc())
+    ):
+        latest[user_id] = (risk, created_at)
+
+    now = datetime.utcnow()
+    for user_id, count, total, low, high in totals:
+        db.add(models.StudentStats(
+            user_id=user_id, draft_count=count, score_sum=total, score_min=low, score_max=high,
+            latest_risk_level=latest[user_id][0], latest_draft_at=latest[user_id][1], updated_at=now,
+        ))
+
+    weeks: dict[tuple[int, date], list[int]] = {}
+    for user_id, created_at, score in (
+        db.query(Assignment.user_id, Draft.created_at, Draft.learning_score)
+        .join(Assignment)
+        .filter(Draft.learning_score.isnot(None))
+        .yield_per(1000)
+    ):
+        bucket = weeks.setdefault((user_id, week_start(created_at)), [0, 0])
+        bucket[0] += 1
+        bucket[1] += score
+    for (user_id, start), (count, total) in weeks.items():
+        db.add(models.StudentWeeklyStats(user_id=user_id, week_start=start, draft_count=count, score_sum=total))
+
+    db.commit()
+    return len(totals)
@@ -0,0 +1,32 @@
+"""
+Test setup: a throwaway SQLite database and a dummy OpenAI key, set before
+any app module reads its configuration. No test talks to the network.
+"""
+
+import os
+import sys
+import tempfile
+
+_work = tempfile.mkdtemp(prefix="integrityai-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_work}/test.db")
+os.environ.setdefault("SIMILARITY_INDEX_PATH", f"{_work}/similarity_index.log")
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("OPENAI_BASE_URL", "http://127.0.0.1:9/v1")  # nothing listens there
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    from database import Base, SessionLocal, engine
+    import models  # noqa: F401
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,34 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from routers import auth
+from utils.rate_limit import SlidingWindowLimiter
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    monkeypatch.setattr(auth, "account_failures", SlidingWindowLimiter(5, 900))
+    monkeypatch.setattr(auth, "ip_failures", SlidingWindowLimiter(3, 60))
+    with TestClient(app) as c:
+        c.post("/api/auth/signup", json={"name": "S", "email": "Student@School.org", "password": "pw123456"})
+        yield c
+
+
+def _login(client, email, password="pw123456"):
+    return client.post("/api/auth/login", json={"email": email, "password": password}).status_code
+
+
+def test_successful_logins_from_one_ip_are_not_throttled(client):
+    assert all(_login(client, "student@school.org") == 200 for _ in range(10))
+
+
+def test_email_case_does_not_matter(client):
+    assert _login(client, "STUDENT@school.ORG") == 200
+    signup = client.post("/api/auth/signup", json={"name": "S", "email": "student@SCHOOL.org", "password": "x"})
+    assert signup.status_code == 400
+
+
+def test_failed_logins_throttle_the_ip(client):
+    assert [_login(client, f"nobody{i}@school.org", "wrong") for i in range(3)] == [401, 401, 401]
+    assert _login(client, "student@school.org") == 429
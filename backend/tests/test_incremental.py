@@ -0,0 +1,106 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from services import ai_service, resilience
+from services.compaction import PROMPT_TOKEN_BUDGET, chunk_chars, count_tokens
+from services.result_cache import result_cache
+
+WORDS = ["विद्यार्थी", "शिक्षा", "पर्यावरण", "समाज", "विकास", "अनुसंधान", "भाषा", "संस्कृति", "विज्ञान", "इतिहास"]
+
+
+def _paragraph(n: int, version: int, words: int = 45) -> str:
+    body = " ".join(WORDS[(n * 7 + i * 3 + version) % len(WORDS)] for i in range(words))
+    return f"अनुच्छेद {n} संस्करण {version}: {body}।"
+
+
+@pytest.fixture
+def llm(db, monkeypatch):
+    """Records every prompt the model would be sent and answers with a fixed analysis."""
+    result_cache._lru.clear()
+    prompts: list[str] = []
+    answer = json.dumps({
+        "ai_probability": 30, "risk_level": "Low", "learning_score": 70,
+        "feedback": "ठीक है", "improvement_tips": "स्रोत जोड़ें",
+    })
+
+    def request_kwargs(text: str, language: str) -> dict:
+        prompts.append(text)
+        return {}
+
+    async def call_async(make, deadline=resilience.LLM_DEADLINE_SECONDS, hedge=True):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))], usage=None)
+
+    monkeypatch.setattr(ai_service, "_request_kwargs", request_kwargs)
+    monkeypatch.setattr(resilience, "call_async", call_async)
+    return prompts
+
+
+def _cached(paragraph: str) -> bool:
+    return result_cache.get(ai_service._paragraph_key(paragraph, "hi")) is not None
+
+
+def test_hindi_runs_fit_the_budget_and_cache_only_what_was_sent(llm):
+    previous = [_paragraph(n, 0) for n in range(20)]
+    content = previous[:2] + [_paragraph(n, 1) for n in range(2, 18)] + previous[18:]
+    assert chunk_chars("\n\n".join(content)) < len("\n\n".join(content[2:18]))  # one CHUNK_CHARS run would be cut
+
+    asyncio.run(ai_service._analyze_document_async("\n\n".join(previous), "hi", 0.0, None))
+    llm.clear()
+    result = asyncio.run(ai_service._analyze_document_async("\n\n".join(content), "hi", 0.0, "\n\n".join(previous)))
+
+    assert result["analysis_source"] == "llm"
+    assert len(llm) > 1
+    assert all(count_tokens(prompt) <= PROMPT_TOKEN_BUDGET for prompt in llm)
+    sent = "\n\n".join(llm)
+    for paragraph in content[2:18]:
+        assert paragraph in sent
+        assert _cached(paragraph)
+
+
+def test_paragraph_cut_from_the_prompt_is_not_cached(llm):
+    previous = [_paragraph(n, 0) for n in range(4)]
+    oversized = " ".join(_paragraph(n, 2) for n in range(40))  # one paragraph, far over the budget
+    content = previous + [oversized]
+
+    asyncio.run(ai_service._analyze_document_async("\n\n".join(previous), "hi", 0.0, None))
+    llm.clear()
+    asyncio.run(ai_service._analyze_document_async("\n\n".join(content), "hi", 0.0, "\n\n".join(previous)))
+
+    assert llm and oversized not in llm[-1]
+    assert not _cached(oversized)
+    assert all(_cached(paragraph) for paragraph in previous)
+
+
+def test_failed_run_falls_back_instead_of_scoring_only_reused_text(llm, monkeypatch):
+    previous = [_paragraph(n, 0) for n in range(4)]
+    content = previous + [_paragraph(n, 3) for n in range(4, 24)]
+    asyncio.run(ai_service._analyze_document_async("\n\n".join(previous), "hi", 0.0, None))
+
+    async def circuit_open(make, deadline=resilience.LLM_DEADLINE_SECONDS, hedge=True):
+        raise resilience.CircuitOpen("LLM circuit open")
+
+    monkeypatch.setattr(resilience, "call_async", circuit_open)
+    result = asyncio.run(ai_service._analyze_document_async("\n\n".join(content), "hi", 0.0, "\n\n".join(previous)))
+
+    assert result["analysis_source"] == "fallback"
+
+
+def test_chunk_answers_with_list_tips_are_reduced(llm, monkeypatch):
+    answer = json.dumps({
+        "ai_probability": 40, "risk_level": "Medium", "learning_score": 60,
+        "feedback": ["पहला", "दूसरा"], "improvement_tips": ["स्रोत जोड़ें", "उदाहरण दें"],
+    })
+
+    async def call_async(make, deadline=resilience.LLM_DEADLINE_SECONDS, hedge=True):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))], usage=None)
+
+    monkeypatch.setattr(resilience, "call_async", call_async)
+    content = "\n\n".join(_paragraph(n, 5) for n in range(20))
+    result = asyncio.run(ai_service._analyze_document_async(content, "hi", 0.0, None))
+
+    assert len(result["chunks"]) > 1
+    assert result["improvement_tips"] == "स्रोत जोड़ें; उदाहरण दें"
+    assert "पहला; दूसरा" in result["feedback"]
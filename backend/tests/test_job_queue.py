@@ -0,0 +1,73 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import models
+import schemas
+from services import job_queue as jq
+
+
+def _job(db, **fields):
+    user = models.User(name="s", email=f"s{datetime.utcnow().timestamp()}@x.com", password_hash="x", role="student")
+    db.add(user)
+    db.flush()
+    assignment = models.Assignment(user_id=user.id, title="t")
+    db.add(assignment)
+    db.flush()
+    draft = models.Draft(assignment_id=assignment.id, content="text")
+    db.add(draft)
+    db.flush()
+    job = models.CheckJob(draft_id=draft.id, user_id=user.id, language="en", **fields)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_recover_leaves_live_leases_alone(db):
+    live = _job(db, status="running", lease_owner="other-process", updated_at=datetime.utcnow())
+    stale = _job(
+        db, status="running", lease_owner="dead-process",
+        updated_at=datetime.utcnow() - timedelta(seconds=jq.CHECK_LEASE_SECONDS + 5),
+    )
+
+    assert jq.JobQueue(workers=1)._recover() == 1
+
+    db.expire_all()
+    assert db.get(models.CheckJob, live).status == "running"
+    assert db.get(models.CheckJob, stale).status == "queued"
+    assert db.get(models.CheckJob, stale).lease_owner is None
+
+
+def test_claim_takes_the_lease_and_only_the_owner_finishes(db):
+    job_id = _job(db, status="queued", run_after=datetime.utcnow() - timedelta(seconds=1))
+    owner, other = jq.JobQueue(workers=1), jq.JobQueue(workers=1)
+
+    claimed = owner._claim()
+    assert claimed.id == job_id
+    assert other._claim() is None
+    assert other._heartbeat(job_id) is False
+    assert owner._heartbeat(job_id) is True
+
+    assert other._finish(job_id, 1, None) is None
+    assert owner._finish(job_id, 1, None) == "succeeded"
+
+
+def test_bulk_job_stores_its_summary(db, monkeypatch):
+    draft_id = db.get(models.CheckJob, _job(db, status="succeeded")).draft_id
+    checked = []
+
+    async def check_drafts_bulk(draft_ids, language):
+        checked.append((draft_ids, language))
+        scores = {"similarity_score": 4.0, "ai_probability": 12.0, "risk_level": "Low", "learning_score": 80}
+        return {draft_id: {**scores, "feedback": "ok"}}, [999]
+
+    monkeypatch.setattr(jq, "check_drafts_bulk", check_drafts_bulk)
+    queue = jq.JobQueue(workers=1)
+    job = queue.enqueue_bulk(db, [draft_id, 999], user_id=1, language=None)
+
+    assert asyncio.run(queue._run_one()) is True
+    assert checked == [([draft_id, 999], None)]
+    db.expire_all()
+    out = schemas.CheckJobOut.model_validate(db.get(models.CheckJob, job.id))
+    assert (out.kind, out.status, out.draft_id) == ("bulk", "succeeded", None)
+    assert out.result.checked == 1 and out.result.not_found == [999]
+    assert out.result.results[0].risk_level == "Low"
@@ -0,0 +1,16 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+def test_metrics_needs_the_token(monkeypatch):
+    client = TestClient(app)  # no lifespan: the endpoint does not need the job queue
+    monkeypatch.delenv("METRICS_TOKEN", raising=False)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setenv("METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 404
+    response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "integrityai_http_requests_total" in response.text
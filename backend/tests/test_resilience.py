@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services import resilience
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    monkeypatch.setattr(resilience, "breaker", resilience.CircuitBreaker(failures=2, cooldown=60))
+    monkeypatch.setattr(resilience, "LLM_MAX_RETRIES", 2)
+    monkeypatch.setattr(resilience, "backoff", lambda attempt, error=None: 0.0)
+
+
+def _flaky(failures: int):
+    attempts = []
+
+    async def make(timeout: float) -> str:
+        attempts.append(timeout)
+        if len(attempts) <= failures:
+            raise httpx.ConnectError("connection refused")
+        return "ok"
+
+    return make, attempts
+
+
+def test_success_after_retries_does_not_move_the_breaker():
+    for _ in range(3):
+        make, attempts = _flaky(failures=2)
+        assert asyncio.run(resilience.call_async(make)) == "ok"
+        assert len(attempts) == 3
+        assert resilience.breaker._consecutive == 0
+        assert resilience.breaker.state == resilience.CircuitBreaker.CLOSED
+
+
+def test_exhausted_call_counts_as_one_failure():
+    make, attempts = _flaky(failures=10)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(resilience.call_async(make))
+    assert len(attempts) == 3
+    assert resilience.breaker._consecutive == 1
+    assert resilience.breaker.state == resilience.CircuitBreaker.CLOSED
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(resilience.call_async(_flaky(failures=10)[0]))
+    assert resilience.breaker.state == resilience.CircuitBreaker.OPEN
+    with pytest.raises(resilience.CircuitOpen):
+        asyncio.run(resilience.call_async(_flaky(failures=0)[0]))
@@ -0,0 +1,51 @@
+from sqlalchemy import event
+
+from database import engine
+import models
+from services.result_cache import ResultCache
+
+
+def _writes_during(action) -> list[str]:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def _hits(db, key: str) -> int:
+    db.expire_all()
+    return db.get(models.CheckCacheEntry, key).hits
+
+
+def test_table_hits_are_buffered_not_written_on_read(db):
+    cache = ResultCache()
+    cache.put("k", {"learning_score": 70})
+    cache.clear_memory()
+
+    writes = _writes_during(lambda: [cache.get("k") for _ in range(3)])
+    assert not [s for s in writes if "check_cache" in s]
+    assert cache.counters["db_hits"] == 1 and cache.counters["memory_hits"] == 2
+    assert _hits(db, "k") == 0
+
+    cache.flush_hits()
+    assert _hits(db, "k") == 1
+
+
+def test_buffered_hits_ride_along_with_the_next_store(db):
+    cache = ResultCache()
+    cache.put("k", {"learning_score": 70})
+    cache.clear_memory()
+    cache.get("k")
+    cache.clear_memory()
+    cache.get("k")
+
+    cache.put("other", {"learning_score": 40})
+    assert _hits(db, "k") == 2
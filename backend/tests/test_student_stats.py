@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import models
+from database import SessionLocal
+from services.check_service import apply_check_result
+
+
+def _result(score: int, risk: str) -> dict:
+    return {
+        "similarity_score": 0.0, "ai_probability": 10.0, "risk_level": risk, "learning_score": score,
+        "feedback": "", "improvement_tips": "", "missing_citations": "",
+    }
+
+
+def _drafts(db, *ages_days):
+    user = models.User(name="s", email="stats@x.com", password_hash="x", role="student")
+    db.add(user)
+    db.flush()
+    assignment = models.Assignment(user_id=user.id, title="t")
+    db.add(assignment)
+    db.flush()
+    drafts = [
+        models.Draft(assignment_id=assignment.id, content="text", created_at=datetime.utcnow() - timedelta(days=age))
+        for age in ages_days
+    ]
+    db.add_all(drafts)
+    db.commit()
+    return user.id, [draft.id for draft in drafts]
+
+
+def _check(draft_id: int, score: int, risk: str) -> None:
+    db = SessionLocal()
+    try:
+        apply_check_result(db.get(models.Draft, draft_id), _result(score, risk), [], "en")
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_concurrent_checks_of_one_draft_count_it_once(db):
+    user_id, (draft_id,) = _drafts(db, 0)
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # Both checks loaded the draft before either saved: both saw learning_score None
+        a, b = first.get(models.Draft, draft_id), second.get(models.Draft, draft_id)
+        assert a.learning_score is None and b.learning_score is None
+        apply_check_result(a, _result(60, "Low"), [], "en")
+        first.commit()
+        apply_check_result(b, _result(80, "Low"), [], "en")
+        second.commit()
+    finally:
+        first.close()
+        second.close()
+
+    stats = db.get(models.StudentStats, user_id)
+    db.refresh(stats)
+    assert (stats.draft_count, stats.score_sum) == (1, 80)
+
+
+def test_recheck_of_an_old_draft_keeps_the_latest_risk(db):
+    user_id, (old, new) = _drafts(db, 30, 1)
+    _check(new, 70, "Low")
+    _check(old, 20, "High")
+
+    stats = db.get(models.StudentStats, user_id)
+    assert stats.latest_risk_level == "Low"
+    assert (stats.draft_count, stats.score_sum) == (2, 90)
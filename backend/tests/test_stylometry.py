@@ -0,0 +1,30 @@
+from services import stylometry
+from tools.corpus import make_text
+
+HUMAN = """I nearly gave up on this essay. My first draft was a mess, honestly, and my tutor said so.
+
+So I went back to the library on Tuesday and found two books on the canal strikes of 1911. One of them was dull. The other, by a retired dock worker, changed how I saw the whole thing: he remembered his father coming home soaked, furious, and broke. I had never thought of a strike as something that happened inside a kitchen.
+
+That is why my argument shifted. Wages mattered, sure. But what kept people out for eleven weeks was pride, and maybe fear of looking weak in front of neighbours. I can't prove that from the numbers alone. Still, the letters I read point that way, and I think the standard account misses it.
+
+Next time I would start with the letters. Reading them last meant rewriting half my plan, which cost me a weekend I did not really have. Lesson learned, I suppose."""
+
+
+def test_prescreen_is_off_until_calibrated():
+    assert not stylometry.CALIBRATED and not stylometry.PRESCREEN_ENABLED
+    assert stylometry.prescreen(HUMAN) is None
+
+
+def test_clearly_human_text_is_answered_locally(monkeypatch):
+    monkeypatch.setattr(stylometry, "PRESCREEN_ENABLED", True)
+    style = stylometry.score(HUMAN)
+    assert style.reliable and style.probability <= stylometry.PRESCREEN_LOW
+    assert stylometry.prescreen(HUMAN)["risk_level"] == "Low"
+
+
+def test_ai_like_text_is_escalated_to_the_llm(monkeypatch):
+    monkeypatch.setattr(stylometry, "PRESCREEN_ENABLED", True)
+    text = make_text(250, 3)
+    style = stylometry.score(text)
+    assert style.reliable and style.probability > 0.9
+    assert stylometry.prescreen(text) is None
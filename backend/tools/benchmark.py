@@ -0,0 +1,388 @@
+"""
+End-to-end benchmark — boots the API against the fake OpenAI server,
+seeds a database at scale and drives concurrent load through the real
+HTTP endpoints. Each scenario reports throughput and p50/p95/p99 latency;
+results are written as JSON so runs can be compared for regressions.
+
+Usage:
+    python -m tools.benchmark                                  # small run
+    python -m tools.benchmark --students 2000 --drafts 50 --requests 1000 --concurrency 32
+    python -m tools.benchmark --compare bench-results/baseline.json
+
+Scenarios:
+    upload      POST /api/files/upload/{id} with a synthetic PDF / PPTX / TXT
+    check       POST /api/drafts/{id}/check, then poll the job until it finishes
+    history     GET  /api/drafts/history/all
+    submissions GET  /api/educator/submissions
+    students    GET  /api/educator/students
+
+Everything lives in --workdir (database, similarity index, corpus, server
+logs); the database is reseeded unless --reuse-db is given.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from tools.corpus import build_corpus, make_text
+from tools.seed_scale import BENCH_EMAIL, BENCH_PASSWORD
+
+SCENARIOS = ["upload", "check", "history", "submissions", "students"]
+JOB_POLL_SECONDS = 0.1
+JOB_TIMEOUT_SECONDS = 300
+BOOT_TIMEOUT_SECONDS = 120
+
+
+# ─── Statistics ──────────────────────────────────────────────────────────────
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values) + 0.5))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered) + errors,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+    }
+
+
+# ─── Processes ───────────────────────────────────────────────────────────────
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(module_app: str, port: int, env: dict, log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module_app, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def _wait_healthy(url: str, proc: subprocess.Popen, log_path: str) -> None:
+    deadline = time.monotonic() + BOOT_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url} exited during startup; see {log_path}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {BOOT_TIMEOUT_SECONDS}s; see {log_path}")
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+# ─── Load ────────────────────────────────────────────────────────────────────
+async def run_scenario(name: str, operation, total: int, concurrency: int) -> dict:
+    """Call `operation(i)` `total` times from `concurrency` workers; it returns its own timed latency."""
+    latencies: list[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal errors, next_index
+        while next_index < total:
+            i = next_index
+            next_index += 1
+            try:
+                latencies.append(await operation(i))
+            except Exception as exc:
+                errors += 1
+                if errors <= 3:
+                    print(f"  {name} #{i} failed: {exc!r}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def _timed(request) -> float:
+    started = time.perf_counter()
+    response = await request
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+class Bench:
+    def __init__(self, client: httpx.AsyncClient, args, corpus: list[str]):
+        self.client = client
+        self.args = args
+        self.corpus = corpus
+        self.rng = random.Random(args.seed)
+        self.students: list[dict] = []  # auth headers
+        self.educator: dict = {}
+
+    async def _login(self, email: str, password: str) -> dict:
+        response = await self.client.post("/api/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def login_all(self) -> None:
+        self.educator = await self._login("educator@demo.com", "demo1234")
+        gate = asyncio.Semaphore(4)
+
+        async def one(n: int) -> dict:
+            async with gate:
+                return await self._login(BENCH_EMAIL.format(n), BENCH_PASSWORD)
+
+        self.students = await asyncio.gather(*(one(n) for n in range(self.args.users)))
+
+    def _student(self, i: int) -> dict:
+        return self.students[i % len(self.students)]
+
+    async def _new_draft(self, headers: dict, content: str) -> int:
+        response = await self.client.post(
+            "/api/drafts/", headers=headers, json={"assignment_id": 0, "content": content},
+        )
+        response.raise_for_status()
+        return response.json()["id"]
+
+    # Setup (draft creation) is not part of the measured latency
+    async def upload(self, i: int) -> float:
+        headers = self._student(i)
+        draft_id = await self._new_draft(headers, "Uploaded document")
+        path = self.corpus[i % len(self.corpus)]
+        with open(path, "rb") as fh:
+            data = fh.read()
+        return await _timed(self.client.post(
+            f"/api/files/upload/{draft_id}", headers=headers,
+            files={"file": (os.path.basename(path), data)},
+        ))
+
+    async def check(self, i: int) -> float:
+        headers = self._student(i)
+        text = make_text(self.args.words, self.args.seed * 1_000_000 + i)  # unique, so no cache hits
+        draft_id = await self._new_draft(headers, text)
+        started = time.perf_counter()
+        response = await self.client.post(f"/api/drafts/{draft_id}/check", headers=headers)
+        response.raise_for_status()
+        job_id = response.json()["id"]
+        while time.perf_counter() - started < JOB_TIMEOUT_SECONDS:
+            await asyncio.sleep(JOB_POLL_SECONDS)
+            response = await self.client.get(f"/api/drafts/jobs/{job_id}", headers=headers)
+            response.raise_for_status()
+            status = response.json()["status"]
+            if status == "succeeded":
+                return time.perf_counter() - started
+            if status == "failed":
+                raise RuntimeError(f"job {job_id} failed: {response.json()['error']}")
+        raise TimeoutError(f"job {job_id} still running after {JOB_TIMEOUT_SECONDS}s")
+
+    async def history(self, i: int) -> float:
+        return await _timed(self.client.get(
+            "/api/drafts/history/all", headers=self._student(i), params={"limit": 50},
+        ))
+
+    async def submissions(self, i: int) -> float:
+        params = {"limit": 50}
+        if i % 3 == 1:
+            params["risk_level"] = "High"
+        elif i % 3 == 2:
+            params["min_ai_probability"] = self.rng.randint(20, 60)
+        return await _timed(self.client.get("/api/educator/submissions", headers=self.educator, params=params))
+
+    async def students_list(self, i: int) -> float:
+        return await _timed(self.client.get("/api/educator/students", headers=self.educator))
+
+
+async def drive(base_url: str, args, corpus: list[str]) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=JOB_TIMEOUT_SECONDS, limits=limits) as client:
+        bench = Bench(client, args, corpus)
+        started = time.perf_counter()
+        await bench.login_all()
+        print(f"Logged in {len(bench.students)} students in {time.perf_counter() - started:.1f}s")
+
+        operations = {
+            "upload": (bench.upload, args.upload_requests),
+            "check": (bench.check, args.check_requests),
+            "history": (bench.history, args.requests),
+            "submissions": (bench.submissions, args.requests),
+            "students": (bench.students_list, args.requests),
+        }
+        results = {}
+        for name in args.scenarios:
+            operation, total = operations[name]
+            print(f"Running {name}: {total} requests at concurrency {args.concurrency}")
+            results[name] = await run_scenario(name, operation, total, args.concurrency)
+            _print_row(name, results[name])
+        return results
+
+
+# ─── Reporting ───────────────────────────────────────────────────────────────
+def _print_row(name: str, r: dict) -> None:
+    print(f"  {name:<12} {r['throughput_rps']:>8.1f} rps  p50 {r['p50_ms']:>8.1f}  p95 {r['p95_ms']:>8.1f}"
+          f"  p99 {r['p99_ms']:>8.1f} ms  errors {r['errors']}")
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of p95 latency or throughput beyond `tolerance` (a fraction)."""
+    regressions = []
+    print(f"\n{'scenario':<12} {'p95 base':>10} {'p95 now':>10} {'change':>8}   {'rps base':>9} {'rps now':>9}")
+    for name, now in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        p95_change = (now["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        print(f"{name:<12} {base['p95_ms']:>10.1f} {now['p95_ms']:>10.1f} {p95_change:>+8.0%}"
+              f"   {base['throughput_rps']:>9.1f} {now['throughput_rps']:>9.1f}")
+        if p95_change > tolerance:
+            regressions.append(f"{name}: p95 {base['p95_ms']} -> {now['p95_ms']} ms")
+        if base["throughput_rps"] and now["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput_rps']} -> {now['throughput_rps']} rps")
+        if now["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {now['errors']}")
+    return regressions
+
+
+# ─── Main ────────────────────────────────────────────────────────────────────
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end API benchmark against the fake OpenAI server.")
+    parser.add_argument("--workdir", default="./bench-work")
+    parser.add_argument("--out", default="./bench-results", help="directory for result JSON")
+    parser.add_argument("--compare", help="baseline result JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression, as a fraction")
+    parser.add_argument("--reuse-db", action="store_true", help="keep an existing seeded database")
+    parser.add_argument("--students", type=int, default=200, help="students to seed")
+    parser.add_argument("--assignments", type=int, default=3, help="assignments per seeded student")
+    parser.add_argument("--drafts", type=int, default=5, help="drafts per seeded assignment")
+    parser.add_argument("--words", type=int, default=400, help="approximate words per draft")
+    parser.add_argument("--users", type=int, default=20, help="students logged in to generate load")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=300, help="requests per read scenario")
+    parser.add_argument("--upload-requests", type=int, default=60)
+    parser.add_argument("--check-requests", type=int, default=60)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset to run")
+    parser.add_argument("--latency-ms", type=float, default=300, help="fake OpenAI response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake OpenAI failure rate")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    args.users = min(args.users, args.students)
+
+    workdir = os.path.abspath(args.workdir)
+    db_path = os.path.join(workdir, "bench.db")
+    index_path = os.path.join(workdir, "similarity_index.log")
+    if not args.reuse_db and os.path.isdir(workdir):
+        shutil.rmtree(workdir)
+    os.makedirs(workdir, exist_ok=True)
+    corpus = build_corpus(os.path.join(workdir, "corpus"), seed=args.seed)
+
+    fake_port, api_port = _free_port(), _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        SIMILARITY_INDEX_PATH=index_path,
+        OPENAI_API_KEY="sk-fake-benchmark",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{fake_port}/v1",
+        FAKE_OPENAI_LATENCY_MS=str(args.latency_ms),
+        FAKE_OPENAI_ERROR_RATE=str(args.error_rate),
+        LOGIN_MAX_FAILURES_PER_IP=str(max(1000, args.users * 10)),
+    )
+
+    if not os.path.exists(db_path):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "tools.seed_scale", "--students", str(args.students),
+             "--assignments", str(args.assignments), "--drafts", str(args.drafts),
+             "--words", str(args.words), "--seed", str(args.seed)],
+            cwd=BACKEND_DIR, env=env, check=True,
+        )
+        print(f"Seeding took {time.perf_counter() - started:.1f}s")
+
+    fake_log, api_log = os.path.join(workdir, "fake_openai.log"), os.path.join(workdir, "api.log")
+    fake = _start("tools.fake_openai:app", fake_port, env, fake_log)
+    api = None
+    try:
+        _wait_healthy(f"http://127.0.0.1:{fake_port}/stats", fake, fake_log)
+        started = time.perf_counter()
+        api = _start("main:app", api_port, env, api_log)
+        _wait_healthy(f"http://127.0.0.1:{api_port}/health", api, api_log)
+        print(f"API up in {time.perf_counter() - started:.1f}s")
+
+        scenarios = asyncio.run(drive(f"http://127.0.0.1:{api_port}", args, corpus))
+        fake_stats = httpx.get(f"http://127.0.0.1:{fake_port}/stats", timeout=5).json()
+    finally:
+        if api is not None:
+            _stop(api)
+        _stop(fake)
+
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "workdir")},
+        },
+        "scenarios": scenarios,
+        "fake_openai": fake_stats,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    out_path = os.path.join(args.out, f"bench-{datetime.utcnow():%Y%m%d-%H%M%S}.json")
+    with open(out_path, "w") as fh:
+        json.dump(result, fh, indent=2)
+    print(f"\nResults written to {out_path}")
+
+    if args.compare:
+        with open(args.compare) as fh:
+            regressions = compare(result, json.load(fh), args.tolerance)
+        if regressions:
+            print("\nRegressions beyond tolerance:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions beyond tolerance.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Synthetic document corpus for benchmarks.
+Generates essay-like text and wraps it as PDF, PPTX or TXT of a chosen size.
+Output is deterministic for a given seed, so runs are comparable.
+
+Usage:
+    python -m tools.corpus ./bench-corpus            # a default mix of sizes
+"""
+
+import io
+import os
+import random
+import sys
+
+TOPICS = [
+    "climate policy", "machine learning", "the industrial revolution", "urban planning",
+    "public health", "renewable energy", "medieval trade routes", "behavioural economics",
+    "coral reef ecology", "the printing press", "supply chains", "quantum computing",
+]
+VERBS = ["shows", "suggests", "challenges", "explains", "illustrates", "questions", "reframes", "supports"]
+NOUNS = [
+    "evidence", "argument", "framework", "trend", "assumption", "outcome", "model",
+    "policy", "experiment", "dataset", "narrative", "approach", "constraint", "benefit",
+]
+ADJECTIVES = ["recent", "careful", "broad", "limited", "surprising", "consistent", "early", "critical"]
+CONNECTIVES = ["However,", "In addition,", "As a result,", "For example,", "By contrast,", "Overall,"]
+
+
+def _sentence(rng: random.Random, topic: str) -> str:
+    words = [
+        rng.choice(CONNECTIVES) if rng.random() < 0.3 else "",
+        "The", rng.choice(ADJECTIVES), rng.choice(NOUNS), "on", topic, rng.choice(VERBS),
+        "that the", rng.choice(NOUNS), "is", rng.choice(ADJECTIVES), "and",
+        rng.choice(["measurable", "contested", "important", "overlooked", "growing"]),
+    ]
+    if rng.random() < 0.2:
+        words.append(f"({rng.choice(['Smith', 'Lee', 'Garcia', 'Chen'])}, {rng.randint(1990, 2024)})")
+    return " ".join(w for w in words if w) + "."
+
+
+def make_text(words: int, seed: int = 0) -> str:
+    """Roughly `words` words in paragraphs of 4-8 sentences."""
+    rng = random.Random(seed)
+    topic = rng.choice(TOPICS)
+    paragraphs, count = [], 0
+    while count < words:
+        paragraph = " ".join(_sentence(rng, topic) for _ in range(rng.randint(4, 8)))
+        paragraphs.append(paragraph)
+        count += len(paragraph.split())
+    return "\n\n".join(paragraphs)
+
+
+def make_txt(words: int, seed: int = 0) -> bytes:
+    return make_text(words, seed).encode("utf-8")
+
+
+def make_pdf(pages: int, seed: int = 0, words_per_page: int = 350) -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for page_no in range(pages):
+        page = doc.new_page()
+        text = make_text(words_per_page, seed * 10_000 + page_no)
+        page.insert_textbox(fitz.Rect(54, 54, 558, 790), text, fontsize=9)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_pptx(slides: int, seed: int = 0, words_per_slide: int = 80) -> bytes:
+    from pptx import Presentation
+
+    prs = Presentation()
+    for slide_no in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"Slide {slide_no + 1}"
+        slide.placeholders[1].text = make_text(words_per_slide, seed * 10_000 + slide_no)
+    buf = io.BytesIO()
+    prs.save(buf)
+    return buf.getvalue()
+
+
+# (filename, builder, size) – a spread of small and large uploads
+DEFAULT_MIX = [
+    ("essay-short.txt", make_txt, 400),
+    ("essay-long.txt", make_txt, 4000),
+    ("paper-5p.pdf", make_pdf, 5),
+    ("thesis-60p.pdf", make_pdf, 60),
+    ("deck-10s.pptx", make_pptx, 10),
+    ("deck-40s.pptx", make_pptx, 40),
+]
+
+
+def build_corpus(out_dir: str, mix=DEFAULT_MIX, seed: int = 0) -> list[str]:
+    """Write the mix to `out_dir` (existing files are kept). Returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i, (name, builder, size) in enumerate(mix):
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path):
+            with open(path, "wb") as fh:
+                fh.write(builder(size, seed + i))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    for path in build_corpus(sys.argv[1] if len(sys.argv) > 1 else "./bench-corpus"):
+        print(f"{os.path.getsize(path):>10,}  {path}")
@@ -0,0 +1,123 @@
+"""
+Fake OpenAI server — a local stand-in for the chat completions endpoint.
+Answers with deterministic scores derived from the submission text, and
+understands the packed "### Submission <id>" format used by bulk checks.
+Requests with "stream": true get server-sent chunks: the first one after a
+fifth of the latency, the rest spread over the remainder.
+
+Usage:
+    uvicorn tools.fake_openai:app --port 8001
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=fake uvicorn main:app
+
+Environment:
+    FAKE_OPENAI_LATENCY_MS   simulated response time (default 300)
+    FAKE_OPENAI_ERROR_RATE   fraction of requests answered with HTTP 500 (default 0)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_MS = float(os.getenv("FAKE_OPENAI_LATENCY_MS", "300"))
+ERROR_RATE = float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0"))
+STREAM_PIECE_CHARS = 8
+
+_SUBMISSION_RE = re.compile(r"^### Submission (\d+)\n", re.MULTILINE)
+
+app = FastAPI(title="Fake OpenAI")
+stats = {"requests": 0, "errors": 0}
+
+
+def fake_analysis(text: str) -> dict:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+    ai_probability = seed % 60 + 5
+    learning_score = 95 - seed % 40
+    risk = "High" if ai_probability > 50 else "Medium" if ai_probability > 30 else "Low"
+    return {
+        "ai_probability": ai_probability,
+        "risk_level": risk,
+        "learning_score": learning_score,
+        "feedback": "Fake analysis: the argument is clear and mostly in your own words.",
+        "improvement_tips": "Cite your sources; Add a concrete example; Tighten the conclusion.",
+    }
+
+
+def _answer(user_message: str) -> dict:
+    parts = _SUBMISSION_RE.split(user_message)
+    if len(parts) > 1:
+        # parts = [preamble, id1, text1, id2, text2, ...]
+        return {"results": {parts[i]: fake_analysis(parts[i + 1]) for i in range(1, len(parts), 2)}}
+    return fake_analysis(user_message)
+
+
+def _stream(completion_id: str, model: str, content: str, usage: dict, include_usage: bool):
+    def chunk(delta: dict, finish_reason=None, **extra) -> str:
+        choices = [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else []
+        payload = {
+            "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": model, "choices": choices, **extra,
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    async def events():
+        pieces = [content[i:i + STREAM_PIECE_CHARS] for i in range(0, len(content), STREAM_PIECE_CHARS)]
+        gap = LATENCY_MS * 0.8 / 1000 / max(len(pieces), 1)
+        yield chunk({"role": "assistant", "content": ""})
+        for piece in pieces:
+            await asyncio.sleep(gap)
+            yield chunk({"content": piece})
+        yield chunk({}, finish_reason="stop")
+        if include_usage:
+            yield chunk(None, usage=usage)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+    await asyncio.sleep(LATENCY_MS / 1000 * (0.2 if body.get("stream") else 1))
+
+    if ERROR_RATE and random.random() < ERROR_RATE:
+        stats["errors"] += 1
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Simulated upstream failure", "type": "server_error"}},
+        )
+
+    user_message = next((m["content"] for m in reversed(body["messages"]) if m["role"] == "user"), "")
+    content = json.dumps(_answer(user_message))
+    prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+    completion_tokens = len(content) // 4
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+    if body.get("stream"):
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        return _stream(f"chatcmpl-fake-{stats['requests']}", body.get("model", "gpt-4o-mini"), content, usage, include_usage)
+    return {
+        "id": f"chatcmpl-fake-{stats['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": usage,
+    }
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
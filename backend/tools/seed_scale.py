@@ -0,0 +1,152 @@
+"""
+Scale seed — fills a database with many students, assignments and scored
+drafts for benchmarking. Runs seed.py first, so the demo accounts exist too.
+Rows go in through bulk inserts; every generated student shares one
+password hash (BENCH_PASSWORD), which keeps seeding free of bcrypt cost.
+
+Usage:
+    DATABASE_URL=sqlite:///./bench.db python -m tools.seed_scale --students 2000 --drafts 50
+"""
+
+import argparse
+import os
+import random
+import runpy
+import sys
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import func, insert
+
+from database import SessionLocal, ensure_columns, ensure_indexes
+import models
+from models import PREVIEW_CHARS
+from services import student_stats
+from tools.corpus import make_text
+from utils.passwords import pwd_context
+
+BENCH_PASSWORD = "bench1234"
+BENCH_EMAIL = "bench-student-{}@demo.com"
+BATCH_ROWS = 2000
+
+
+def _risk(ai_probability: float) -> str:
+    return "High" if ai_probability > 50 else "Medium" if ai_probability > 30 else "Low"
+
+
+def _chunks(rows, size=BATCH_ROWS):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def seed(students: int, assignments: int, drafts: int, words: int, scored: float, seed_value: int = 0) -> dict:
+    """Add `students` students with `assignments` x `drafts` drafts each. Returns counts."""
+    runpy.run_path(os.path.join(BACKEND_DIR, "seed.py"))
+    ensure_columns()
+    ensure_indexes()
+
+    rng = random.Random(seed_value)
+    password_hash = pwd_context.hash(BENCH_PASSWORD)
+    now = datetime.utcnow()
+    # A pool of texts reused across drafts; distinct enough for the similarity index
+    texts = [make_text(words, seed_value + i) for i in range(200)]
+
+    db = SessionLocal()
+    try:
+        start = db.query(models.User).filter(models.User.email.like("bench-student-%")).count()
+        user_rows = [
+            {
+                "name": f"Bench Student {n}", "email": BENCH_EMAIL.format(n),
+                "password_hash": password_hash, "role": "student", "created_at": now,
+            }
+            for n in range(start, start + students)
+        ]
+        last_user = db.query(func.max(models.User.id)).scalar() or 0
+        for batch in _chunks(user_rows):
+            db.execute(insert(models.User.__table__), batch)
+        user_ids = [uid for (uid,) in db.query(models.User.id).filter(models.User.id > last_user)]
+
+        assignment_rows = [
+            {"user_id": uid, "title": f"Essay {a + 1}", "created_at": now - timedelta(days=90)}
+            for uid in user_ids for a in range(assignments)
+        ]
+        last_assignment = db.query(func.max(models.Assignment.id)).scalar() or 0
+        for batch in _chunks(assignment_rows):
+            db.execute(insert(models.Assignment.__table__), batch)
+        assignment_ids = [
+            aid for (aid,) in db.query(models.Assignment.id).filter(models.Assignment.id > last_assignment)
+        ]
+
+        draft_rows = []
+        added = 0
+        for aid in assignment_ids:
+            for _ in range(drafts):
+                text = rng.choice(texts)
+                row = {
+                    "assignment_id": aid, "content": text, "content_length": len(text),
+                    "content_preview": text[:PREVIEW_CHARS], "language": "en",
+                    "created_at": now - timedelta(days=rng.randint(0, 89), seconds=rng.randint(0, 86_399)),
+                    "similarity_score": None, "ai_probability": None, "risk_level": None, "learning_score": None,
+                }
+                if rng.random() < scored:
+                    ai_probability = float(rng.randint(5, 80))
+                    row.update(
+                        similarity_score=float(rng.randint(0, 60)), ai_probability=ai_probability,
+                        risk_level=_risk(ai_probability), learning_score=rng.randint(40, 98),
+                    )
+                draft_rows.append(row)
+            if len(draft_rows) >= BATCH_ROWS:
+                db.execute(insert(models.Draft.__table__), draft_rows)
+                added += len(draft_rows)
+                draft_rows = []
+        if draft_rows:
+            db.execute(insert(models.Draft.__table__), draft_rows)
+            added += len(draft_rows)
+        db.commit()
+
+        student_stats.rebuild(db)
+        return {"students": len(user_ids), "assignments": len(assignment_ids), "drafts": added}
+    finally:
+        db.close()
+
+
+def build_similarity_index() -> int:
+    """Index the seeded drafts now, so the app's first boot does not have to."""
+    from services.similarity_index import similarity_index
+
+    db = SessionLocal()
+    try:
+        similarity_index.load()
+        if len(similarity_index):
+            return 0
+        return similarity_index.build_from_db(db)
+    finally:
+        db.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a database at benchmark scale.")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--assignments", type=int, default=3, help="assignments per student")
+    parser.add_argument("--drafts", type=int, default=5, help="drafts per assignment")
+    parser.add_argument("--words", type=int, default=300, help="approximate words per draft")
+    parser.add_argument("--scored", type=float, default=0.8, help="fraction of drafts with scores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-index", action="store_true", help="skip building the similarity index")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    counts = seed(args.students, args.assignments, args.drafts, args.words, args.scored, args.seed)
+    print(f"Seeded {counts['students']} students, {counts['assignments']} assignments, "
+          f"{counts['drafts']} drafts in {time.perf_counter() - started:.1f}s")
+    if not args.no_index:
+        started = time.perf_counter()
+        print(f"Indexed {build_similarity_index()} documents in {time.perf_counter() - started:.1f}s")
+    print(f"Students log in as {BENCH_EMAIL.format('<n>')} / {BENCH_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
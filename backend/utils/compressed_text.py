@@ -0,0 +1,46 @@
+"""
+CompressedText – a Text column stored zlib-compressed.
+Values of COMPRESS_MIN_CHARS or more are written as a marker followed by
+base85 of the zlib stream, so they still fit an ordinary TEXT column on
+SQLite and Postgres alike. Reads decompress marked values and pass anything
+else through, so rows written before compression was enabled keep working.
+"""
+
+import base64
+import os
+import zlib
+
+from sqlalchemy.types import Text, TypeDecorator
+
+COMPRESS_MIN_CHARS = int(os.getenv("COMPRESS_MIN_CHARS", "512"))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+
+MARKER = "\x01z:"
+
+
+def compress(value: str) -> str:
+    return MARKER + base64.b85encode(zlib.compress(value.encode("utf-8"), COMPRESS_LEVEL)).decode("ascii")
+
+
+def decompress(value: str) -> str:
+    return zlib.decompress(base64.b85decode(value[len(MARKER):])).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if value.startswith(MARKER):
+            return compress(value)  # would otherwise be misread as compressed
+        if len(value) < COMPRESS_MIN_CHARS:
+            return value
+        packed = compress(value)
+        return packed if len(packed) < len(value) else value
+
+    def process_result_value(self, value, dialect):
+        if value is None or not value.startswith(MARKER):
+            return value
+        return decompress(value)
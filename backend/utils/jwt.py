@@ -1,16 +1,28 @@
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from collections import OrderedDict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 from database import get_db
+from typing import Optional
 import models
+import hashlib
 import os
+import threading
+import time
 
 SECRET_KEY = os.getenv("SECRET_KEY", "change-me-in-production-super-secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# Per-process caches so authenticated reads skip the users SELECT and the HMAC check
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 def create_access_token(data: dict) -> str:
@@ -19,22 +31,100 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+class TTLCache:
+    """Small thread-safe LRU whose entries also expire after their own TTL."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[object, tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_token_cache = TTLCache(TOKEN_CACHE_MAX_ENTRIES)
+_user_cache = TTLCache(USER_CACHE_MAX_ENTRIES)
+
+
+def _token_subject(token: str) -> int:
+    """User id from a verified token. Verified tokens are remembered until they expire."""
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        user_id, expires_at = cached
+        if expires_at > time.time():
+            return user_id
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    user_id = int(payload["sub"])
+    expires_at = float(payload.get("exp", time.time()))
+    _token_cache.put(key, (user_id, expires_at), min(TOKEN_CACHE_TTL_SECONDS, expires_at - time.time()))
+    return user_id
+
+
+def invalidate_user(user_id: Optional[int] = None) -> None:
+    """Forget one cached user (or all). ORM updates and deletes call this automatically."""
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(user_id)
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _user_changed(mapper, connection, target) -> None:
+    invalidate_user(target.id)
+
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+    """
+    The authenticated user, as a detached snapshot. Served from a short-lived
+    per-process cache; bulk UPDATEs on users bypass the ORM events, so call
+    invalidate_user after them.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        user_id = _token_subject(token)
+    except (JWTError, KeyError, TypeError, ValueError):
         raise credentials_exception
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
+
+    user = _user_cache.get(user_id)
     if user is None:
-        raise credentials_exception
+        user = db.query(models.User).filter(models.User.id == user_id).first()
+        if user is None:
+            raise credentials_exception
+        db.expunge(user)
+        _user_cache.put(user_id, user, USER_CACHE_TTL_SECONDS)
     return user
 
 def require_educator(current_user: models.User = Depends(get_current_user)) -> models.User:
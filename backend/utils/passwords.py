@@ -0,0 +1,69 @@
+"""
+Password hashing on a dedicated, bounded bcrypt pool.
+bcrypt is deliberately slow; running it on the request threadpool lets a
+burst of logins occupy every thread. Work goes to BCRYPT_WORKERS threads
+instead, and once BCRYPT_QUEUE_MAX calls are waiting new ones are refused
+with 503 rather than queued behind them.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", "2"))
+BCRYPT_QUEUE_MAX = int(os.getenv("BCRYPT_QUEUE_MAX", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Verified against when the email is unknown, so both cases take the same time
+_DUMMY_HASH = pwd_context.hash("integrityai-dummy-password")
+
+_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+class PasswordQueueFull(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="Too many sign-ins at once. Please try again in a few seconds.",
+            headers={"Retry-After": "5"},
+        )
+
+
+def _truncate(password: str) -> str:
+    # bcrypt supports only 72 characters
+    return password[:72]
+
+
+async def _run(func, *args):
+    global _pending
+    with _pending_lock:
+        if _pending >= BCRYPT_QUEUE_MAX:
+            raise PasswordQueueFull()
+        _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(pwd_context.hash, _truncate(password))
+
+
+async def verify_password(password: str, password_hash: Optional[str]) -> bool:
+    """False for a wrong password or an unknown user (pass password_hash=None)."""
+    ok = await _run(pwd_context.verify, _truncate(password), password_hash or _DUMMY_HASH)
+    return ok and password_hash is not None
+
+
+def queue_depth() -> int:
+    return _pending
@@ -0,0 +1,52 @@
+"""
+In-process sliding-window counters, used to throttle login attempts.
+Each API process keeps its own windows; that is enough to blunt password
+guessing and login storms without a shared store.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class SlidingWindowLimiter:
+    def __init__(self, limit: int, window_seconds: float, max_keys: int = 100_000):
+        self.limit = limit
+        self.window = window_seconds
+        self.max_keys = max_keys
+        self._events: dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def _trim(self, key: str, now: float) -> Optional[deque]:
+        events = self._events.get(key)
+        if events is None:
+            return None
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return None
+        return events
+
+    def retry_after(self, key: str) -> Optional[int]:
+        """Seconds until `key` may try again, or None if it is under the limit."""
+        now = time.monotonic()
+        with self._lock:
+            events = self._trim(key, now)
+            if events is None or len(events) < self.limit:
+                return None
+            return max(1, math.ceil(events[0] + self.window - now))
+
+    def hit(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if key not in self._events and len(self._events) >= self.max_keys:
+                # Drop the stalest key rather than growing without bound
+                self._events.pop(next(iter(self._events)))
+            self._events.setdefault(key, deque()).append(now)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._events.pop(key, None)
@@ -0,0 +1,69 @@
+"""
+Upload size limit enforced on the raw request stream.
+Multipart bodies are parsed before a route handler runs, so the handler's own
+size check alone would still receive (and spool) an oversized upload in full.
+This middleware rejects by Content-Length up front and, for chunked bodies,
+stops reading as soon as the limit is crossed.
+"""
+import json
+from fastapi import HTTPException
+
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+MULTIPART_OVERHEAD = 64 * 1024    # boundaries and part headers around the file
+
+UPLOAD_PATH_PREFIX = "/api/files/upload"
+
+
+class UploadTooLarge(HTTPException):
+    # An HTTPException, so FastAPI's body parsing re-raises it as a 413 instead of a generic 400
+    def __init__(self):
+        super().__init__(status_code=413, detail="File too large. Maximum allowed size is 10 MB.")
+
+
+class UploadSizeLimitMiddleware:
+    def __init__(self, app, max_body: int = MAX_FILE_SIZE + MULTIPART_OVERHEAD):
+        self.app = app
+        self.max_body = max_body
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(UPLOAD_PATH_PREFIX):
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        length = headers.get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_body:
+            return await self._reject(send)
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body:
+                    raise UploadTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except UploadTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    @staticmethod
+    async def _reject(send):
+        body = json.dumps({"detail": UploadTooLarge().detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"connection", b"close")],
+        })
+        await send({"type": "http.response.body", "body": body})
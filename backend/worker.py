@@ -0,0 +1,44 @@
+"""
+Standalone check worker — drains the integrity check queue without serving HTTP.
+Run the API with CHECK_WORKERS=0 and scale this process separately.
+Usage: CHECK_WORKERS=8 python worker.py
+"""
+import asyncio
+import logging
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database import engine, Base, ensure_columns, ensure_indexes
+from services.similarity_index import similarity_index
+from services.ai_service import close_async_engine
+from services.job_queue import JobQueue, CHECK_WORKERS
+from services.result_cache import result_cache
+import models  # noqa: F401 – ensures models are registered
+
+logger = logging.getLogger("worker")
+
+
+async def main():
+    Base.metadata.create_all(bind=engine)
+    ensure_columns()
+    ensure_indexes()
+    similarity_index.load()
+
+    queue = JobQueue(workers=max(CHECK_WORKERS, 1))
+    await queue.start()
+    logger.info("Check worker running with %d workers. Ctrl+C to stop.", queue.workers)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await queue.stop()
+        result_cache.flush_hits()
+        await close_async_engine()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -8,12 +8,12 @@ import BottomNav from '@/components/layout/BottomNav';
 import ScoreMeter from '@/components/ui/ScoreMeter';
 import RiskBadge from '@/components/ui/RiskBadge';
 import { SkeletonCard } from '@/components/ui/Skeleton';
-import type { Draft } from '@/types';
+import type { DraftSummary } from '@/types';
 
 export default function DashboardPage() {
   const router = useRouter();
   const user = useAuthStore((s) => s.user);
-  const [drafts, setDrafts] = useState<Draft[]>([]);
+  const [drafts, setDrafts] = useState<DraftSummary[]>([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -141,7 +141,7 @@ export default function DashboardPage() {
                       <p className="text-xs text-white/30 mt-0.5">
                         {new Date(draft.created_at).toLocaleDateString()}
                       </p>
-                      <p className="text-xs text-white/50 mt-2 line-clamp-2">{draft.content.slice(0, 100)}…</p>
+                      <p className="text-xs text-white/50 mt-2 line-clamp-2">{(draft.content_preview ?? '').slice(0, 100)}…</p>
                     </div>
                     {draft.learning_score !== null && (
                       <ScoreMeter score={draft.learning_score} size={56} label="" />
@@ -2,7 +2,7 @@
 import { useEffect, useRef, useState, useCallback } from 'react';
 import { useRouter } from 'next/navigation';
 import { initAuth } from '@/lib/store';
-import { createAssignment, createDraft, runIntegrityCheck, uploadFile } from '@/lib/api';
+import { createAssignment, createDraft, runIntegrityCheck, streamIntegrityCheck, uploadFile } from '@/lib/api';
 import BottomNav from '@/components/layout/BottomNav';
 import ScoreMeter from '@/components/ui/ScoreMeter';
 import RiskBadge from '@/components/ui/RiskBadge';
@@ -304,6 +304,15 @@ function ResultsView({
           </div>
         </div>
 
+        {/* Local estimate: the LLM could not be reached */}
+        {result.analysis_source === 'fallback' && (
+          <div className="card p-4 border-yellow-400/30">
+            <p className="text-sm text-yellow-300/90 leading-relaxed">
+              ⚠️ These scores are a local estimate because the full review was unavailable. Check again later for detailed feedback.
+            </p>
+          </div>
+        )}
+
         {/* Feedback */}
         {result.feedback && (
           <div className="card p-4 border-brand-500/20">
@@ -336,7 +345,7 @@ function ResultsView({
                 <span>📚</span>
                 <span className="font-semibold text-sm">Citation Suggestions</span>
               </div>
-              <p className="text-sm text-white/70 leading-relaxed">{result.missing_citations}</p>
+              <p className="text-sm text-white/70 leading-relaxed whitespace-pre-line">{result.missing_citations}</p>
             </div>
           )}
 
@@ -490,7 +499,17 @@ export default function DraftPage() {
       });
 
       setStatusMsg('Analysing with AI…');
-      const checked = await runIntegrityCheck(draft.id, language);
+      // Show the results as soon as the scores arrive; fall back to the queued check
+      let shown = false;
+      const checked = await streamIntegrityCheck(draft, language, (partial) => {
+        if (partial.ai_probability === null || partial.ai_probability === undefined) return;
+        shown = true;
+        setResult(partial);
+        setStep('result');
+      }).catch((err) => {
+        if (shown) throw err;
+        return runIntegrityCheck(draft.id, language);
+      });
       setResult(checked);
       setStep('result');
     } catch (err: any) {
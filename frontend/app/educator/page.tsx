@@ -2,7 +2,7 @@
 import { useEffect, useState } from 'react';
 import { useRouter } from 'next/navigation';
 import { initAuth, useAuthStore } from '@/lib/store';
-import { getSubmissions, getStudents, getPolicy, setPolicy } from '@/lib/api';
+import { getSubmissionsPage, getEducatorSummary, getStudents, getPolicy, setPolicy } from '@/lib/api';
 import { SkeletonCard } from '@/components/ui/Skeleton';
 import RiskBadge from '@/components/ui/RiskBadge';
 import ScoreMeter from '@/components/ui/ScoreMeter';
@@ -15,6 +15,9 @@ export default function EducatorPage() {
   const [tab, setTab] = useState<Tab>('students');
   const [students, setStudents] = useState<any[]>([]);
   const [submissions, setSubmissions] = useState<any[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [summary, setSummary] = useState({ students: 0, drafts: 0, high_risk_drafts: 0 });
   const [policy, setPolicyState] = useState({ similarity_threshold: 30, min_drafts: 2 });
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
@@ -30,14 +33,29 @@ export default function EducatorPage() {
   async function loadAll() {
     setLoading(true);
     try {
-      const [s, sub, pol] = await Promise.all([getStudents(), getSubmissions(), getPolicy()]);
+      const [s, sub, sum, pol] = await Promise.all([
+        getStudents(), getSubmissionsPage(), getEducatorSummary(), getPolicy(),
+      ]);
       setStudents(s);
-      setSubmissions(sub);
+      setSubmissions(sub.items);
+      setNextCursor(sub.next_cursor);
+      setSummary(sum);
       setPolicyState({ similarity_threshold: pol.similarity_threshold, min_drafts: pol.min_drafts });
     } catch {}
     setLoading(false);
   }
 
+  async function loadMoreSubmissions() {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await getSubmissionsPage({ cursor: nextCursor });
+      setSubmissions((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch {}
+    setLoadingMore(false);
+  }
+
   async function savePolicy() {
     setSaving(true);
     try {
@@ -73,17 +91,15 @@ export default function EducatorPage() {
       {/* Stats */}
       <div className="px-4 grid grid-cols-3 gap-3 mb-4">
         <div className="card p-3 text-center">
-          <p className="text-2xl font-bold text-brand-400">{students.length}</p>
+          <p className="text-2xl font-bold text-brand-400">{summary.students}</p>
           <p className="text-xs text-white/40 mt-0.5">Students</p>
         </div>
         <div className="card p-3 text-center">
-          <p className="text-2xl font-bold text-accent-400">{submissions.length}</p>
+          <p className="text-2xl font-bold text-accent-400">{summary.drafts}</p>
           <p className="text-xs text-white/40 mt-0.5">Drafts</p>
         </div>
         <div className="card p-3 text-center">
-          <p className="text-2xl font-bold text-yellow-400">
-            {submissions.filter((s) => s.risk_level === 'High').length}
-          </p>
+          <p className="text-2xl font-bold text-yellow-400">{summary.high_risk_drafts}</p>
           <p className="text-xs text-white/40 mt-0.5">High Risk</p>
         </div>
       </div>
@@ -138,8 +154,8 @@ export default function EducatorPage() {
               <div className="card p-8 text-center">
                 <p className="text-white/40 text-sm">No submissions yet.</p>
               </div>
-            ) : submissions.map((s: any, i: number) => (
-              <div key={i} className="card p-4">
+            ) : submissions.map((s: any) => (
+              <div key={s.draft_id} className="card p-4">
                 <div className="flex items-start justify-between gap-2">
                   <div className="flex-1 min-w-0">
                     <p className="font-semibold text-sm">{s.student_name}</p>
@@ -160,6 +176,15 @@ export default function EducatorPage() {
                 )}
               </div>
             ))}
+            {nextCursor && (
+              <button
+                onClick={loadMoreSubmissions}
+                disabled={loadingMore}
+                className="w-full text-sm text-white/60 hover:text-white disabled:opacity-50 py-3 rounded-xl bg-white/5 transition-colors"
+              >
+                {loadingMore ? 'Loading…' : `Load more (${submissions.length} of ${summary.drafts})`}
+              </button>
+            )}
           </div>
         ) : (
           <div className="card p-5 flex flex-col gap-5">
@@ -71,6 +71,14 @@ export default function DraftDetailPage() {
           <p className="text-sm text-white/70 leading-relaxed whitespace-pre-wrap line-clamp-6">{draft.content}</p>
         </div>
 
+        {draft.analysis_source === 'fallback' && (
+          <div className="card p-4 border-yellow-400/30">
+            <p className="text-sm text-yellow-300/90 leading-relaxed">
+              ⚠️ These scores are a local estimate because the full review was unavailable. Check again later for detailed feedback.
+            </p>
+          </div>
+        )}
+
         {draft.feedback && (
           <div className="card p-4 border-brand-500/20">
             <p className="text-xs text-white/40 uppercase tracking-wide font-medium mb-2">💬 AI Feedback</p>
@@ -88,7 +96,7 @@ export default function DraftDetailPage() {
         {draft.missing_citations && draft.missing_citations !== 'No missing citations detected' && (
           <div className="card p-4 border-yellow-400/20">
             <p className="text-xs text-white/40 uppercase tracking-wide font-medium mb-2">📚 Citation Suggestions</p>
-            <p className="text-sm text-white/70 leading-relaxed">{draft.missing_citations}</p>
+            <p className="text-sm text-white/70 leading-relaxed whitespace-pre-line">{draft.missing_citations}</p>
           </div>
         )}
 
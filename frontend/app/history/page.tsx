@@ -8,11 +8,11 @@ import BottomNav from '@/components/layout/BottomNav';
 import ScoreMeter from '@/components/ui/ScoreMeter';
 import RiskBadge from '@/components/ui/RiskBadge';
 import { SkeletonCard } from '@/components/ui/Skeleton';
-import type { Draft } from '@/types';
+import type { DraftSummary } from '@/types';
 
 export default function HistoryPage() {
   const router = useRouter();
-  const [drafts, setDrafts] = useState<Draft[]>([]);
+  const [drafts, setDrafts] = useState<DraftSummary[]>([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -49,7 +49,7 @@ export default function HistoryPage() {
                     {draft.risk_level && <RiskBadge level={draft.risk_level as any} />}
                   </div>
                   <p className="text-xs text-white/30 mt-0.5">{new Date(draft.created_at).toLocaleString()}</p>
-                  <p className="text-xs text-white/50 mt-2 line-clamp-2">{draft.content.slice(0, 120)}</p>
+                  <p className="text-xs text-white/50 mt-2 line-clamp-2">{(draft.content_preview ?? '').slice(0, 120)}</p>
 
                   {draft.similarity_score !== null && (
                     <div className="flex gap-4 mt-3">
@@ -1,5 +1,6 @@
 import axios from "axios";
 import Cookies from "js-cookie";
+import type { Draft } from "@/types";
 
 // Base URL setup
 const API_URL =
@@ -71,13 +72,80 @@ export const createDraft = (data: {
   language?: string;
 }) => api.post("/api/drafts/", data).then((r) => r.data);
 
-export const runIntegrityCheck = (draftId: number, language = "en") =>
-  api
+export const getCheckJob = (jobId: number) =>
+  api.get(`/api/drafts/jobs/${jobId}`).then((r) => r.data);
+
+// Checks run in a background queue: enqueue, poll the job, then load the draft
+export const runIntegrityCheck = async (draftId: number, language = "en") => {
+  let job = await api
     .post(`/api/drafts/${draftId}/check?language=${language}`)
     .then((r) => r.data);
 
+  while (job.status === "queued" || job.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, 1500));
+    job = await getCheckJob(job.id);
+  }
+  if (job.status === "failed") {
+    throw new Error(job.error || "The integrity check failed. Please try again.");
+  }
+  return getDraft(draftId);
+};
+
+// Runs the check now and streams it (Server-Sent Events over a POST, so fetch
+// rather than EventSource). onUpdate gets the draft as it fills in: scores
+// first, then feedback and tips as they are written. Resolves with the saved draft.
+export const streamIntegrityCheck = async (
+  draft: Draft,
+  language = "en",
+  onUpdate: (draft: Draft) => void
+): Promise<Draft> => {
+  const token = Cookies.get("token");
+  const res = await fetch(`${API_URL}/api/drafts/${draft.id}/check/stream?language=${language}`, {
+    method: "POST",
+    headers: token ? { Authorization: `Bearer ${token}` } : {},
+  });
+  if (!res.ok || !res.body) {
+    const body = await res.json().catch(() => ({}));
+    throw new Error(body.detail || "The integrity check failed. Please try again.");
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let current: Draft = { ...draft };
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let end;
+    while ((end = buffer.indexOf("\n\n")) >= 0) {
+      const message = buffer.slice(0, end);
+      buffer = buffer.slice(end + 2);
+      const event = /^event: (.*)$/m.exec(message)?.[1];
+      const data = JSON.parse(/^data: (.*)$/m.exec(message)?.[1] ?? "null");
+      if (event === "done") return data as Draft;
+      if (event === "error") throw new Error(data.detail);
+      if (event === "scores") {
+        // A scores event starts the text fields afresh
+        current = { ...current, ...data, feedback: "", improvement_tips: "" };
+      } else if (event === "delta") {
+        const field = data.field as "feedback" | "improvement_tips";
+        current = { ...current, [field]: (current[field] ?? "") + data.text };
+      } else {
+        current = { ...current, ...data };
+      }
+      onUpdate(current);
+    }
+  }
+  throw new Error("The integrity check was interrupted. Please try again.");
+};
+
+// Paginated summaries: pass the previous page's next_cursor to continue
+export const getDraftHistoryPage = (params: { cursor?: string; limit?: number } = {}) =>
+  api.get("/api/drafts/history/all", { params }).then((r) => r.data);
+
 export const getDraftHistory = () =>
-  api.get("/api/drafts/history/all").then((r) => r.data);
+  getDraftHistoryPage().then((page) => page.items);
 
 export const getDraft = (id: number) =>
   api.get(`/api/drafts/${id}`).then((r) => r.data);
@@ -110,8 +178,13 @@ export const uploadFile = (
    Educator
 ====================== */
 
-export const getSubmissions = () =>
-  api.get("/api/educator/submissions").then((r) => r.data);
+// Paginated: pass the previous page's next_cursor to continue
+export const getSubmissionsPage = (params: Record<string, any> = {}) =>
+  api.get("/api/educator/submissions", { params }).then((r) => r.data);
+
+// Totals over all student drafts; pages of submissions only show what is loaded
+export const getEducatorSummary = () =>
+  api.get("/api/educator/summary").then((r) => r.data);
 
 export const getStudents = () =>
   api.get("/api/educator/students").then((r) => r.data);
@@ -13,6 +13,26 @@ export interface Assignment {
   created_at: string;
 }
 
+export interface CitationFinding {
+  kind: 'quote' | 'statistic' | 'claim';
+  start: number;
+  end: number;
+  excerpt: string;
+}
+
+// Local citation analysis; missing_citations is its plain-text summary
+export interface CitationReport {
+  style: string;
+  citation_count: number;
+  styles: Record<string, number>;
+  reference_section: boolean;
+  reference_entries: number;
+  dois: string[];
+  urls: string[];
+  uncited: CitationFinding[];
+  cited_passages: number;
+}
+
 export interface Draft {
   id: number;
   assignment_id: number;
@@ -25,10 +45,31 @@ export interface Draft {
   feedback: string | null;
   improvement_tips: string | null;
   missing_citations: string | null;
+  citation_report?: CitationReport | null;
+  analysis_source?: 'llm' | 'local' | 'cache' | 'fallback' | null;
   language: string;
   created_at: string;
 }
 
+// List views (history, dashboard) receive summaries, not the full text
+export interface DraftSummary {
+  id: number;
+  assignment_id: number;
+  similarity_score: number | null;
+  ai_probability: number | null;
+  risk_level: 'Low' | 'Medium' | 'High' | null;
+  learning_score: number | null;
+  language: string | null;
+  content_length: number | null;
+  content_preview: string | null;
+  created_at: string;
+}
+
+export interface DraftSummaryPage {
+  items: DraftSummary[];
+  next_cursor: string | null;
+}
+
 export type RiskLevel = 'Low' | 'Medium' | 'High';
 
 export const riskColor: Record<RiskLevel, string> = {